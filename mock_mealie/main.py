@@ -2,24 +2,60 @@
 Mock Mealie API
 
 NOTE: Currently outdated
+
+Environment variables:
+    MOCK_MEALIE_LATENCY_MS: Artificial latency added to every request (default: 0)
+    MOCK_MEALIE_COPIES: Replicate the sample recipes N times to mimic a large library (default: 1)
 """
 
+import asyncio
 import json
-from fastapi import FastAPI, HTTPException
+import os
+
+from fastapi import FastAPI, HTTPException, Query
 
 app = FastAPI()
 
+LATENCY_S = float(os.environ.get("MOCK_MEALIE_LATENCY_MS", "0")) / 1000
+COPIES = int(os.environ.get("MOCK_MEALIE_COPIES", "1"))
+
 
 def load_recipes():
     with open("recipes.json", "r") as f:
-        return json.load(f)
+        base = json.load(f)
+
+    if COPIES <= 1:
+        return base
+
+    recipes = []
+    for copy in range(COPIES):
+        for recipe in base:
+            recipes.append(
+                {
+                    **recipe,
+                    "id": f"{recipe['id']}-{copy}",
+                    "slug": f"{recipe['slug']}-{copy}",
+                    "name": f"{recipe['name']} #{copy}",
+                }
+            )
+    return recipes
 
 
 recipes = load_recipes()
 
 
+@app.middleware("http")
+async def add_latency(request, call_next):
+    if LATENCY_S:
+        await asyncio.sleep(LATENCY_S)
+    return await call_next(request)
+
+
 @app.get("/api/recipes")
-def get_recipes(page: int = 1, per_page: int = 50):
+def get_recipes(
+    page: int = 1,
+    per_page: int = Query(50, alias="perPage"),
+):
     start = (page - 1) * per_page
     end = start + per_page
     paginated_items = recipes[start:end]
@@ -33,10 +69,10 @@ def get_recipes(page: int = 1, per_page: int = 50):
         "total": total,
         "total_pages": total_pages,
         "items": paginated_items,
-        "next": f"/api/recipes?page={page + 1}&per_page={per_page}"
+        "next": f"/api/recipes?page={page + 1}&perPage={per_page}"
         if page < total_pages
         else None,
-        "previous": f"/api/recipes?page={page - 1}&per_page={per_page}"
+        "previous": f"/api/recipes?page={page - 1}&perPage={per_page}"
         if page > 1
         else None,
     }
@@ -0,0 +1,208 @@
+"""
+Benchmark Qdrant collection configurations: memory, latency and recall.
+
+Builds one temporary collection per configuration (HNSW `m`/`ef_construct`,
+on-disk originals, scalar or binary quantization with or without rescoring)
+from the same vectors, then searches each with noisy copies of stored
+vectors at several `hnsw_ef` values. Recall@k is measured against the exact
+top-k of the unquantized vectors.
+
+The "est. RAM MB" column is computed from the configuration, not measured
+on the server: float32 originals (unless on disk), quantized vectors
+(always in RAM) and about `2 * m` links of 4 bytes per point. It leaves out
+payloads, segment overhead and the page cache, so compare it between
+configurations rather than against the server's memory usage.
+
+Needs a Qdrant server, as the in-memory client ignores index settings. The
+vectors are copied from the configured collection:
+
+    uv run python benchmarks/bench_collection.py --queries 100
+
+or generated:
+
+    uv run python benchmarks/bench_collection.py --synthetic 20000
+"""
+
+import random
+import statistics
+import time
+from dataclasses import dataclass
+
+import typer
+from qdrant_client import QdrantClient, models
+
+from mealierag.config import Quantization, settings
+from mealierag.vectordb import (
+    get_hnsw_config,
+    get_quantization_config,
+    get_search_params,
+    get_vector_db_client,
+    retrieve_results_simple,
+)
+
+BENCH_PREFIX = "bench_collection_"
+
+
+@dataclass
+class CollectionConfig:
+    name: str
+    m: int = 16
+    ef_construct: int = 100
+    on_disk: bool = False
+    quantization: Quantization = Quantization.NONE
+    rescore: bool = True
+
+
+CONFIGS = [
+    CollectionConfig("default"),
+    CollectionConfig("m=32 ef_construct=200", m=32, ef_construct=200),
+    CollectionConfig("m=8", m=8),
+    CollectionConfig("scalar", quantization=Quantization.SCALAR),
+    CollectionConfig("scalar on_disk", on_disk=True, quantization=Quantization.SCALAR),
+    CollectionConfig("binary", quantization=Quantization.BINARY),
+    CollectionConfig(
+        "binary no rescore", quantization=Quantization.BINARY, rescore=False
+    ),
+    CollectionConfig("binary on_disk", on_disk=True, quantization=Quantization.BINARY),
+]
+
+
+def _estimated_memory_mb(config: CollectionConfig, points: int, dim: int) -> float:
+    """Estimate the RAM held by vectors and the HNSW graph of a collection."""
+    originals = 0 if config.on_disk else points * dim * 4
+    quantized = {
+        Quantization.NONE: 0,
+        Quantization.SCALAR: points * dim,
+        Quantization.BINARY: points * dim // 8,
+    }[config.quantization]
+    links = points * 2 * config.m * 4
+    return (originals + quantized + links) / 1024 / 1024
+
+
+def _load_vectors(client: QdrantClient, limit: int) -> list[list[float]]:
+    vectors = []
+    offset = None
+    while len(vectors) < limit:
+        points, offset = client.scroll(
+            collection_name=settings.vectordb_collection_name,
+            limit=256,
+            offset=offset,
+            with_vectors=True,
+            with_payload=False,
+        )
+        vectors += [p.vector for p in points if isinstance(p.vector, list)]
+        if offset is None:
+            break
+    if not vectors:
+        raise typer.Exit("Collection is empty or has no unnamed vectors.")
+    return vectors[:limit]
+
+
+def _create(client: QdrantClient, name: str, config: CollectionConfig, vectors) -> None:
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(
+            size=len(vectors[0]),
+            distance=models.Distance.COSINE,
+            on_disk=config.on_disk or None,
+        ),
+        hnsw_config=get_hnsw_config(config.m, config.ef_construct),
+        quantization_config=get_quantization_config(config.quantization),
+    )
+    for start in range(0, len(vectors), 256):
+        client.upsert(
+            collection_name=name,
+            points=[
+                models.PointStruct(id=i, vector=vectors[i])
+                for i in range(start, min(start + 256, len(vectors)))
+            ],
+        )
+    # Wait for the HNSW index to be built
+    while client.get_collection(name).status != models.CollectionStatus.GREEN:
+        time.sleep(0.5)
+
+
+def main(
+    queries: int = typer.Option(100, help="Number of query vectors"),
+    noise: float = typer.Option(0.05, help="Noise added to sampled vectors"),
+    hnsw_ef: list[int] = typer.Option([0, 64, 256], help="hnsw_ef values (0: default)"),
+    limit: int = typer.Option(50000, help="Maximum number of vectors copied"),
+    synthetic: int = typer.Option(0, help="Generate N random vectors instead"),
+    dim: int = typer.Option(1024, help="Vector size of synthetic vectors"),
+    seed: int = typer.Option(0, help="Random seed"),
+):
+    rng = random.Random(seed)
+    client = get_vector_db_client(settings.vectordb_url)
+    vectors = (
+        [[rng.gauss(0, 1) for _ in range(dim)] for _ in range(synthetic)]
+        if synthetic
+        else _load_vectors(client, limit)
+    )
+    k = settings.vectordb_k
+    query_vectors = [
+        [x + rng.gauss(0, noise) for x in rng.choice(vectors)] for _ in range(queries)
+    ]
+
+    print(f"points: {len(vectors)}, dim: {len(vectors[0])}, k: {k}")
+    print(
+        f"{'config':<24} {'hnsw_ef':>7} {'est. RAM MB':>11} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'recall@k':>9}"
+    )
+    print("est. RAM MB: vectors and HNSW links from the configuration, not measured")
+    truths = None
+    try:
+        for config in CONFIGS:
+            name = BENCH_PREFIX + config.name.replace(" ", "_").replace("=", "")
+            _create(client, name, config, vectors)
+            if truths is None:
+                truths = [
+                    {
+                        p.id
+                        for p in client.query_points(
+                            collection_name=name,
+                            query=query_vector,
+                            limit=k,
+                            search_params=models.SearchParams(exact=True),
+                        ).points
+                    }
+                    for query_vector in query_vectors
+                ]
+            for ef in hnsw_ef:
+                params = get_search_params(
+                    ef or None, config.quantization, config.rescore
+                )
+                # Warm up connections and caches
+                retrieve_results_simple(
+                    query_vectors[:1], client, name, k=k, search_params=params
+                )
+                latencies = []
+                recalls = []
+                for query_vector, truth in zip(query_vectors, truths):
+                    start = time.perf_counter()
+                    hits = retrieve_results_simple(
+                        [query_vector], client, name, k=k, search_params=params
+                    )
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    recalls.append(len({p.id for p in hits} & truth) / len(truth))
+                p95 = (
+                    statistics.quantiles(latencies, n=20)[-1]
+                    if len(latencies) > 1
+                    else 0
+                )
+                print(
+                    f"{config.name:<24} {ef or 'default':>7} "
+                    f"{_estimated_memory_mb(config, len(vectors), len(vectors[0])):>11.1f} "
+                    f"{statistics.median(latencies):>8.2f} {p95:>8.2f} "
+                    f"{statistics.mean(recalls):>9.3f}"
+                )
+            client.delete_collection(name)
+    finally:
+        for collection in client.get_collections().collections:
+            if collection.name.startswith(BENCH_PREFIX):
+                client.delete_collection(collection.name)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,58 @@
+"""
+Benchmark embedding throughput for different batch sizes.
+
+Requires a running Ollama with the configured embedding model and a Mealie
+instance (or `mock_mealie`) to source recipe texts from:
+
+    uv run python benchmarks/bench_embedding.py --batch-size 1 --batch-size 16
+"""
+
+import time
+
+import ollama
+import typer
+
+from mealierag.config import settings
+from mealierag.embeddings import get_embedding
+from mealierag.mealie import fetch_full_recipes
+
+
+def main(
+    batch_size: list[int] = typer.Option([1, 4, 16, 32, 64], help="Sizes to test"),
+    recipes: int = typer.Option(128, help="Number of recipe texts to embed"),
+):
+    texts = [
+        r.get_text_for_embedding()
+        for r in fetch_full_recipes(
+            settings.mealie_api_url,
+            settings.mealie_token,
+            max_workers=settings.mealie_fetch_workers,
+        )
+    ]
+    if not texts:
+        raise typer.Exit("No recipes found.")
+    texts = (texts * (recipes // len(texts) + 1))[:recipes]
+
+    client = ollama.Client(host=settings.ollama_base_url)
+    # Load the model so the first measurement does not include it
+    get_embedding(["warmup"], client, settings)
+
+    print(f"model: {settings.embedding_model}")
+    print(f"{'batch':>6} {'recipes':>8} {'seconds':>8} {'rec/s':>8}")
+    for size in batch_size:
+        # Without the embedding cache, every size is timed against Ollama
+        bench_settings = settings.model_copy(
+            update={
+                "embedding_batch_size": size,
+                "embedding_batch_sizes": {},
+                "embedding_cache_path": None,
+            }
+        )
+        start = time.perf_counter()
+        get_embedding(texts, client, bench_settings)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>6} {len(texts):>8} {elapsed:>8.2f} {len(texts) / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
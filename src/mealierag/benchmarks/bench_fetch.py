@@ -0,0 +1,42 @@
+"""
+Benchmark sequential vs concurrent recipe fetching.
+
+Start the mock Mealie API with injected latency first, e.g.:
+
+    cd mock_mealie
+    MOCK_MEALIE_LATENCY_MS=50 MOCK_MEALIE_COPIES=10 uvicorn main:app --port 9000
+
+Then run:
+
+    uv run python benchmarks/bench_fetch.py --workers 1 --workers 8 --workers 32
+"""
+
+import time
+
+import typer
+
+from mealierag.mealie import fetch_full_recipes
+
+
+def main(
+    mealie_api_url: str = "http://localhost:9000/api/recipes",
+    mealie_token: str = "mock-token",
+    workers: list[int] = typer.Option([1, 4, 8, 16], help="Worker counts to test"),
+):
+    baseline = None
+    print(f"{'workers':>8} {'recipes':>8} {'seconds':>8} {'rec/s':>8} {'speedup':>8}")
+    for max_workers in workers:
+        start = time.perf_counter()
+        recipes = fetch_full_recipes(
+            mealie_api_url, mealie_token, max_workers=max_workers
+        )
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"{max_workers:>8} {len(recipes):>8} {elapsed:>8.2f} "
+            f"{len(recipes) / elapsed:>8.1f} {baseline / elapsed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,123 @@
+"""
+Benchmark time to first token with and without system-prompt prefix reuse.
+
+Sends answer requests laid out like the Q&A service (the system prompt,
+then the recipe context and question in the user turn) with a fixed
+`num_ctx` and `keep_alive`, so the model stays loaded and Ollama can reuse
+the KV cache of the common prefix. The "no reuse" requests start the system
+prompt with a random nonce, so no prefix matches and the whole prompt is
+evaluated again. Both modes alternate to share any server drift.
+
+Each request generates only a few tokens; the prompt tokens Ollama reports
+as evaluated show how much of the prompt was served from the cache.
+
+Needs a running Ollama. A small local model is a fine stand-in for the
+prefill savings:
+
+    uv run python benchmarks/bench_prefill.py --model qwen2.5:0.5b
+"""
+
+import random
+import statistics
+import time
+import uuid
+
+import ollama
+import typer
+from qdrant_client.http.models import ScoredPoint
+
+from mealierag.chat import populate_messages
+from mealierag.config import settings
+
+QUESTIONS = [
+    "What can I cook for a quick dinner?",
+    "Which recipe is best for a weekend brunch?",
+    "Do I have something vegetarian with lots of protein?",
+    "What should I bake for a birthday?",
+]
+
+
+def _hits(rng: random.Random, k: int) -> list[ScoredPoint]:
+    hits = []
+    for i in range(k):
+        n = rng.randrange(1000)
+        text = (
+            f"Title: Recipe {n}\nDescription: Family favourite number {n}\n"
+            f"Rating: {rng.randint(1, 5)}\nCategory: Dinner\nTags: quick\n"
+            "Ingredients:\n"
+            + "".join(f"- {rng.randint(1, 4)} cups ingredient {j}\n" for j in range(8))
+            + "Instructions:\n"
+            + "".join(f"- Step {j}: stir and cook for a while.\n" for j in range(6))
+        )
+        hits.append(
+            ScoredPoint(
+                id=i,
+                version=0,
+                score=1.0,
+                payload={"name": f"Recipe {n}", "recipe_id": str(n), "text": text},
+            )
+        )
+    return hits
+
+
+def _request(
+    client: ollama.Client, model: str, messages: list[dict], num_ctx: int
+) -> tuple[float, int]:
+    """Send a request, returning the time to first token and evaluated tokens."""
+    start = time.perf_counter()
+    first_token = None
+    prompt_eval_count = 0
+    for chunk in client.chat(
+        model=model,
+        messages=messages,
+        stream=True,
+        options={"temperature": 0, "num_ctx": num_ctx, "num_predict": 8},
+        keep_alive=settings.llm_keep_alive or "30m",
+    ):
+        if first_token is None and chunk["message"]["content"]:
+            first_token = time.perf_counter() - start
+        if chunk.get("done"):
+            prompt_eval_count = chunk.get("prompt_eval_count") or 0
+    return (first_token or time.perf_counter() - start) * 1000, prompt_eval_count
+
+
+def main(
+    model: str = typer.Option(settings.llm_model, help="LLM model"),
+    requests: int = typer.Option(20, help="Requests per mode"),
+    k: int = typer.Option(settings.vectordb_k, help="Recipes in the context"),
+    num_ctx: int = typer.Option(settings.llm_num_ctx or 8192, help="Context window"),
+    seed: int = typer.Option(0, help="Random seed"),
+):
+    rng = random.Random(seed)
+    client = ollama.Client(host=settings.ollama_base_url)
+    # Load the model so the first measurement does not include it
+    _request(client, model, populate_messages("warmup", _hits(rng, k)), num_ctx)
+
+    results: dict[str, list[tuple[float, int]]] = {"prefix reuse": [], "no reuse": []}
+    for _ in range(requests):
+        messages = populate_messages(rng.choice(QUESTIONS), _hits(rng, k))
+        # Re-prime the stable prefix after the previous "no reuse" request
+        _request(client, model, messages, num_ctx)
+        messages = populate_messages(rng.choice(QUESTIONS), _hits(rng, k))
+        results["prefix reuse"].append(_request(client, model, messages, num_ctx))
+
+        messages = populate_messages(rng.choice(QUESTIONS), _hits(rng, k))
+        messages[0] = {
+            "role": "system",
+            "content": f"{uuid.uuid4()}\n{messages[0]['content']}",
+        }
+        results["no reuse"].append(_request(client, model, messages, num_ctx))
+
+    print(f"model: {model}, k: {k}, num_ctx: {num_ctx}, requests: {requests}")
+    print(f"{'mode':<14} {'p50 TTFT ms':>12} {'mean TTFT ms':>13} {'eval tokens':>12}")
+    for mode, samples in results.items():
+        ttfts = [ttft for ttft, _ in samples]
+        evaluated = statistics.mean(count for _, count in samples)
+        print(
+            f"{mode:<14} {statistics.median(ttfts):>12.1f} "
+            f"{statistics.mean(ttfts):>13.1f} {evaluated:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
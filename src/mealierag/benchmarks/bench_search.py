@@ -0,0 +1,145 @@
+"""
+Benchmark multi-query retrieval engines: latency and recall.
+
+Compares the server-side prefetch RRF path (`retrieve_results_rrf`) with
+the batch engine (`retrieve_results_batch`) at several candidate depths
+and fusion methods. Each benchmark question is simulated by a set of
+noisy copies of a stored recipe vector, standing in for the LLM query
+variations, so no Ollama is needed.
+
+Recall@k is measured against the true answer of each question: the exact
+(non-HNSW) top-k of the clean recipe vector the variations were derived
+from. It does not depend on the candidate depth or on a fusion method, so
+it shows how many relevant recipes a small candidate pool loses.
+
+The synthetic in-memory collection is searched exactly, so its recall only
+reflects fusion and candidate depth. Only a Qdrant server collection, which
+is searched through HNSW, also measures the approximation error.
+
+Runs against the configured Qdrant collection:
+
+    uv run python benchmarks/bench_search.py --questions 50
+
+or against a synthetic in-memory collection:
+
+    uv run python benchmarks/bench_search.py --synthetic 5000
+"""
+
+import random
+import statistics
+import time
+
+import typer
+from qdrant_client import QdrantClient, models
+
+from mealierag.config import FusionMethod, settings
+from mealierag.vectordb import (
+    get_vector_db_client,
+    retrieve_results_batch,
+    retrieve_results_rrf,
+)
+
+
+def _synthetic_client(points: int, dim: int, rng: random.Random) -> QdrantClient:
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        collection_name=settings.vectordb_collection_name,
+        vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE),
+    )
+    for start in range(0, points, 256):
+        client.upsert(
+            collection_name=settings.vectordb_collection_name,
+            points=[
+                models.PointStruct(
+                    id=i, vector=[rng.gauss(0, 1) for _ in range(dim)], payload={}
+                )
+                for i in range(start, min(start + 256, points))
+            ],
+        )
+    return client
+
+
+def _sample_vectors(client: QdrantClient, count: int, rng: random.Random):
+    points, _ = client.scroll(
+        collection_name=settings.vectordb_collection_name,
+        limit=max(count * 10, 100),
+        with_vectors=True,
+        with_payload=False,
+    )
+    if not points:
+        raise typer.Exit("Collection is empty.")
+    return [rng.choice(points).vector for _ in range(count)]
+
+
+def _variations(vector: list[float], n: int, noise: float, rng: random.Random):
+    return [[x + rng.gauss(0, noise) for x in vector] for _ in range(n)]
+
+
+def _ground_truth(client: QdrantClient, vector: list[float], k: int) -> set:
+    return {
+        point.id
+        for point in client.query_points(
+            collection_name=settings.vectordb_collection_name,
+            query=vector,
+            limit=k,
+            search_params=models.SearchParams(exact=True),
+        ).points
+    }
+
+
+def main(
+    questions: int = typer.Option(50, help="Number of simulated questions"),
+    variations: int = typer.Option(5, help="Query vectors per question"),
+    noise: float = typer.Option(0.05, help="Noise added to simulate variations"),
+    depth: list[int] = typer.Option([3, 10, 20, 50], help="Candidate depths to test"),
+    synthetic: int = typer.Option(0, help="Use an in-memory collection of N points"),
+    dim: int = typer.Option(1024, help="Vector size of the synthetic collection"),
+    seed: int = typer.Option(0, help="Random seed"),
+):
+    rng = random.Random(seed)
+    client = (
+        _synthetic_client(synthetic, dim, rng)
+        if synthetic
+        else get_vector_db_client(settings.vectordb_url)
+    )
+    collection = settings.vectordb_collection_name
+    k = settings.vectordb_k
+
+    vectors = _sample_vectors(client, questions, rng)
+    query_sets = [_variations(vector, variations, noise, rng) for vector in vectors]
+    truths = [_ground_truth(client, vector, k) for vector in vectors]
+
+    engines = {"prefetch": lambda qv: retrieve_results_rrf(qv, client, collection, k=k)}
+    for d in depth:
+        for fusion in FusionMethod:
+            engines[f"batch d={d} {fusion}"] = (
+                lambda qv, d=d, fusion=fusion: retrieve_results_batch(
+                    qv, client, collection, k=k, depth=d, fusion=fusion
+                )
+            )
+
+    print(f"questions: {questions}, variations: {variations}, k: {k}")
+    if synthetic:
+        print("in-memory search is exact: recall excludes HNSW approximation error")
+    print(f"{'engine':<28} {'p50 ms':>8} {'p95 ms':>8} {'recall@k':>9}")
+    for name, engine in engines.items():
+        # Warm up connections and caches
+        engine(query_sets[0])
+        latencies = []
+        recalls = []
+        for query_vectors, truth in zip(query_sets, truths):
+            start = time.perf_counter()
+            hits = engine(query_vectors)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(
+                len({p.id for p in hits} & truth) / max(min(len(truth), k), 1)
+            )
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+        print(
+            f"{name:<28} {statistics.median(latencies):>8.2f} {p95:>8.2f} "
+            f"{statistics.mean(recalls):>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
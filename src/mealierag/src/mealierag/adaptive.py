@@ -0,0 +1,143 @@
+"""
+Adaptive search module.
+
+Contains the heuristics choosing between the SIMPLE and MULTIQUERY search
+strategies for a single request.
+"""
+
+import logging
+import re
+
+from qdrant_client.http.models import ScoredPoint
+
+from .config import SearchStrategy
+from .metrics import STAGE_DURATION, Counter
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_REQUESTS = Counter(
+    "mealierag_search_strategy_requests_total",
+    "Requests served by each search strategy, by the reason it was chosen.",
+    labels=("strategy", "reason"),
+)
+LLM_SECONDS_SAVED = Counter(
+    "mealierag_adaptive_llm_seconds_saved_total",
+    "Estimated query expansion time saved by answering with the simple strategy.",
+    labels=(),
+)
+
+# Reasons for choosing a strategy
+SHORT_QUERY = "short_query"
+RECIPE_NAME = "recipe_name"
+SCORE_MARGIN = "score_margin"
+AMBIGUOUS = "ambiguous"
+FUSED_SCORES = "fused_scores"
+
+
+def tokenize(text: str) -> set[str]:
+    """Lowercase word tokens, with a plural "s" folded away."""
+    return {
+        token[:-1] if len(token) > 3 and token.endswith("s") else token
+        for token in re.findall(r"\w+", text.lower())
+    }
+
+
+def tokenize_names(names: list[str]) -> list[tuple[str, frozenset[str]]]:
+    """
+    Tokenize recipe names once for `match_recipe_name`.
+
+    Args:
+        names: Names of the indexed recipes.
+
+    Returns:
+        Each name with its tokens, leaving out names without any word.
+    """
+    return [(name, frozenset(tokens)) for name in names if (tokens := tokenize(name))]
+
+
+def match_recipe_name(
+    user_input: str, recipe_names: list[tuple[str, frozenset[str]]]
+) -> str | None:
+    """
+    Find a known recipe name mentioned in the user input.
+
+    A name of several words matches if all of them appear in the input,
+    ignoring case, word order and plurals, e.g. "show me my pancake recipe
+    with bananas" mentions "Banana Pancakes". A single-word name like "Soup"
+    would match broad questions, so it only matches an input that is just
+    the name.
+
+    Args:
+        user_input: The raw user query.
+        recipe_names: Names of the indexed recipes, see `tokenize_names`.
+
+    Returns:
+        The first matching recipe name, or None.
+    """
+    input_tokens = tokenize(user_input)
+    for name, name_tokens in recipe_names:
+        if len(name_tokens) > 1:
+            if name_tokens <= input_tokens:
+                return name
+        elif name_tokens == input_tokens:
+            return name
+    return None
+
+
+def score_margin(hits: list[ScoredPoint]) -> float:
+    """
+    Score difference between the best and the second best hit.
+
+    Args:
+        hits: Search results, best first.
+
+    Returns:
+        The margin, infinite if there is a single hit and 0 without hits.
+    """
+    if not hits:
+        return 0.0
+    if len(hits) == 1:
+        return float("inf")
+    return hits[0].score - hits[1].score
+
+
+def select_by_query(
+    user_input: str,
+    recipe_names: list[tuple[str, frozenset[str]]],
+    max_simple_words: int,
+) -> str | None:
+    """
+    Decide from the query text alone whether the simple strategy suffices.
+
+    Args:
+        user_input: The raw user query.
+        recipe_names: Names of the indexed recipes, see `tokenize_names`.
+        max_simple_words: Queries with at most this many words are simple.
+
+    Returns:
+        The reason for choosing the simple strategy, or None if undecided.
+    """
+    if len(user_input.split()) <= max_simple_words:
+        return SHORT_QUERY
+    if match_recipe_name(user_input, recipe_names) is not None:
+        return RECIPE_NAME
+    return None
+
+
+def record_strategy(strategy: SearchStrategy, reason: str) -> None:
+    """
+    Count a request served by a strategy.
+
+    Requests served by the simple strategy add the mean observed query
+    expansion time to the estimated LLM time saved.
+
+    Args:
+        strategy: The chosen strategy.
+        reason: Why it was chosen.
+    """
+    logger.debug(
+        "Selected search strategy", extra={"strategy": strategy, "reason": reason}
+    )
+    STRATEGY_REQUESTS.inc(strategy, reason)
+    if strategy == SearchStrategy.SIMPLE:
+        LLM_SECONDS_SAVED.inc(amount=STAGE_DURATION.mean("query_expansion"))
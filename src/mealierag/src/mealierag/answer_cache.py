@@ -0,0 +1,261 @@
+"""
+Answer cache module.
+
+Contains a cache of complete LLM answers keyed by the exact chat request, a
+semantic cache matching paraphrased questions over the same recipes, and
+helpers recording a response stream into them and replaying a cached
+answer as a stream.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from qdrant_client.http.models import ScoredPoint
+
+from .cache import SQLiteStore, TTLCache, hash_key
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+def answer_key(model: str, options: dict[str, Any], messages: list[dict]) -> str:
+    """
+    Build the cache key of a chat request.
+
+    Args:
+        model: LLM model name
+        options: Generation options, e.g. temperature and seed
+        messages: Final chat messages sent to the model
+
+    Returns:
+        Hex digest identifying the request
+    """
+    return hash_key(model, options, messages)
+
+
+def replay(answer: str) -> Iterator[dict[str, Any]]:
+    """
+    Replay a cached answer as a stream of chat chunks, one per line.
+
+    Args:
+        answer: Complete answer
+
+    Yields:
+        Chunks shaped like Ollama chat stream chunks
+    """
+    lines = answer.splitlines(keepends=True) or [""]
+    for i, line in enumerate(lines):
+        yield {
+            "message": {"role": "assistant", "content": line},
+            "done": i == len(lines) - 1,
+        }
+
+
+async def areplay(answer: str) -> AsyncIterator[dict[str, Any]]:
+    """
+    Async variant of `replay`.
+    """
+    for chunk in replay(answer):
+        yield chunk
+
+
+def record_answer(
+    stream: Iterator[dict[str, Any]], store: Callable[[str], None]
+) -> Iterator[dict[str, Any]]:
+    """
+    Pass a response stream through, storing the answer once complete.
+
+    Args:
+        stream: Stream of chat chunks
+        store: Called with the complete, non-empty answer
+
+    Yields:
+        The chunks of the wrapped stream
+    """
+    parts = []
+    for chunk in stream:
+        parts.append(chunk["message"]["content"])
+        yield chunk
+    if answer := "".join(parts):
+        store(answer)
+
+
+async def arecord_answer(
+    stream: AsyncIterator[dict[str, Any]], store: Callable[[str], None]
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Async variant of `record_answer`.
+
+    The answer is stored in a worker thread, as the store may write to disk.
+    """
+    parts = []
+    async for chunk in stream:
+        parts.append(chunk["message"]["content"])
+        yield chunk
+    if answer := "".join(parts):
+        await asyncio.to_thread(store, answer)
+
+
+class AnswerCache:
+    """
+    Cache of complete LLM answers.
+
+    Only answers whose stream ran to completion are stored, so an
+    interrupted or failed generation is never replayed.
+    """
+
+    def __init__(
+        self, max_size: int, ttl: float | None = None, store: SQLiteStore | None = None
+    ):
+        """
+        Initialize the AnswerCache.
+
+        Args:
+            max_size: Maximum number of in-process entries
+            ttl: Seconds after which an answer expires, never if None
+            store: Optional on-disk store persisting the answers
+        """
+        self.cache: TTLCache[str] = TTLCache("answer", max_size, ttl, store)
+
+    def get(self, key: str) -> str | None:
+        """Look up the answer of a request."""
+        return self.cache.get(key)
+
+    def put(self, key: str, answer: str) -> None:
+        """Store the answer of a request."""
+        self.cache.put(key, answer)
+        logger.debug("Cached answer", extra={"answer_length": len(answer)})
+
+
+def _unit(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def _recipe_hashes(hits: list[ScoredPoint]) -> dict[str, str | None]:
+    """Content hash of every retrieved recipe, by recipe ID."""
+    return {
+        str(hit.payload.get("recipe_id") or hit.id): hit.payload.get("content_hash")
+        for hit in hits
+    }
+
+
+@dataclass
+class _SemanticEntry:
+    embedding: list[float]
+    recipe_hashes: dict[str, str | None]
+    answer: str
+    expires_at: float | None
+
+
+class SemanticAnswerCache:
+    """
+    Cache of LLM answers matched by question similarity.
+
+    A cached answer is reused when a new question's embedding has a cosine
+    similarity of at least `threshold` with an answered one and retrieval
+    returned the same recipes. Entries are only compared with entries of the
+    same recipe set, so a lookup stays cheap. An entry is dropped as soon as
+    one of its recipes shows a different content hash, i.e. was re-ingested
+    with new content.
+    """
+
+    def __init__(self, max_size: int, threshold: float, ttl: float | None = None):
+        """
+        Initialize the SemanticAnswerCache.
+
+        Args:
+            max_size: Maximum number of entries
+            threshold: Minimum cosine similarity of matching questions
+            ttl: Seconds after which an entry expires, never if None
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._entries: OrderedDict[int, _SemanticEntry] = OrderedDict()
+        # recipe ID set -> entry IDs
+        self._by_recipes: dict[frozenset[str], set[int]] = {}
+
+    def get(self, embedding: list[float], hits: list[ScoredPoint]) -> str | None:
+        """
+        Look up the answer of a similar question over the same recipes.
+
+        Args:
+            embedding: Embedding of the new question
+            hits: Recipes retrieved for the new question
+
+        Returns:
+            The cached answer, or None
+        """
+        recipe_hashes = _recipe_hashes(hits)
+        query = _unit(embedding)
+        now = time.time()
+        answer = None
+        with self._lock:
+            best = self.threshold
+            for entry_id in list(self._by_recipes.get(frozenset(recipe_hashes), ())):
+                entry = self._entries[entry_id]
+                expired = entry.expires_at is not None and entry.expires_at <= now
+                if expired or entry.recipe_hashes != recipe_hashes:
+                    self._remove(entry_id)
+                    continue
+                similarity = sum(a * b for a, b in zip(query, entry.embedding))
+                if similarity >= best:
+                    best = similarity
+                    answer = entry.answer
+                    self._entries.move_to_end(entry_id)
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CACHE_REQUESTS.inc("semantic_answer", "miss" if answer is None else "hit")
+        return answer
+
+    def put(self, embedding: list[float], hits: list[ScoredPoint], answer: str) -> None:
+        """
+        Store the answer of a question.
+
+        Args:
+            embedding: Embedding of the question
+            hits: Recipes the answer is based on
+            answer: Complete answer
+        """
+        if self.max_size <= 0 or not hits:
+            return
+        recipe_hashes = _recipe_hashes(hits)
+        entry = _SemanticEntry(
+            embedding=_unit(embedding),
+            recipe_hashes=recipe_hashes,
+            answer=answer,
+            expires_at=time.time() + self.ttl if self.ttl is not None else None,
+        )
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            self._by_recipes.setdefault(frozenset(recipe_hashes), set()).add(entry_id)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        recipes = frozenset(entry.recipe_hashes)
+        ids = self._by_recipes[recipes]
+        ids.discard(entry_id)
+        if not ids:
+            del self._by_recipes[recipes]
@@ -0,0 +1,286 @@
+"""
+Cache module.
+
+Contains a generic in-process LRU cache with time-to-live expiry and an
+optional on-disk store to persist its entries across restarts.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize free text for use in cache keys.
+
+    Case and whitespace differences are ignored, so "Quick  chicken dinner "
+    and "quick chicken dinner" share an entry.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Lowercase text with whitespace runs collapsed to single spaces
+    """
+    return " ".join(text.lower().split())
+
+
+def hash_key(*parts: Any) -> str:
+    """
+    Build a cache key from JSON-serializable parts.
+
+    Args:
+        parts: Values identifying the entry, e.g. a model name and a text
+
+    Returns:
+        Hex digest of the parts
+    """
+    content = json.dumps(list(parts), sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class SQLiteStore:
+    """
+    On-disk key-value store backed by SQLite.
+
+    Values are stored as JSON together with their expiry time. Least
+    recently used entries are evicted once more than `max_entries` are
+    stored.
+    """
+
+    def __init__(self, path: str, max_entries: int | None = None):
+        """
+        Initialize the SQLiteStore.
+
+        Args:
+            path: Path of the SQLite database file
+            max_entries: Maximum number of stored entries, unbounded if None
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, key: str) -> tuple[Any, float | None] | None:
+        """
+        Look up an entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decoded value and expiry time, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value), expires_at
+
+    def put(self, key: str, value: Any, expires_at: float | None) -> None:
+        """
+        Store an entry.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            expires_at: Expiry time (epoch seconds), never if None
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones over the limit."""
+        self._conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+        if self.max_entries is None:
+            return
+        self._conn.execute(
+            "DELETE FROM entries WHERE key IN ("
+            "SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Once `max_size` entries are stored, the least recently used entry is
+    evicted. If a `SQLiteStore` is given, entries are written through to it
+    and in-process misses are looked up there, so the cache survives
+    restarts. Hits and misses are counted on the instance and exported as
+    metrics under the cache name.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int,
+        ttl: float | None = None,
+        store: SQLiteStore | None = None,
+    ):
+        """
+        Initialize the TTLCache.
+
+        Args:
+            name: Cache name used in metrics
+            max_size: Maximum number of in-process entries
+            ttl: Seconds after which an entry expires, never if None
+            store: Optional on-disk store persisting the entries
+        """
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (expiry time, value)
+        self._entries: OrderedDict[str, tuple[float | None, V]] = OrderedDict()
+
+    def get(self, key: str) -> V | None:
+        """
+        Look up an entry, marking it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        value = self._get_memory(key)
+        if value is None and self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                value, expires_at = stored
+                self._put_memory(key, value, expires_at)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CACHE_REQUESTS.inc(self.name, "miss" if value is None else "hit")
+        return value
+
+    def put(self, key: str, value: V) -> None:
+        """
+        Store an entry, evicting the least recently used one if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        self._put_memory(key, value, expires_at)
+        if self.store is not None:
+            self.store.put(key, value, expires_at)
+
+    def pop(self, key: str) -> V | None:
+        """Remove an entry, returning its in-process value if present."""
+        if self.store is not None:
+            self.store.delete(key)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        if self.store is not None:
+            self.store.clear()
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _get_memory(self, key: str) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _put_memory(self, key: str, value: V, expires_at: float | None) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
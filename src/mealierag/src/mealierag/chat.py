@@ -4,10 +4,28 @@ Chat module.
 Contains the system prompt and functions to populate messages for RAG.
 """
 
+import logging
+import math
+from dataclasses import dataclass, field
+from functools import cache
+
 from qdrant_client.models import ScoredPoint
 
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
+# Rough characters per token of Llama-style tokenizers on English text
+CHARS_PER_TOKEN = 4
+# Recipe text sections dropped to fit the token budget, least needed first.
+# Names, IDs (links), ratings, categories and tags are always kept.
+TRIMMED_SECTIONS = ("instructions", "ingredients", "description")
+# Line marking a section whose lines were trimmed
+TRIM_MARKER = "- ...\n"
+# Headers of the recipe text lines following the description, which may span
+# several lines
+_DESCRIPTION_END = ("Rating:", "Category:", "Tags:", "Ingredients:", "Instructions:")
+
 SYSTEM_PROMPT = """
 You are MealieChef, an expert personal chef assistant.
 
@@ -66,13 +84,136 @@ USER_MESSAGE = """
 {query}"""
 
 
-def populate_context(hits: list[ScoredPoint]) -> str:
-    """Populate context from search hits"""
-    # Format Context
-    context_text = ""
-    for hit in hits:
-        context_text += f"[RECIPE_START]\nRecipeName: {hit.payload['name']}\nRecipeID: {hit.payload['recipe_id']}\n{hit.payload['text']}[RECIPE_END]\n"
-    return context_text
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens of a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class _Section:
+    name: str
+    heading: str = ""
+    lines: list[str] = field(default_factory=list)
+    trimmed: bool = False
+
+    def render(self) -> str:
+        if not self.lines and not self.trimmed:
+            return ""
+        marker = TRIM_MARKER if self.trimmed and self.heading else ""
+        return self.heading + "".join(self.lines) + marker
+
+
+def _split_recipe(hit: ScoredPoint) -> list[str | _Section]:
+    """Split the context of a hit into kept lines and trimmable sections."""
+    parts: list[str | _Section] = [
+        f"[RECIPE_START]\nRecipeName: {hit.payload['name']}\n"
+        f"RecipeID: {hit.payload['recipe_id']}\n"
+    ]
+    section = None
+    for line in hit.payload["text"].splitlines(keepends=True):
+        if line.startswith(("Ingredients:", "Instructions:")):
+            section = _Section(line.split(":")[0].lower(), heading=line)
+            parts.append(section)
+        elif section is None and line.startswith("Description:"):
+            section = _Section("description", lines=[line])
+            parts.append(section)
+        elif (
+            section is not None
+            and section.name == "description"
+            and line.startswith(_DESCRIPTION_END)
+        ):
+            section = None
+            parts.append(line)
+        elif section is not None:
+            section.lines.append(line)
+        else:
+            parts.append(line)
+    parts.append("[RECIPE_END]\n")
+    return parts
+
+
+def _trim(recipes: list[list[str | _Section]], length: int, budget_chars: int) -> int:
+    """
+    Trim section lines from the end, least relevant recipes first, until the
+    recipes fit `budget_chars`.
+
+    Args:
+        recipes: Split recipes, trimmed in place
+        length: Current length of the recipes in characters
+        budget_chars: Maximum length in characters
+
+    Returns:
+        Length of the trimmed recipes in characters
+    """
+    for name in TRIMMED_SECTIONS:
+        for parts in reversed(recipes):
+            for section in parts:
+                if not isinstance(section, _Section) or section.name != name:
+                    continue
+                while length > budget_chars and section.lines:
+                    length -= len(section.lines.pop())
+                    if not section.trimmed and section.heading:
+                        length += len(TRIM_MARKER)
+                    section.trimmed = True
+            if length <= budget_chars:
+                return length
+    return length
+
+
+def _render(parts: list[str | _Section]) -> str:
+    return "".join(p if isinstance(p, str) else p.render() for p in parts)
+
+
+def populate_context(hits: list[ScoredPoint], token_budget: int | None = None) -> str:
+    """
+    Populate context from search hits.
+
+    When the recipes exceed `token_budget`, instructions, then ingredients,
+    then descriptions are trimmed, starting with the least relevant (last)
+    hit. Recipe names, links, ratings, categories and tags are always kept.
+
+    Args:
+        hits: Retrieved recipes, most relevant first
+        token_budget: Approximate maximum tokens of the context, defaults to
+            `settings.context_token_budget` (0: unlimited)
+
+    Returns:
+        Context text
+    """
+    if token_budget is None:
+        token_budget = settings.context_token_budget
+    recipes = [_split_recipe(hit) for hit in hits]
+    if token_budget > 0:
+        budget_chars = token_budget * CHARS_PER_TOKEN
+        full_length = sum(len(_render(parts)) for parts in recipes)
+        length = _trim(recipes, full_length, budget_chars)
+        if length < full_length:
+            logger.debug(
+                "Trimmed context to token budget",
+                extra={
+                    "tokens": math.ceil(full_length / CHARS_PER_TOKEN),
+                    "trimmed_tokens": math.ceil(length / CHARS_PER_TOKEN),
+                    "token_budget": token_budget,
+                },
+            )
+        if length > budget_chars:
+            logger.warning(
+                "Context exceeds token budget after trimming",
+                extra={"hits_count": len(hits), "token_budget": token_budget},
+            )
+    return "".join(_render(parts) for parts in recipes)
+
+
+@cache
+def system_prompt(external_url: str) -> str:
+    """
+    Format the system prompt once per Mealie URL.
+
+    The system prompt is the long, request-independent prefix of every chat
+    request, while the recipes and the question go into the user turn. Sent
+    byte-identical, its evaluation is reused from the server's KV cache.
+    """
+    return SYSTEM_PROMPT.format(external_url=external_url)
 
 
 def populate_messages(
@@ -81,7 +222,7 @@ def populate_messages(
     """Populate messages for RAG"""
     context_text = populate_context(context_results)
 
-    system_content = SYSTEM_PROMPT.format(external_url=settings.mealie_external_url)
+    system_content = system_prompt(settings.mealie_external_url)
 
     user_message = USER_MESSAGE.format(context_text=context_text, query=query)
 
@@ -5,11 +5,13 @@ Contains main entry points.
 """
 
 import logging
+from typing import Annotated
 
 import typer
 from pythonjsonlogger.json import JsonFormatter
 
 from .config import settings
+from .metrics import start_metrics_server
 from .run_fetch import main as fetch_main
 from .run_ingest import main as ingest_main
 from .run_qa_cli import main as qa_cli_main
@@ -39,6 +41,8 @@ def callback():
     """
     setup_logging()
     logging.getLogger("mealierag").info(f"Configuration: {settings.model_dump_json()}")
+    if settings.metrics_port is not None:
+        start_metrics_server(settings.metrics_port)
 
 
 @app.command()
@@ -50,9 +54,31 @@ def fetch():
 
 
 @app.command()
-def ingest():
+def ingest(
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help="Only sync recipes changed since the last run and drop deleted ones.",
+        ),
+    ] = False,
+    reindex: Annotated[
+        bool,
+        typer.Option(
+            "--reindex",
+            help="Rebuild into a new collection version and switch the alias when done.",
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            help="Continue an interrupted ingest from its last committed batch.",
+        ),
+    ] = False,
+):
     """Ingest Mealie recipes into the vector database."""
-    ingest_main()
+    ingest_main(incremental=incremental, reindex=reindex, resume=resume)
 
 
 @app.command()
@@ -4,13 +4,44 @@ Config module.
 
 from enum import StrEnum, auto
 
-from pydantic import Field, SecretStr
+from pydantic import AliasChoices, Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class SearchStrategy(StrEnum):
     SIMPLE = auto()
     MULTIQUERY = auto()
+    # Choose between SIMPLE and MULTIQUERY for each request
+    ADAPTIVE = auto()
+
+
+class SearchEngine(StrEnum):
+    # One Qdrant prefetch per query vector, fused server-side with RRF
+    PREFETCH = auto()
+    # All query vectors in one batch request, fused client-side
+    BATCH = auto()
+
+
+class FusionMethod(StrEnum):
+    RRF = auto()
+    WEIGHTED_RRF = auto()
+    # Sum of per-query min-max normalized scores
+    SCORE_SUM = auto()
+
+
+class Quantization(StrEnum):
+    NONE = auto()
+    # int8 per dimension, 4x smaller than float32
+    SCALAR = auto()
+    # 1 bit per dimension, 32x smaller than float32
+    BINARY = auto()
+
+
+class FieldStrategy(StrEnum):
+    # Score each recipe by its best matching field vector
+    BEST_FIELD = auto()
+    # Fuse the per-field hits with RRF
+    FUSE = auto()
 
 
 # TODO break down into multiple config files depending on which entrypoint is used
@@ -22,6 +53,9 @@ class Settings(BaseSettings):
         "http://localhost:9000", description="Mealie External URL (for links)"
     )
     mealie_token: str | None = Field(None, description="Mealie API Token")
+    mealie_fetch_workers: int = Field(
+        8, description="Number of concurrent recipe detail requests to Mealie"
+    )
 
     ollama_base_url: str = Field(
         "http://localhost:11434", description="Ollama Base URL"
@@ -32,26 +66,221 @@ class Settings(BaseSettings):
     vectordb_collection_name: str = Field(
         "mealie_recipes", description="Qdrant Collection Name"
     )
+    vectordb_keep_versions: int = Field(
+        2, description="Number of collection versions kept by reindex (incl. live)"
+    )
     vectordb_k: int = Field(3, description="Number of results to return when searching")
+    vectordb_search_engine: SearchEngine = Field(
+        SearchEngine.PREFETCH, description="How multiple query vectors are searched"
+    )
+    vectordb_candidate_depth: int = Field(
+        20,
+        description="Candidates retrieved per query vector by the batch engine "
+        "and hybrid search",
+    )
+    vectordb_hybrid: bool = Field(
+        False,
+        description="Index BM25-style sparse vectors next to the dense ones and "
+        "fuse both in every search (requires a reindex)",
+    )
+    vectordb_field_vectors: bool = Field(
+        False,
+        description="Index separate title, ingredients and instructions vectors "
+        "instead of one vector of the whole recipe (requires a reindex)",
+    )
+    vectordb_field_strategy: FieldStrategy = Field(
+        FieldStrategy.FUSE, description="How the field vectors are searched"
+    )
+    vectordb_fusion: FusionMethod = Field(
+        FusionMethod.RRF, description="Client-side fusion used by the batch engine"
+    )
+    vectordb_fusion_weights: list[float] = Field(
+        default_factory=list,
+        description="Per-query weights for weighted fusion, in query order "
+        "(missing weights default to 1.0)",
+    )
+    vectordb_hnsw_m: int | None = Field(
+        None,
+        description="HNSW links per node of new collections (None: Qdrant default)",
+    )
+    vectordb_hnsw_ef_construct: int | None = Field(
+        None,
+        description="HNSW build-time neighbours of new collections "
+        "(None: Qdrant default)",
+    )
+    vectordb_hnsw_ef: int | None = Field(
+        None, description="HNSW search-time neighbours per query (None: Qdrant default)"
+    )
+    vectordb_on_disk: bool = Field(
+        False, description="Keep the original vectors of new collections on disk"
+    )
+    vectordb_quantization: Quantization = Field(
+        Quantization.NONE, description="Quantization of the vectors of new collections"
+    )
+    vectordb_quantization_rescore: bool = Field(
+        True,
+        description="Rescore quantized search candidates with the original vectors",
+    )
+    vectordb_quantization_oversampling: float | None = Field(
+        None,
+        description="Candidates searched per result before rescoring, e.g. 2.0 "
+        "(None: Qdrant default)",
+    )
     # embedding_model: str = "nomic-embed-text"
     embedding_model: str = Field("bge-m3", description="Embedding Model")
+    embedding_keep_alive: str | None = Field(
+        None,
+        description="How long Ollama keeps the embedding model loaded "
+        "(None: Ollama default)",
+    )
+    embedding_batch_size: int = Field(
+        16, description="Number of texts sent per embedding request"
+    )
+    embedding_batch_sizes: dict[str, int] = Field(
+        default_factory=dict,
+        description='Per embedding model batch size overrides, e.g. {"bge-m3": 32}',
+    )
+    embedding_cache_path: str | None = Field(
+        None, description="Path of the on-disk embedding cache, disabled if unset"
+    )
+    embedding_cache_max_mb: int = Field(
+        512, description="Maximum size of the embedding cache in MB"
+    )
+    query_embedding_cache_size: int = Field(
+        1024, description="Maximum number of cached query embeddings (0: disabled)"
+    )
+    query_embedding_cache_ttl: float | None = Field(
+        3600, description="Seconds a cached query embedding is kept (None: forever)"
+    )
+    query_embedding_cache_path: str | None = Field(
+        None, description="Path of a query embedding cache shared between processes"
+    )
+    query_embedding_cache_max_mb: int = Field(
+        64, description="Maximum size of the shared query embedding cache in MB"
+    )
+    query_expansion_cache_size: int = Field(
+        0,
+        description="Maximum number of cached multi-query expansions (0: disabled)",
+    )
+    query_expansion_cache_ttl: float | None = Field(
+        86400, description="Seconds a cached expansion is kept (None: forever)"
+    )
+    query_expansion_cache_path: str | None = Field(
+        None, description="Path of the on-disk multi-query expansion cache"
+    )
+    query_expansion_cache_path_max_entries: int = Field(
+        10000, description="Maximum number of expansions stored on disk"
+    )
+    answer_cache_size: int = Field(
+        0, description="Maximum number of cached LLM answers (0: disabled)"
+    )
+    answer_cache_ttl: float | None = Field(
+        3600, description="Seconds a cached answer is kept (None: forever)"
+    )
+    answer_cache_path: str | None = Field(
+        None, description="Path of the on-disk LLM answer cache"
+    )
+    answer_cache_path_max_entries: int = Field(
+        10000, description="Maximum number of LLM answers stored on disk"
+    )
+    semantic_answer_cache_size: int = Field(
+        0,
+        description="Maximum number of answers matched by question similarity "
+        "(0: disabled)",
+    )
+    semantic_answer_cache_threshold: float = Field(
+        0.92, description="Minimum cosine similarity of questions sharing an answer"
+    )
+    semantic_answer_cache_ttl: float | None = Field(
+        3600, description="Seconds a semantically cached answer is kept (None: forever)"
+    )
 
     llm_model: str = Field("llama3.1:8b", description="LLM Model")
     llm_temperature: float = Field(0.2, description="LLM Temperature")
     llm_seed: int | None = Field(None, description="LLM Seed")
+    llm_num_ctx: int | None = Field(
+        None,
+        description="Fixed LLM context window, which keeps Ollama from reloading "
+        "the model and dropping its cached prompt prefix (None: Ollama default)",
+    )
+    llm_keep_alive: str | None = Field(
+        None, description="How long Ollama keeps the LLM loaded (None: Ollama default)"
+    )
+    model_warmup: bool = Field(
+        False,
+        description="Load the embedding model and the LLM in the background at "
+        "service start, reporting healthy only once loaded",
+    )
+    context_token_budget: int = Field(
+        3000,
+        description="Approximate maximum tokens of recipe context sent to the LLM "
+        "(0: unlimited)",
+    )
 
     ui_port: int = Field(7860, description="Port to serve the UI on")
     ui_username: str = Field("mealie", description="UI Username")
     ui_password: SecretStr = Field("rag", description="UI Password")
+    ui_concurrency_limit: int | None = Field(
+        32, description="Maximum concurrent chats served by the UI (None: unlimited)"
+    )
 
     search_strategy: SearchStrategy = Field(
         SearchStrategy.SIMPLE, description="Search Strategy"
     )
+    query_expansion_streaming: bool = Field(
+        False,
+        description="Embed and search each expanded query while the LLM is still "
+        "generating the next ones (multiquery and adaptive strategies only)",
+    )
+    speculative_retrieval: bool = Field(
+        False,
+        description="Search the raw user input while the query expansion runs and "
+        "fuse its hits with the expanded ones (multiquery and adaptive strategies only)",
+    )
+    query_expansion_budget: float | None = Field(
+        None,
+        description="Seconds to wait for the query expansion before answering from "
+        "the raw query hits alone (speculative retrieval only, None: no limit)",
+    )
+    adaptive_simple_max_words: int = Field(
+        3, description="Adaptive strategy: queries up to this many words use SIMPLE"
+    )
+    adaptive_score_margin: float = Field(
+        0.05,
+        description="Adaptive strategy: minimum top-1 score margin of a SIMPLE search "
+        "to skip the multi-query expansion",
+    )
+    search_filters: bool = Field(
+        False,
+        description="Restrict the search to the tags, categories and minimum rating "
+        "mentioned in the question",
+    )
+    vocabulary_ttl: float = Field(
+        600,
+        description="Seconds the known recipe names, tags and categories are kept "
+        "(adaptive strategy and search filters)",
+        # ADAPTIVE_NAMES_TTL is the name from before search filters used it
+        validation_alias=AliasChoices("vocabulary_ttl", "adaptive_names_ttl"),
+    )
 
     # ingest specific settings
     delete_collection_if_exists: bool = Field(
         False, description="Delete the collection if it exists before ingesting"
     )
+    ingest_batch_size: int = Field(
+        32, description="Number of recipes fetched, embedded and upserted per batch"
+    )
+    ingest_queue_size: int = Field(
+        2, description="Maximum number of batches buffered between ingest stages"
+    )
+    ingest_state_path: str = Field(
+        ".mealierag/ingest_state.json",
+        description="Path of the file storing the ingest sync state",
+    )
+
+    metrics_port: int | None = Field(
+        None, description="Port to serve Prometheus metrics on, disabled if unset"
+    )
 
     log_level: str = Field("INFO", description="Log level for the application")
     dependency_log_level: str = Field(
@@ -0,0 +1,189 @@
+"""
+Embedding cache module.
+
+Contains a persistent, content-addressed cache for embeddings.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from .cache import hash_key
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access);
+"""
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache backed by SQLite.
+
+    Vectors are stored as raw float32 arrays keyed by a hash of the model
+    name and the exact text. Least recently used entries are evicted once
+    the cache grows over `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int | None = None):
+        """
+        Initialize the EmbeddingCache.
+
+        Args:
+            path: Path of the SQLite database file
+            max_bytes: Maximum total size of stored vectors, unbounded if None
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        """
+        Look up embeddings for a list of texts.
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            Embeddings in the same order as `texts`, None for cache misses
+        """
+        keys = [hash_key(model, text) for text in texts]
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                rows = self._conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+        results = [found.get(key) for key in keys]
+        hits = sum(1 for r in results if r is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(
+        self, model: str, texts: list[str], embeddings: list[list[float]]
+    ) -> None:
+        """
+        Store embeddings for a list of texts.
+
+        Args:
+            model: Embedding model name
+            texts: Texts that were embedded
+            embeddings: Embeddings in the same order as `texts`
+        """
+        now = time.time()
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            blob = array("f", embedding).tobytes()
+            rows.append((hash_key(model, text), blob, len(blob), now))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def size_bytes(self) -> int:
+        """Total size of the stored vectors, in bytes."""
+        with self._lock:
+            return self._size_bytes()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _size_bytes(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until under the size limit."""
+        if self.max_bytes is None:
+            return
+        excess = self._size_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+
+        evicted = 0
+        freed = 0
+        rows = self._conn.execute(
+            "SELECT key, size FROM embeddings ORDER BY last_access ASC"
+        )
+        keys = []
+        for key, size in rows:
+            if freed >= excess:
+                break
+            keys.append((key,))
+            freed += size
+            evicted += 1
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", keys)
+        logger.debug(
+            "Evicted embeddings from cache",
+            extra={"evicted": evicted, "freed_bytes": freed},
+        )
+
+
+_caches: dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(
+    path: str | None, max_bytes: int | None = None
+) -> EmbeddingCache | None:
+    """
+    Get the shared embedding cache for a path.
+
+    Args:
+        path: Path of the cache database, None to disable caching
+        max_bytes: Maximum total size of stored vectors
+
+    Returns:
+        EmbeddingCache instance, or None if caching is disabled
+    """
+    if not path:
+        return None
+    with _caches_lock:
+        if path not in _caches:
+            logger.info(f"Using embedding cache at {path}")
+            _caches[path] = EmbeddingCache(path, max_bytes=max_bytes)
+        return _caches[path]
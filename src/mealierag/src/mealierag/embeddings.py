@@ -4,21 +4,141 @@ Embeddings module.
 Contains functions to generate embeddings.
 """
 
+import asyncio
 import logging
+import re
+from functools import partial
 
 import ollama
 
 from .config import Settings
+from .embedding_cache import EmbeddingCache, get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
 
+def get_embedding_batch_size(settings: Settings) -> int:
+    """
+    Get the embedding batch size for the configured embedding model.
+
+    Args:
+        settings: Settings
+
+    Returns:
+        Per-model batch size override if configured, the default batch size otherwise
+    """
+    return settings.embedding_batch_sizes.get(
+        settings.embedding_model, settings.embedding_batch_size
+    )
+
+
+# Ollama error messages of inputs that do not fit the model's context
+_INPUT_TOO_LARGE = re.compile(
+    r"context length|too (large|long)|exceeds|too many tokens", re.IGNORECASE
+)
+
+
+def _is_input_too_large(error: ollama.ResponseError) -> bool:
+    """Check whether the model rejected a batch for its size."""
+    return error.status_code == 413 or bool(_INPUT_TOO_LARGE.search(error.error))
+
+
+def _embed_batch(
+    texts: list[str], ollama_client: ollama.Client, settings: Settings
+) -> list[list[float]]:
+    """
+    Embed a single batch, splitting it in halves if it is too large for the
+    model. Any other error is raised right away.
+    """
+    try:
+        response = ollama_client.embed(model=settings.embedding_model, input=texts)
+        return response["embeddings"]
+    except ollama.ResponseError as e:
+        # Only a batch too large for the model gets smaller when split
+        if len(texts) <= 1 or not _is_input_too_large(e):
+            raise
+        logger.warning(
+            f"Embedding batch of {len(texts)} texts rejected, splitting: {e}"
+        )
+        middle = len(texts) // 2
+        return _embed_batch(texts[:middle], ollama_client, settings) + _embed_batch(
+            texts[middle:], ollama_client, settings
+        )
+
+
+def _batches(texts: list[str], settings: Settings) -> list[list[str]]:
+    """
+    Split texts in batches of the configured size.
+    """
+    batch_size = max(get_embedding_batch_size(settings), 1)
+    return [
+        texts[start : start + batch_size] for start in range(0, len(texts), batch_size)
+    ]
+
+
+def _embed_texts(
+    texts: list[str], ollama_client: ollama.Client, settings: Settings
+) -> list[list[float]]:
+    """
+    Embed texts in batches of the configured size.
+    """
+    embeddings: list[list[float]] = []
+    for batch in _batches(texts, settings):
+        embeddings.extend(_embed_batch(batch, ollama_client, settings))
+    return embeddings
+
+
+def _lookup_cache(
+    texts: list[str], settings: Settings
+) -> tuple[EmbeddingCache | None, list[list[float] | None]]:
+    """
+    Look up texts in the configured embedding cache.
+
+    Returns:
+        The cache (None if disabled) and the cached embeddings, None for misses
+    """
+    cache = get_embedding_cache(
+        settings.embedding_cache_path,
+        max_bytes=settings.embedding_cache_max_mb * 1024 * 1024,
+    )
+    if cache is None:
+        return None, [None] * len(texts)
+
+    embeddings = cache.get_many(settings.embedding_model, texts)
+    misses = sum(1 for embedding in embeddings if embedding is None)
+    logger.debug(
+        "Embedding cache lookup",
+        extra={"hits": len(texts) - misses, "misses": misses},
+    )
+    return cache, embeddings
+
+
+def _fill_missing(
+    cache: EmbeddingCache | None,
+    settings: Settings,
+    texts: list[str],
+    embeddings: list[list[float] | None],
+    missing: list[int],
+    computed: list[list[float]],
+) -> list[list[float]]:
+    """Store computed embeddings in the cache and merge them with the hits."""
+    if cache is not None:
+        cache.put_many(settings.embedding_model, [texts[i] for i in missing], computed)
+    for i, embedding in zip(missing, computed):
+        embeddings[i] = embedding
+    return embeddings
+
+
 def get_embedding(
     texts: list[str], ollama_client: ollama.Client, settings: Settings
 ) -> list[list[float]]:
     """
     Generate embedding for a list of texts.
 
+    Texts are sent to the model in batches of the configured size. A batch
+    that is too large for the model is split automatically. If an embedding
+    cache is configured, only texts missing from it are sent to the model.
+
     Args:
         texts: List of texts to generate embedding for
         ollama_client: Ollama client
@@ -29,7 +149,75 @@ def get_embedding(
     """
     try:
         logger.debug("Generating embedding", extra={"texts": texts})
-        response = ollama_client.embed(model=settings.embedding_model, input=texts)
+        cache, embeddings = _lookup_cache(texts, settings)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        computed = (
+            _embed_texts([texts[i] for i in missing], ollama_client, settings)
+            if missing
+            else []
+        )
+        return _fill_missing(cache, settings, texts, embeddings, missing, computed)
+    except Exception as e:
+        raise Exception(f"Error generating embedding: {e}")
+
+
+async def _aembed_batch(
+    texts: list[str], ollama_client: ollama.AsyncClient, settings: Settings
+) -> list[list[float]]:
+    """
+    Async variant of `_embed_batch`.
+    """
+    try:
+        response = await ollama_client.embed(
+            model=settings.embedding_model, input=texts
+        )
         return response["embeddings"]
+    except ollama.ResponseError as e:
+        # Only a batch too large for the model gets smaller when split
+        if len(texts) <= 1 or not _is_input_too_large(e):
+            raise
+        logger.warning(
+            f"Embedding batch of {len(texts)} texts rejected, splitting: {e}"
+        )
+        middle = len(texts) // 2
+        return await _aembed_batch(
+            texts[:middle], ollama_client, settings
+        ) + await _aembed_batch(texts[middle:], ollama_client, settings)
+
+
+async def aget_embedding(
+    texts: list[str], ollama_client: ollama.AsyncClient, settings: Settings
+) -> list[list[float]]:
+    """
+    Generate embedding for a list of texts with an async Ollama client.
+
+    Behaves like `get_embedding`, batches are sent one after another. The
+    embedding cache is a SQLite database, so its lookups and writes run in a
+    worker thread to keep the event loop responsive.
+
+    Args:
+        texts: List of texts to generate embedding for
+        ollama_client: Async Ollama client
+        settings: Settings
+
+    Returns:
+        List of embeddings for the given texts
+    """
+    try:
+        logger.debug("Generating embedding", extra={"texts": texts})
+        lookup = partial(_lookup_cache, texts, settings)
+        cache, embeddings = (
+            await asyncio.to_thread(lookup)
+            if settings.embedding_cache_path
+            else lookup()
+        )
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        computed: list[list[float]] = []
+        for batch in _batches([texts[i] for i in missing], settings):
+            computed.extend(await _aembed_batch(batch, ollama_client, settings))
+        fill = partial(
+            _fill_missing, cache, settings, texts, embeddings, missing, computed
+        )
+        return await asyncio.to_thread(fill) if cache is not None else fill()
     except Exception as e:
         raise Exception(f"Error generating embedding: {e}")
@@ -0,0 +1,107 @@
+"""
+Filters module.
+
+Contains structured recipe filters, their extraction from user requests and
+their translation to Qdrant payload filters.
+"""
+
+import logging
+import re
+
+from pydantic import BaseModel, Field
+from qdrant_client import models
+
+from .adaptive import tokenize
+
+logger = logging.getLogger(__name__)
+
+# A rating is a number of at most 5 tied to a rating word: "rated 4",
+# "rating of 4.5", "5-star", "4+ stars" or "4 stars". A bare singular
+# "2 star" is left alone, as it usually counts an ingredient like star anise
+_RATING_PATTERN = re.compile(
+    r"\b(?:rated|rating(?:\s+of)?)\s+(?:at\s+least\s+)?([0-5](?:\.\d+)?)\b"
+    r"|\b([0-5](?:\.\d+)?)\s*(?:-\s*stars?|\+\s*stars?|stars)\b",
+    re.IGNORECASE,
+)
+
+
+class RecipeFilter(BaseModel):
+    # Recipes must have all of these tags
+    tags: list[str] = Field(default_factory=list)
+    # Recipes must be in all of these categories
+    categories: list[str] = Field(default_factory=list)
+    min_rating: float | None = None
+
+    def is_empty(self) -> bool:
+        return not self.tags and not self.categories and self.min_rating is None
+
+
+def _mentioned(user_input: str, values: list[str]) -> list[str]:
+    """Known values whose words all appear in the user input."""
+    input_tokens = tokenize(user_input)
+    return [
+        value
+        for value in values
+        if (value_tokens := tokenize(value)) and value_tokens <= input_tokens
+    ]
+
+
+def extract_filter(
+    user_input: str, tags: list[str], categories: list[str]
+) -> RecipeFilter:
+    """
+    Extract a structured filter from a user request.
+
+    Known tags and categories are matched by their words, ignoring case and
+    plurals, and ratings from phrases like "5-star", "4 stars" or "rated 4". For
+    example "5-star vegetarian dinners" yields the "Vegetarian" tag, the
+    "Dinner" category and a minimum rating of 5.
+
+    Args:
+        user_input: The raw user query.
+        tags: Tags of the indexed recipes.
+        categories: Categories of the indexed recipes.
+
+    Returns:
+        The extracted filter, empty if nothing was recognized.
+    """
+    match = _RATING_PATTERN.search(user_input)
+    recipe_filter = RecipeFilter(
+        tags=_mentioned(user_input, tags),
+        categories=_mentioned(user_input, categories),
+        min_rating=float(match.group(1) or match.group(2)) if match else None,
+    )
+    if not recipe_filter.is_empty():
+        logger.debug(
+            "Extracted recipe filter", extra={"filter": recipe_filter.model_dump()}
+        )
+    return recipe_filter
+
+
+def to_qdrant_filter(recipe_filter: RecipeFilter | None) -> models.Filter | None:
+    """
+    Translate a recipe filter to a Qdrant payload filter.
+
+    Args:
+        recipe_filter: The recipe filter.
+
+    Returns:
+        The Qdrant filter, or None if there is nothing to filter on.
+    """
+    if recipe_filter is None or recipe_filter.is_empty():
+        return None
+    must: list[models.Condition] = [
+        models.FieldCondition(key="tags", match=models.MatchValue(value=tag))
+        for tag in recipe_filter.tags
+    ]
+    must += [
+        models.FieldCondition(key="category", match=models.MatchValue(value=category))
+        for category in recipe_filter.categories
+    ]
+    if recipe_filter.min_rating is not None:
+        must.append(
+            models.FieldCondition(
+                key="rating", range=models.Range(gte=recipe_filter.min_rating)
+            )
+        )
+    return models.Filter(must=must)
@@ -0,0 +1,72 @@
+"""
+Ingest state module.
+
+Contains the persistent state shared between ingest runs.
+"""
+
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class IngestCheckpoint(BaseModel):
+    # Ingest mode the checkpoint belongs to ("full" or "reindex")
+    mode: str
+    # Collection being written, the versioned collection when reindexing
+    collection_name: str
+    # Last listing page of the current run whose recipes are committed
+    last_page: int = 0
+    # Distinct recipes listed in committed pages of the current run
+    recipes: int = 0
+    # Points upserted by all runs of the checkpoint
+    indexed: int = 0
+    # Latest recipe update time (naive UTC) in committed pages
+    watermark: datetime | None = None
+
+
+class IngestState(BaseModel):
+    collection_name: str | None = None
+    # Latest recipe update time (naive UTC) covered by a successful sync
+    watermark: datetime | None = None
+    # Progress of an unfinished run, cleared once the run succeeds
+    checkpoint: IngestCheckpoint | None = None
+
+
+def load_ingest_state(path: str) -> IngestState:
+    """
+    Load the ingest state.
+
+    Args:
+        path: Path of the state file
+
+    Returns:
+        Stored state, or an empty state if the file does not exist
+    """
+    state_file = Path(path)
+    if not state_file.exists():
+        return IngestState()
+    try:
+        return IngestState.model_validate_json(state_file.read_text())
+    except Exception as e:
+        raise Exception(f"Error loading ingest state from {path}: {e}") from e
+
+
+def save_ingest_state(path: str, state: IngestState) -> None:
+    """
+    Atomically save the ingest state.
+
+    Args:
+        path: Path of the state file
+        state: State to save
+    """
+    state_file = Path(path)
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = state_file.with_suffix(state_file.suffix + ".tmp")
+    tmp_file.write_text(state.model_dump_json(indent=2))
+    os.replace(tmp_file, state_file)
+    logger.debug("Saved ingest state", extra={"path": path})
@@ -1,15 +1,59 @@
-from collections.abc import Generator
+from collections.abc import AsyncIterator, Generator
 
 import ollama
 
 
 class LLMClient:
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        keep_alive: str | float | None = None,
+        num_ctx: int | None = None,
+        embed_keep_alive: str | float | None = None,
+    ):
+        """
+        Initialize the LLMClient.
+
+        Args:
+            keep_alive: How long the server keeps the chat model loaded after
+                a request, e.g. "30m" (server default if None)
+            num_ctx: Context window of every chat request. Keeping it fixed
+                stops the server from reloading the model, which would drop
+                its cached prompt prefix (server default if None)
+            embed_keep_alive: How long the server keeps the embedding model
+                loaded after a request (server default if None)
+        """
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.embed_keep_alive = embed_keep_alive
+
+    def _chat_kwargs(self, temperature: float, seed: int | None) -> dict:
+        options = {
+            "temperature": temperature,
+        }
+        if seed is not None:
+            options["seed"] = seed
+        if self.num_ctx is not None:
+            options["num_ctx"] = self.num_ctx
+        kwargs = {"options": options}
+        if self.keep_alive is not None:
+            kwargs["keep_alive"] = self.keep_alive
+        return kwargs
+
+    def _embed_kwargs(self, kwargs: dict) -> dict:
+        if self.embed_keep_alive is not None:
+            kwargs.setdefault("keep_alive", self.embed_keep_alive)
+        return kwargs
 
 
 class OllamaClient(LLMClient):
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        keep_alive: str | float | None = None,
+        num_ctx: int | None = None,
+        embed_keep_alive: str | float | None = None,
+    ):
+        super().__init__(keep_alive, num_ctx, embed_keep_alive)
         self.url = url
         self.client = ollama.Client(host=url)
 
@@ -20,16 +64,11 @@ class OllamaClient(LLMClient):
         temperature: float = 0.7,
         seed: int = None,
     ) -> Generator[str, None, None]:
-        options = {
-            "temperature": temperature,
-        }
-        if seed is not None:
-            options["seed"] = seed
         response = self.client.chat(
             model=model,
             messages=messages,
             stream=True,
-            options=options,
+            **self._chat_kwargs(temperature, seed),
         )
 
         return response
@@ -41,18 +80,69 @@ class OllamaClient(LLMClient):
         temperature: float = 0.7,
         seed: int = None,
     ) -> str:
-        options = {
-            "temperature": temperature,
-        }
-        if seed is not None:
-            options["seed"] = seed
         response = self.client.chat(
             model=model,
             messages=messages,
             stream=False,
-            options=options,
+            **self._chat_kwargs(temperature, seed),
         )
         return response["message"]["content"]
 
+    def load(self, model: str) -> None:
+        """
+        Load a chat model without generating, with the keep_alive and context
+        window of chat requests so the next chat does not reload it.
+        """
+        kwargs = self._chat_kwargs(0, None)
+        kwargs["options"].pop("temperature")
+        self.client.generate(model=model, **kwargs)
+
     def embed(self, *args, **kwargs):
-        return self.client.embed(*args, **kwargs)
+        return self.client.embed(*args, **self._embed_kwargs(kwargs))
+
+
+class AsyncOllamaClient(LLMClient):
+    def __init__(
+        self,
+        url: str,
+        keep_alive: str | float | None = None,
+        num_ctx: int | None = None,
+        embed_keep_alive: str | float | None = None,
+    ):
+        super().__init__(keep_alive, num_ctx, embed_keep_alive)
+        self.url = url
+        self.client = ollama.AsyncClient(host=url)
+
+    async def streaming_chat(
+        self,
+        messages: list[dict],
+        model: str,
+        temperature: float = 0.7,
+        seed: int = None,
+    ) -> AsyncIterator[dict]:
+        response = await self.client.chat(
+            model=model,
+            messages=messages,
+            stream=True,
+            **self._chat_kwargs(temperature, seed),
+        )
+
+        return response
+
+    async def chat(
+        self,
+        messages: list[dict],
+        model: str,
+        temperature: float = 0.7,
+        seed: int = None,
+    ) -> str:
+        response = await self.client.chat(
+            model=model,
+            messages=messages,
+            stream=False,
+            **self._chat_kwargs(temperature, seed),
+        )
+        return response["message"]["content"]
+
+    async def embed(self, *args, **kwargs):
+        return await self.client.embed(*args, **self._embed_kwargs(kwargs))
@@ -5,35 +5,69 @@ Contains functions to interact with Mealie, including fetching recipes and recip
 """
 
 import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from .metrics import timed
 from .models import Recipe, RecipeResponse
 
 logger = logging.getLogger(__name__)
 
 
-def fetch_recipes(
-    mealie_api_url: str, mealie_token: str, per_page: int = 10
-) -> list[Recipe]:
+def get_mealie_session(mealie_token: str, pool_size: int = 10) -> requests.Session:
     """
-    Fetch all recipes from Mealie.
+    Get a pooled HTTP session for the Mealie API.
+
+    The session keeps connections alive between requests, so fetching many
+    recipes does not pay a new TCP/TLS handshake per recipe.
 
     Args:
-        mealie_api_url: Mealie API URL
         mealie_token: Mealie token
+        pool_size: Maximum number of pooled connections per host
 
     Returns:
-        List of recipes
+        Configured requests session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Authorization": f"Bearer {mealie_token}"})
+    return session
+
+
+def iter_recipe_pages(
+    mealie_api_url: str,
+    mealie_token: str,
+    per_page: int = 10,
+    session: requests.Session | None = None,
+) -> Iterator[RecipeResponse]:
+    """
+    Iterate over the recipe listing from Mealie, one page at a time.
+
+    Only one page is held in memory at a time, so callers can process
+    arbitrarily large libraries with bounded memory.
+
+    Args:
+        mealie_api_url: Mealie API URL
+        mealie_token: Mealie token
+        per_page: Number of recipes to request per page
+        session: Optional HTTP session to reuse connections
+
+    Yields:
+        Paginated recipe responses
     """
     logger.info(f"Fetching recipes from {mealie_api_url}...")
-    all_recipes: list[Recipe] = []
+    http = session or requests
     page = 1
 
     try:
         while True:
             logger.info(f"Fetching page {page}...")
-            response = requests.get(
+            response = http.get(
                 mealie_api_url,
                 headers={"Authorization": f"Bearer {mealie_token}"},
                 params={"page": page, "perPage": per_page},
@@ -44,12 +78,6 @@ def fetch_recipes(
             if isinstance(data, dict) and "items" in data:
                 try:
                     paginated_response = RecipeResponse(**data)
-                    all_recipes.extend(paginated_response.items)
-
-                    if page >= paginated_response.total_pages:
-                        break
-
-                    page += 1
                 except Exception as validation_err:
                     raise Exception(
                         f"Validation error: {validation_err}"
@@ -59,13 +87,48 @@ def fetch_recipes(
                     f"Unexpected response format: {type(data)}, Full response: {data}"
                 )
 
-        logger.info(f"Fetched {len(all_recipes)} recipes.")
-        return all_recipes
+            yield paginated_response
+
+            if page >= paginated_response.total_pages:
+                break
+
+            page += 1
     except Exception as e:
         raise Exception(f"Error fetching recipes: {e}") from e
 
 
-def fetch_full_recipe(recipe: Recipe, mealie_api_url: str, mealie_token: str) -> Recipe:
+def fetch_recipes(
+    mealie_api_url: str,
+    mealie_token: str,
+    per_page: int = 10,
+    session: requests.Session | None = None,
+) -> list[Recipe]:
+    """
+    Fetch all recipes from Mealie.
+
+    Args:
+        mealie_api_url: Mealie API URL
+        mealie_token: Mealie token
+        per_page: Number of recipes to request per page
+        session: Optional HTTP session to reuse connections
+
+    Returns:
+        List of recipes
+    """
+    all_recipes: list[Recipe] = []
+    for page in iter_recipe_pages(mealie_api_url, mealie_token, per_page, session):
+        all_recipes.extend(page.items)
+
+    logger.info(f"Fetched {len(all_recipes)} recipes.")
+    return all_recipes
+
+
+def fetch_full_recipe(
+    recipe: Recipe,
+    mealie_api_url: str,
+    mealie_token: str,
+    session: requests.Session | None = None,
+) -> Recipe:
     """
     Fetch full recipe details from Mealie.
 
@@ -73,13 +136,15 @@ def fetch_full_recipe(recipe: Recipe, mealie_api_url: str, mealie_token: str) ->
         recipe: Recipe to fetch full details for
         mealie_api_url: Mealie API URL
         mealie_token: Mealie token
+        session: Optional HTTP session to reuse connections
 
     Returns:
         Full recipe details
     """
     logger.info(f"Fetching recipe {recipe.name}...")
+    http = session or requests
     try:
-        response = requests.get(
+        response = http.get(
             f"{mealie_api_url}/{recipe.id}",
             headers={"Authorization": f"Bearer {mealie_token}"},
         )
@@ -89,18 +154,104 @@ def fetch_full_recipe(recipe: Recipe, mealie_api_url: str, mealie_token: str) ->
         raise Exception(f"Error fetching recipe {recipe.id}: {e}") from e
 
 
-def fetch_full_recipes(mealie_api_url: str, mealie_token: str) -> list[Recipe]:
+def fetch_full_recipe_batch(
+    recipes: list[Recipe],
+    mealie_api_url: str,
+    mealie_token: str,
+    session: requests.Session | None = None,
+    executor: ThreadPoolExecutor | None = None,
+) -> list[Recipe]:
+    """
+    Fetch full details for a batch of recipes, keeping their order.
+
+    Args:
+        recipes: Recipes to fetch full details for
+        mealie_api_url: Mealie API URL
+        mealie_token: Mealie token
+        session: Optional HTTP session to reuse connections
+        executor: Optional executor to fetch the recipes concurrently
+
+    Returns:
+        Full recipe details
+    """
+    with timed("mealie_fetch"):
+        if executor is None:
+            return [
+                fetch_full_recipe(recipe, mealie_api_url, mealie_token, session)
+                for recipe in recipes
+            ]
+
+        # executor.map preserves input order regardless of completion order
+        return list(
+            executor.map(
+                lambda recipe: fetch_full_recipe(
+                    recipe, mealie_api_url, mealie_token, session
+                ),
+                recipes,
+            )
+        )
+
+
+def fetch_full_recipes(
+    mealie_api_url: str, mealie_token: str, max_workers: int = 1
+) -> list[Recipe]:
     """
     Fetch all recipes with full details from Mealie.
 
+    Recipe details are fetched concurrently over a shared keep-alive session
+    when `max_workers` is greater than 1. Results keep the listing order.
+
     Args:
         mealie_api_url: Mealie API URL
         mealie_token: Mealie token
+        max_workers: Number of concurrent recipe detail requests
 
     Returns:
         List of recipes
     """
-    recipes = fetch_recipes(mealie_api_url, mealie_token)
-    return [
-        fetch_full_recipe(recipe, mealie_api_url, mealie_token) for recipe in recipes
-    ]
+    with (
+        get_mealie_session(mealie_token, pool_size=max(max_workers, 1)) as session,
+        ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor,
+    ):
+        recipes = fetch_recipes(mealie_api_url, mealie_token, session=session)
+        # Submit every detail request at once, with no barrier between pages
+        return fetch_full_recipe_batch(
+            recipes,
+            mealie_api_url,
+            mealie_token,
+            session,
+            executor if max_workers > 1 else None,
+        )
+
+
+def iter_full_recipe_pages(
+    mealie_api_url: str,
+    mealie_token: str,
+    per_page: int = 10,
+    max_workers: int = 1,
+) -> Iterator[RecipeResponse]:
+    """
+    Iterate over recipes with full details from Mealie, one page at a time.
+
+    Args:
+        mealie_api_url: Mealie API URL
+        mealie_token: Mealie token
+        per_page: Number of recipes to request per page
+        max_workers: Number of concurrent recipe detail requests
+
+    Yields:
+        Paginated responses whose items hold full recipe details
+    """
+    with (
+        get_mealie_session(mealie_token, pool_size=max(max_workers, 1)) as session,
+        ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor,
+    ):
+        for page in iter_recipe_pages(mealie_api_url, mealie_token, per_page, session):
+            items = fetch_full_recipe_batch(
+                page.items,
+                mealie_api_url,
+                mealie_token,
+                session,
+                executor if max_workers > 1 else None,
+            )
+            yield page.model_copy(update={"items": items})
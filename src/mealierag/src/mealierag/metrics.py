@@ -0,0 +1,298 @@
+"""
+Metrics module.
+
+Contains a lightweight latency instrumentation layer: stage timers feeding
+Prometheus-compatible histograms, per-request timing collection for the JSON
+logs, and a small HTTP server exposing `/metrics`.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Metrics rendered on /metrics, in creation order
+_REGISTRY: list["Histogram | Counter"] = []
+
+
+class Histogram:
+    """
+    Thread-safe histogram with a single label, rendered in the Prometheus
+    text exposition format.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label value -> (bucket counts, sum, count)
+        self._series: dict[str, tuple[list[int], float, int]] = {}
+        _REGISTRY.append(self)
+
+    def observe(self, label_value: str, value: float) -> None:
+        """Record a value for the given label."""
+        with self._lock:
+            counts, total, count = self._series.get(
+                label_value, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._series[label_value] = (counts, total + value, count + 1)
+
+    def count(self, label_value: str) -> int:
+        """Number of observations for the given label."""
+        with self._lock:
+            return self._series.get(label_value, ([], 0.0, 0))[2]
+
+    def mean(self, label_value: str) -> float:
+        """Mean of the observations for the given label, 0 without any."""
+        with self._lock:
+            _, total, count = self._series.get(label_value, ([], 0.0, 0))
+            return total / count if count else 0.0
+
+    def render(self) -> str:
+        """Render the histogram in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for label_value, (counts, total, count) in sorted(self._series.items()):
+                label = f'{self.label}="{label_value}"'
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(
+                        f'{self.name}_bucket{{{label},le="{bound}"}} {bucket_count}'
+                    )
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{label}}} {total}")
+                lines.append(f"{self.name}_count{{{label}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter:
+    """
+    Thread-safe counter with labels, rendered in the Prometheus text
+    exposition format.
+    """
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], float] = {}
+        _REGISTRY.append(self)
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increment the counter for the given label values."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Current value for the given label values."""
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> str:
+        """Render the counter in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                labels = ",".join(
+                    f'{label}="{label_value}"'
+                    for label, label_value in zip(self.labels, label_values)
+                )
+                lines.append(
+                    f"{self.name}{{{labels}}} {value}"
+                    if labels
+                    else f"{self.name} {value}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+STAGE_DURATION = Histogram(
+    "mealierag_stage_duration_seconds",
+    "Duration of query and ingest stages in seconds.",
+    label="stage",
+)
+
+CACHE_REQUESTS = Counter(
+    "mealierag_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    labels=("cache", "result"),
+)
+
+_request_timings: ContextVar[dict[str, float] | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def observe(stage: str, seconds: float) -> None:
+    """
+    Record the duration of a stage.
+
+    The duration is added to the stage histogram and, inside a
+    `request_timer` block, to the timings of the current request.
+
+    Args:
+        stage: Stage name
+        seconds: Duration in seconds
+    """
+    STAGE_DURATION.observe(stage, seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = round(timings.get(stage, 0.0) + seconds, 6)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Time the enclosed block as the given stage.
+
+    Args:
+        stage: Stage name
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def request_timer() -> Iterator[dict[str, float]]:
+    """
+    Collect the stage timings of a single request.
+
+    Yields:
+        Dict of stage name to seconds, filled while the block runs. The total
+        request time is added as `total` when the block exits.
+    """
+    timings: dict[str, float] = {}
+    token = _request_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        try:
+            _request_timings.reset(token)
+        except ValueError:
+            # Async generators may be resumed from another context
+            _request_timings.set(None)
+        total = time.perf_counter() - start
+        STAGE_DURATION.observe("request_total", total)
+        timings["total"] = round(total, 6)
+
+
+def timed_stream(stream: Iterator[Any]) -> Iterator[Any]:
+    """
+    Wrap an LLM response stream to record time to first token and total
+    generation time.
+
+    Args:
+        stream: Stream of response chunks
+
+    Yields:
+        The chunks of the wrapped stream
+    """
+    start = time.perf_counter()
+    first = True
+    try:
+        for chunk in stream:
+            if first:
+                observe("llm_first_token", time.perf_counter() - start)
+                first = False
+            yield chunk
+    finally:
+        observe("llm_generation", time.perf_counter() - start)
+
+
+async def atimed_stream(stream: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """
+    Async variant of `timed_stream`.
+    """
+    start = time.perf_counter()
+    first = True
+    try:
+        async for chunk in stream:
+            if first:
+                observe("llm_first_token", time.perf_counter() - start)
+                first = False
+            yield chunk
+    finally:
+        observe("llm_generation", time.perf_counter() - start)
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text format."""
+    return "".join(metric.render() for metric in _REGISTRY)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve `/metrics` in a background thread.
+
+    Args:
+        port: Port to listen on
+        host: Interface to bind
+
+    Returns:
+        The running HTTP server
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    )
+    thread.start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -4,6 +4,8 @@ Models module.
 Contains Pydantic models for Mealie API responses.
 """
 
+from datetime import UTC, datetime
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -65,6 +67,46 @@ class Recipe(BaseModel):
             text_content += f"- {step.get_text_for_embedding()}\n"
         return text_content
 
+    def get_field_texts_for_embedding(self) -> dict[str, str]:
+        """
+        Get the texts of the separately embedded recipe fields.
+
+        Returns:
+            Title (with description, category and tags), ingredients and
+            instructions texts keyed by field name. Empty fields are left out.
+        """
+        fields = {
+            "title": f"Title: {self.name}\nDescription: {self.description}\nCategory: {', '.join(self.recipeCategory)}\nTags: {', '.join(self.tags)}\n"
+        }
+        if self.recipeIngredient:
+            fields["ingredients"] = "Ingredients:\n" + "".join(
+                f"- {ing.get_text_for_embedding()}\n" for ing in self.recipeIngredient
+            )
+        if self.recipeInstructions:
+            fields["instructions"] = "Instructions:\n" + "".join(
+                f"- {step.get_text_for_embedding()}\n"
+                for step in self.recipeInstructions
+            )
+        return fields
+
+    def get_updated_at(self) -> datetime | None:
+        """
+        Get the last update time of the recipe as a naive UTC datetime.
+
+        Returns:
+            `updatedAt` (falling back to `dateUpdated`), None if unknown or invalid
+        """
+        value = self.updatedAt or self.dateUpdated
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(UTC).replace(tzinfo=None)
+        return parsed
+
 
 class RecipeResponse(BaseModel):
     page: int
@@ -0,0 +1,127 @@
+"""
+Pipeline module.
+
+Contains a small threaded pipeline to stream items through processing stages
+connected by bounded queues.
+"""
+
+import logging
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class _Failure:
+    """Marker carrying an exception raised in an upstream stage."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put an item, giving up if the pipeline is being stopped."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _source_worker(source: Iterable, out_q: queue.Queue, stop: threading.Event):
+    try:
+        for item in source:
+            if not _put(out_q, item, stop):
+                return
+        _put(out_q, _DONE, stop)
+    except BaseException as e:
+        _put(out_q, _Failure(e), stop)
+
+
+def _stage_worker(
+    stage: Callable[[Any], Any],
+    in_q: queue.Queue,
+    out_q: queue.Queue,
+    stop: threading.Event,
+):
+    while not stop.is_set():
+        try:
+            item = in_q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _DONE or isinstance(item, _Failure):
+            _put(out_q, item, stop)
+            return
+        try:
+            result = stage(item)
+        except BaseException as e:
+            _put(out_q, _Failure(e), stop)
+            return
+        if not _put(out_q, result, stop):
+            return
+
+
+def run_pipeline(
+    source: Iterable,
+    stages: list[Callable[[Any], Any]],
+    queue_size: int = 2,
+) -> Iterator[Any]:
+    """
+    Stream items from a source through a chain of stages.
+
+    The source and each stage run in their own thread and are connected by
+    bounded queues. A slow stage blocks the upstream ones once its input
+    queue is full, so at most `queue_size` items wait between two stages.
+
+    Args:
+        source: Iterable producing the items
+        stages: Functions applied in order to every item
+        queue_size: Maximum number of items buffered between two stages
+
+    Yields:
+        Results of the last stage, in source order
+
+    Raises:
+        Exception: The first exception raised by the source or any stage
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    threads = [
+        threading.Thread(
+            target=_source_worker,
+            args=(source, queues[0], stop),
+            name="pipeline-source",
+            daemon=True,
+        )
+    ]
+    for i, stage in enumerate(stages):
+        threads.append(
+            threading.Thread(
+                target=_stage_worker,
+                args=(stage, queues[i], queues[i + 1], stop),
+                name=f"pipeline-stage-{i}",
+                daemon=True,
+            )
+        )
+
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1)
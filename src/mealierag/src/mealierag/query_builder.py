@@ -1,8 +1,11 @@
+import asyncio
 import logging
 import re
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterator
 
-from .llm_client import OllamaClient
+from .cache import TTLCache, hash_key, normalize_text
+from .llm_client import AsyncOllamaClient, OllamaClient
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +53,31 @@ class QueryBuilder(ABC):
         """
         return self.build(user_input)
 
+    async def abuild(self, user_input: str) -> list[str]:
+        """
+        Async variant of `build`.
+
+        Builders that do not perform I/O can rely on this default, which
+        simply calls `build`.
+        """
+        return self.build(user_input)
+
+    def stream(self, user_input: str) -> Iterator[str]:
+        """
+        Yield search queries as soon as each one is available.
+
+        Builders that cannot produce queries incrementally can rely on this
+        default, which yields the result of `build`.
+        """
+        yield from self.build(user_input)
+
+    async def astream(self, user_input: str) -> AsyncIterator[str]:
+        """
+        Async variant of `stream`.
+        """
+        for query in await self.abuild(user_input):
+            yield query
+
 
 class DefaultQueryBuilder(QueryBuilder):
     """
@@ -66,14 +94,20 @@ class DefaultQueryBuilder(QueryBuilder):
 class MultiQueryQueryBuilder(QueryBuilder):
     """
     Uses an LLM to generate multiple variations of the user's query.
+
+    Use `build` with an `OllamaClient` and `abuild` with an `AsyncOllamaClient`.
+    If a cache is given, expansions are reused for inputs that only differ in
+    case or whitespace, as long as the model, temperature, seed and prompt
+    are the same.
     """
 
     def __init__(
         self,
-        ollama_client: OllamaClient,
+        ollama_client: OllamaClient | AsyncOllamaClient,
         model: str,
         temperature: float,
         seed: int,
+        cache: TTLCache[list[str]] | None = None,
     ):
         """
         Initialize the MultiQueryQueryBuilder.
@@ -83,12 +117,14 @@ class MultiQueryQueryBuilder(QueryBuilder):
             model: The name of the LLM model to use.
             temperature: Sampling temperature for the LLM.
             seed: Random seed for reproducibility.
+            cache: Optional cache of expansion results.
         """
         self.system_prompt = MULTI_QUERY_PROMPT
         self.ollama_client = ollama_client
         self.model = model
         self.temperature = temperature
         self.seed = seed
+        self.cache = cache
 
     def build(self, user_input: str) -> list[str]:
         """
@@ -100,17 +136,16 @@ class MultiQueryQueryBuilder(QueryBuilder):
         Returns:
             A list of generated search queries.
         """
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": user_input},
-        ]
-
         logger.debug(
             "Generating multi-query variations", extra={"user_input": user_input}
         )
 
+        cache_key, cached = self._cached_queries(user_input)
+        if cached is not None:
+            return cached
+
         response = self.ollama_client.chat(
-            messages=messages,
+            messages=self._build_messages(user_input),
             model=self.model,
             temperature=self.temperature,
             seed=self.seed,
@@ -118,8 +153,176 @@ class MultiQueryQueryBuilder(QueryBuilder):
         logger.debug("Generated queries", extra={"response": response})
         queries = self._parse_response(response)
         logger.debug("Parsed queries", extra={"queries": queries})
+        self._cache_queries(cache_key, queries)
         return queries
 
+    async def abuild(self, user_input: str) -> list[str]:
+        """
+        Generate multiple search queries with an async Ollama client.
+
+        The cache may be backed by SQLite, so it is read and written in a
+        worker thread.
+
+        Args:
+            user_input: The raw user query.
+
+        Returns:
+            A list of generated search queries.
+        """
+        logger.debug(
+            "Generating multi-query variations", extra={"user_input": user_input}
+        )
+
+        cache_key, cached = await asyncio.to_thread(self._cached_queries, user_input)
+        if cached is not None:
+            return cached
+
+        response = await self.ollama_client.chat(
+            messages=self._build_messages(user_input),
+            model=self.model,
+            temperature=self.temperature,
+            seed=self.seed,
+        )
+        logger.debug("Generated queries", extra={"response": response})
+        queries = self._parse_response(response)
+        logger.debug("Parsed queries", extra={"queries": queries})
+        await asyncio.to_thread(self._cache_queries, cache_key, queries)
+        return queries
+
+    def stream(self, user_input: str) -> Iterator[str]:
+        """
+        Generate multiple search queries, yielding each one as soon as its
+        line of the streamed LLM response is complete.
+
+        Yields the same queries as `build`, in the same order.
+
+        Args:
+            user_input: The raw user query.
+
+        Yields:
+            Generated search queries.
+        """
+        logger.debug(
+            "Streaming multi-query variations", extra={"user_input": user_input}
+        )
+
+        cache_key, cached = self._cached_queries(user_input)
+        if cached is not None:
+            yield from cached
+            return
+
+        response = self.ollama_client.streaming_chat(
+            messages=self._build_messages(user_input),
+            model=self.model,
+            temperature=self.temperature,
+            seed=self.seed,
+        )
+        queries = []
+        buffer = ""
+        for chunk in response:
+            buffer += chunk["message"]["content"]
+            lines, buffer = self._split_complete_lines(buffer)
+            for query in self._parse_response(lines):
+                queries.append(query)
+                yield query
+        for query in self._parse_response(buffer):
+            queries.append(query)
+            yield query
+
+        logger.debug("Streamed queries", extra={"queries": queries})
+        self._cache_queries(cache_key, queries)
+
+    async def astream(self, user_input: str) -> AsyncIterator[str]:
+        """
+        Async variant of `stream`, for use with an `AsyncOllamaClient`.
+
+        Like `abuild`, it reads and writes the cache in a worker thread.
+        """
+        logger.debug(
+            "Streaming multi-query variations", extra={"user_input": user_input}
+        )
+
+        cache_key, cached = await asyncio.to_thread(self._cached_queries, user_input)
+        if cached is not None:
+            for query in cached:
+                yield query
+            return
+
+        response = await self.ollama_client.streaming_chat(
+            messages=self._build_messages(user_input),
+            model=self.model,
+            temperature=self.temperature,
+            seed=self.seed,
+        )
+        queries = []
+        buffer = ""
+        async for chunk in response:
+            buffer += chunk["message"]["content"]
+            lines, buffer = self._split_complete_lines(buffer)
+            for query in self._parse_response(lines):
+                queries.append(query)
+                yield query
+        for query in self._parse_response(buffer):
+            queries.append(query)
+            yield query
+
+        logger.debug("Streamed queries", extra={"queries": queries})
+        await asyncio.to_thread(self._cache_queries, cache_key, queries)
+
+    @staticmethod
+    def _split_complete_lines(buffer: str) -> tuple[str, str]:
+        """
+        Split a partial response into its complete lines and the unfinished
+        last line.
+        """
+        lines = buffer.splitlines(keepends=True)
+        if lines and lines[-1].splitlines()[0] == lines[-1]:
+            return "".join(lines[:-1]), lines[-1]
+        return buffer, ""
+
+    def _cached_queries(self, user_input: str) -> tuple[str, list[str] | None]:
+        """
+        Look up the expansion of a user input in the cache.
+
+        Returns:
+            The cache key and a copy of the cached queries, None on a miss or
+            without a cache
+        """
+        cache_key = self._cache_key(user_input)
+        cached = self.cache.get(cache_key) if self.cache is not None else None
+        if cached is None:
+            return cache_key, None
+        logger.debug("Using cached queries", extra={"queries": cached})
+        return cache_key, list(cached)
+
+    def _cache_queries(self, cache_key: str, queries: list[str]) -> None:
+        """
+        Store a non-empty expansion in the cache.
+        """
+        if self.cache is not None and queries:
+            self.cache.put(cache_key, queries)
+
+    def _cache_key(self, user_input: str) -> str:
+        """
+        Build the expansion cache key for a user input.
+        """
+        return hash_key(
+            normalize_text(user_input),
+            self.model,
+            self.temperature,
+            self.seed,
+            self.system_prompt,
+        )
+
+    def _build_messages(self, user_input: str) -> list[dict[str, str]]:
+        """
+        Build the chat messages asking for query variations.
+        """
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_input},
+        ]
+
     def _parse_response(self, response: str) -> list[str]:
         """
         Parse and clean the LLM response into a list of queries.
@@ -13,7 +13,11 @@ logger = logging.getLogger(__name__)
 
 
 def main():
-    recipes = fetch_full_recipes(settings.mealie_api_url, settings.mealie_token)
+    recipes = fetch_full_recipes(
+        settings.mealie_api_url,
+        settings.mealie_token,
+        max_workers=settings.mealie_fetch_workers,
+    )
     logger.info(f"Successfully fetched {len(recipes)} recipes.")
 
     if recipes:
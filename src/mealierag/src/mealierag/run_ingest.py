@@ -1,16 +1,65 @@
 """
 Ingest Mealie recipes into the vector database.
+
+Recipes are streamed from Mealie page by page and flow through a pipeline of
+bounded stages (fetch -> embed -> upsert), so memory stays flat as the
+library grows and the first points reach Qdrant early.
+
+In incremental mode only recipes updated since the last successful sync are
+fetched and re-indexed, and recipes removed from Mealie are deleted.
+
+Full and reindex runs checkpoint every committed page to the state file, so
+an interrupted run can be continued with `--resume`.
 """
 
 import logging
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
 
 import ollama
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance,
+    Modifier,
+    PointStruct,
+    SparseVectorParams,
+    VectorParams,
+)
 
+from .cache import hash_key
 from .config import settings
 from .embeddings import get_embedding
-from .mealie import fetch_full_recipes
-from .vectordb import get_vector_db_client
+from .ingest_state import (
+    IngestCheckpoint,
+    IngestState,
+    load_ingest_state,
+    save_ingest_state,
+)
+from .mealie import (
+    fetch_full_recipe_batch,
+    get_mealie_session,
+    iter_full_recipe_pages,
+    iter_recipe_pages,
+)
+from .metrics import timed
+from .models import Recipe, RecipeResponse
+from .pipeline import run_pipeline
+from .sparse import encode_document
+from .vectordb import (
+    FIELD_VECTOR_NAMES,
+    SPARSE_VECTOR_NAME,
+    create_payload_indexes,
+    delete_old_versions,
+    delete_recipes,
+    get_content_hashes,
+    get_hnsw_config,
+    get_quantization_config,
+    get_vector_db_client,
+    list_indexed_recipe_ids,
+    recipe_point_id,
+    switch_alias,
+)
 
 # Client initialization
 ollama_client = ollama.Client(host=settings.ollama_base_url)
@@ -18,68 +67,459 @@ ollama_client = ollama.Client(host=settings.ollama_base_url)
 logger = logging.getLogger(__name__)
 
 
-def main():
+def recipe_payload(recipe: Recipe) -> dict:
+    """
+    Build the Qdrant payload of a recipe, without its content hash.
+
+    Args:
+        recipe: Recipe
+
+    Returns:
+        Payload holding the text used for the embedding
+    """
+    return {
+        "recipe_id": recipe.id,
+        "slug": recipe.slug,
+        "name": recipe.name,
+        "category": recipe.recipeCategory,
+        "tags": recipe.tags,
+        "rating": recipe.rating,
+        "text": recipe.get_text_for_embedding(),
+    }
+
+
+def vector_layout() -> str:
+    """Describe the vectors of new points, as configured."""
+    return (
+        f"hybrid={settings.vectordb_hybrid},"
+        f"field_vectors={settings.vectordb_field_vectors}"
+    )
+
+
+def content_hash(payload: dict, model: str, layout: str) -> str:
+    """
+    Hash the indexed content of a recipe.
+
+    Args:
+        payload: Point payload, including the embedded text
+        model: Embedding model name
+        layout: Vector layout of the point, see `vector_layout`
+
+    Returns:
+        Hex digest changing whenever the payload, the model or the vector
+        layout changes
+    """
+    return hash_key(model, layout, payload)
+
+
+def build_points(
+    client: QdrantClient, collection_name: str, recipes: list[Recipe]
+) -> list[PointStruct]:
+    """
+    Embed a batch of recipes and build the corresponding Qdrant points.
+
+    Recipes whose point already holds the same content hash are skipped, so
+    they are neither re-embedded nor re-upserted. The hash covers the whole
+    payload, so a change to a payload-only field such as the slug used in
+    links is upserted as well. With field vectors enabled, each point holds
+    one named vector per recipe field instead of a single vector, and with
+    hybrid search enabled, a BM25-style sparse vector of the text as well.
+
+    Args:
+        client: Qdrant client
+        collection_name: Collection the points are written to
+        recipes: Recipes to embed
+
+    Returns:
+        List of points ready to be upserted
+    """
+    layout = vector_layout()
+    candidates = []
+    for r in recipes:
+        payload = recipe_payload(r)
+        # Point IDs are derived from the Mealie ID so re-runs overwrite in place
+        point_id = recipe_point_id(r.id or r.slug)
+        payload["content_hash"] = content_hash(
+            payload, settings.embedding_model, layout
+        )
+        candidates.append((r, payload, point_id))
+
+    existing = get_content_hashes(client, collection_name, [c[2] for c in candidates])
+    changed = [c for c in candidates if existing.get(c[2]) != c[1]["content_hash"]]
+    if len(changed) < len(candidates):
+        logger.info(f"Skipping {len(candidates) - len(changed)} unchanged recipes.")
+
+    with timed("ingest_embed"):
+        vectors = _embed_recipes([(r, payload["text"]) for r, payload, _ in changed])
+
+    return [
+        PointStruct(id=point_id, vector=vector, payload=payload)
+        for (_, payload, point_id), vector in zip(changed, vectors)
+    ]
+
+
+def _embed_recipes(recipes: list[tuple[Recipe, str]]) -> list[dict | list[float]]:
+    """
+    Build the vectors of recipes given with their full text.
+
+    The texts of all recipes, or all their fields, are embedded with a single
+    `get_embedding` call, which splits them into model-sized batches.
+    """
+    if not recipes:
+        return []
+    if settings.vectordb_field_vectors:
+        fields = [
+            (i, name, field_text)
+            for i, (r, _) in enumerate(recipes)
+            for name, field_text in r.get_field_texts_for_embedding().items()
+        ]
+        embeddings = get_embedding(
+            [field_text for _, _, field_text in fields], ollama_client, settings
+        )
+        vectors: list[dict] = [{} for _ in recipes]
+        for (i, name, _), embedding in zip(fields, embeddings):
+            vectors[i][name] = embedding
+    else:
+        embeddings = get_embedding(
+            [text for _, text in recipes], ollama_client, settings
+        )
+        if not settings.vectordb_hybrid:
+            return embeddings
+        vectors = [{"": embedding} for embedding in embeddings]
+
+    if settings.vectordb_hybrid:
+        for vector, (_, text) in zip(vectors, recipes):
+            vector[SPARSE_VECTOR_NAME] = encode_document(text)
+    return vectors
+
+
+def upsert_points(
+    client: QdrantClient, collection_name: str, points: list[PointStruct]
+) -> int:
+    """
+    Upsert a batch of points into a collection.
+
+    Point IDs are deterministic, so upserting is idempotent.
+
+    Args:
+        client: Qdrant client
+        collection_name: Collection to upsert into
+        points: Points to upsert
+
+    Returns:
+        Number of upserted points
+    """
+    if points:
+        with timed("ingest_upsert"):
+            client.upsert(collection_name=collection_name, points=points)
+        logger.info(f"Indexed batch of {len(points)} recipes.")
+    return len(points)
+
+
+def _latest(a: datetime | None, b: datetime | None) -> datetime | None:
+    """Return the latest of two optional datetimes."""
+    if a is None or b is None:
+        return a or b
+    return max(a, b)
+
+
+def _iter_changed_batches(
+    pages: Iterable[RecipeResponse],
+    new_state: IngestState,
+    seen_ids: set[str],
+    batch_size: int,
+) -> Iterator[list[Recipe]]:
+    """
+    Yield batches of recipes updated since the current watermark.
+
+    Every listed recipe ID is recorded in `seen_ids`. Recipes without an
+    update time are always considered changed.
+    """
+    watermark = new_state.watermark
+    batch: list[Recipe] = []
+    for page in pages:
+        for recipe in page.items:
+            if recipe.id:
+                seen_ids.add(recipe.id)
+            updated_at = recipe.get_updated_at()
+            new_state.watermark = _latest(new_state.watermark, updated_at)
+            # >= so recipes updated in the same instant as the last sync are not missed
+            if watermark is None or updated_at is None or updated_at >= watermark:
+                batch.append(recipe)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def _run_full(client: QdrantClient, state: IngestState) -> None:
+    """
+    Index every recipe into the checkpoint collection.
+
+    Each listing page is one batch, and the checkpoint is saved after every
+    committed batch. A resumed run lists recipes from the first page again,
+    as pages shift when recipes are added or removed in between, and skips
+    recipes whose point already holds their current content hash. Points of
+    recipes removed from Mealie in between are deleted at the end.
+    """
+    checkpoint = state.checkpoint
+    collection_name = checkpoint.collection_name
+    resumed = checkpoint.last_page > 0
+    if resumed:
+        logger.info(
+            f"Resuming ingest, skipping the {checkpoint.indexed} recipes "
+            "already committed..."
+        )
+    checkpoint.last_page = 0
+    checkpoint.recipes = 0
+    point_ids: set[str] = set()
+    recipe_ids: set[str] = set()
+
+    pages = iter_full_recipe_pages(
+        settings.mealie_api_url,
+        settings.mealie_token,
+        per_page=settings.ingest_batch_size,
+        max_workers=settings.mealie_fetch_workers,
+    )
+
+    def embed_stage(page: RecipeResponse):
+        return page, build_points(client, collection_name, page.items)
+
+    def upsert_stage(item: tuple[RecipeResponse, list[PointStruct]]):
+        page, points = item
+        return page, upsert_points(client, collection_name, points)
+
+    for page, indexed in run_pipeline(
+        pages,
+        stages=[embed_stage, upsert_stage],
+        queue_size=settings.ingest_queue_size,
+    ):
+        checkpoint.last_page = page.page
+        checkpoint.indexed += indexed
+        for recipe in page.items:
+            point_ids.add(recipe_point_id(recipe.id or recipe.slug))
+            if recipe.id:
+                recipe_ids.add(recipe.id)
+            checkpoint.watermark = _latest(
+                checkpoint.watermark, recipe.get_updated_at()
+            )
+        # Distinct recipes, as shifted pages may list a recipe twice
+        checkpoint.recipes = len(point_ids)
+        save_ingest_state(settings.ingest_state_path, state)
+
+    # A run that did not resume started from an empty collection
+    if resumed:
+        removed = list_indexed_recipe_ids(client, collection_name) - recipe_ids
+        if removed:
+            logger.info(f"Deleting {len(removed)} recipes removed from Mealie...")
+            delete_recipes(client, collection_name, sorted(removed))
+
+
+def _run_incremental(
+    client: QdrantClient, collection_name: str, new_state: IngestState
+) -> int:
+    """
+    Re-index recipes changed since the watermark and delete removed ones.
+    Returns the number of indexed recipes.
+    """
+    logger.info(f"Syncing recipes updated since {new_state.watermark}...")
+    # Collections created before payload indexes existed get them now
+    create_payload_indexes(client, collection_name)
+    seen_ids: set[str] = set()
+    workers = max(settings.mealie_fetch_workers, 1)
+    with (
+        get_mealie_session(settings.mealie_token, pool_size=workers) as session,
+        ThreadPoolExecutor(max_workers=workers) as executor,
+    ):
+        pages = iter_recipe_pages(
+            settings.mealie_api_url,
+            settings.mealie_token,
+            per_page=settings.ingest_batch_size,
+            session=session,
+        )
+        indexed = sum(
+            run_pipeline(
+                _iter_changed_batches(
+                    pages, new_state, seen_ids, settings.ingest_batch_size
+                ),
+                stages=[
+                    lambda batch: fetch_full_recipe_batch(
+                        batch,
+                        settings.mealie_api_url,
+                        settings.mealie_token,
+                        session,
+                        executor,
+                    ),
+                    lambda batch: build_points(client, collection_name, batch),
+                    lambda points: upsert_points(client, collection_name, points),
+                ],
+                queue_size=settings.ingest_queue_size,
+            )
+        )
+
+    removed = list_indexed_recipe_ids(client, collection_name) - seen_ids
+    if removed:
+        logger.info(f"Deleting {len(removed)} recipes removed from Mealie...")
+        delete_recipes(client, collection_name, sorted(removed))
+    return indexed
+
+
+def _create_collection(
+    client: QdrantClient, collection_name: str, vector_size: int
+) -> None:
+    """
+    Create a collection for recipe points, with the HNSW, on-disk and
+    quantization settings.
+    """
+    logger.info(f"Creating collection '{collection_name}'...")
+    vector_params = VectorParams(
+        size=vector_size,
+        distance=Distance.COSINE,
+        on_disk=settings.vectordb_on_disk or None,
+    )
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=(
+            dict.fromkeys(FIELD_VECTOR_NAMES, vector_params)
+            if settings.vectordb_field_vectors
+            else vector_params
+        ),
+        sparse_vectors_config=(
+            # Qdrant applies the BM25 inverse document frequency
+            {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+            if settings.vectordb_hybrid
+            else None
+        ),
+        hnsw_config=get_hnsw_config(
+            settings.vectordb_hnsw_m, settings.vectordb_hnsw_ef_construct
+        ),
+        quantization_config=get_quantization_config(settings.vectordb_quantization),
+    )
+    create_payload_indexes(client, collection_name)
+
+
+def _prepare_full(client: QdrantClient, vector_size: int) -> None:
+    """Recreate or create the live collection for a full ingest."""
+    collection_name = settings.vectordb_collection_name
+    if client.collection_exists(collection_name):
+        if settings.delete_collection_if_exists:
+            logger.info(f"Collection '{collection_name}' already exists. Recreating...")
+            client.delete_collection(collection_name)
+        else:
+            raise Exception(f"Collection '{collection_name}' already exists.")
+    _create_collection(client, collection_name, vector_size)
+
+
+def _finish_reindex(client: QdrantClient, checkpoint: IngestCheckpoint) -> None:
+    """
+    Verify the rebuilt collection, then atomically point the collection
+    alias to it and garbage-collect old versions.
+
+    A collection failing verification is kept, with its checkpoint, so it
+    can be inspected or completed with --resume, but the alias is not
+    switched to it.
+    """
+    alias = settings.vectordb_collection_name
+    target = checkpoint.collection_name
+    count = client.count(collection_name=target, exact=True).count
+    if count == 0 or count != checkpoint.recipes:
+        logger.error(
+            f"Reindex verification failed, not switching alias '{alias}' to "
+            f"'{target}'. The collection is kept, run again with --resume."
+        )
+        raise Exception(
+            f"Collection '{target}' holds {count} points, expected {checkpoint.recipes}."
+        )
+
+    switch_alias(client, alias, target)
+    removed = delete_old_versions(client, alias, keep=settings.vectordb_keep_versions)
+    if removed:
+        logger.info(f"Deleted old collection versions: {', '.join(removed)}")
+
+
+def main(incremental: bool = False, reindex: bool = False, resume: bool = False):
+    if incremental and reindex:
+        raise ValueError("Incremental and reindex modes are mutually exclusive.")
+
     # 1. Initialize Qdrant Client
     logger.info(f"Connecting to Qdrant at {settings.vectordb_url}...")
     client = get_vector_db_client(settings.vectordb_url)
 
-    # 2. Get Data
-    # TODO: We fetch full recipes to memory. This is not scalable. We should process them in batches.
-    recipes = fetch_full_recipes(settings.mealie_api_url, settings.mealie_token)
-
-    # 3. Create Collection if not exists
+    # 2. Create Collection if not exists
     logger.info("Determining embedding dimension...")
     dummy_text = "test"
     dummy_embedding = get_embedding([dummy_text], ollama_client, settings)[0]
     vector_size = len(dummy_embedding)
     logger.info(f"Embedding dimension: {vector_size}")
 
-    if client.collection_exists(settings.vectordb_collection_name):
-        if settings.delete_collection_if_exists:
+    state = load_ingest_state(settings.ingest_state_path)
+    alias = settings.vectordb_collection_name
+
+    if incremental:
+        if resume:
             logger.info(
-                f"Collection '{settings.vectordb_collection_name}' already exists. Recreating..."
+                "Incremental ingest skips unchanged recipes, nothing to resume."
             )
-            client.delete_collection(settings.vectordb_collection_name)
+        new_state = IngestState(collection_name=alias)
+        if client.collection_exists(alias):
+            if state.collection_name == alias:
+                new_state.watermark = state.watermark
+            logger.info("Processing and indexing recipes...")
+            indexed = _run_incremental(client, alias, new_state)
+            # Only a successful run moves the watermark forward
+            save_ingest_state(settings.ingest_state_path, new_state)
+            logger.info(f"Successfully indexed {indexed} recipes.")
+            return
+        # Nothing to sync against yet, fall back to a full ingest
+        logger.info(f"Collection '{alias}' not found, running a full ingest...")
+
+    # 3. Resume from the checkpoint of an interrupted run, or start over
+    mode = "reindex" if reindex else "full"
+    checkpoint = state.checkpoint if resume else None
+    if resume and (checkpoint is None or checkpoint.mode != mode):
+        logger.warning(f"No {mode} ingest checkpoint to resume, starting over.")
+        checkpoint = None
+    if checkpoint is not None and not client.collection_exists(
+        checkpoint.collection_name
+    ):
+        logger.warning(
+            f"Checkpoint collection '{checkpoint.collection_name}' is gone, starting over."
+        )
+        checkpoint = None
+
+    if checkpoint is None:
+        if reindex:
+            target = f"{alias}_v{datetime.now(UTC):%Y%m%d%H%M%S}"
+            _create_collection(client, target, vector_size)
         else:
-            raise Exception(
-                f"Collection '{settings.vectordb_collection_name}' already exists."
-            )
+            target = alias
+            _prepare_full(client, vector_size)
+        checkpoint = IngestCheckpoint(mode=mode, collection_name=target)
 
-    logger.info(f"Creating collection '{settings.vectordb_collection_name}'...")
-    client.create_collection(
-        collection_name=settings.vectordb_collection_name,
-        vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
-    )
+    state.checkpoint = checkpoint
+    save_ingest_state(settings.ingest_state_path, state)
 
-    # 4. Process and Upsert
+    # 4. Stream, process and upsert
     logger.info("Processing and indexing recipes...")
-    points = []
-    for idx, r in enumerate(recipes):
-        # Generate embedding
-        embedding = get_embedding(
-            [r.get_text_for_embedding()], ollama_client, settings
-        )[0]
-
-        # Create Point
-        # We use idx as ID (integer). In production, consider UUIDs to avoid collisions in future ingestions.
-        point = PointStruct(
-            id=idx,
-            vector=embedding,
-            payload={
-                "recipe_id": r.id,
-                "slug": r.slug,
-                "name": r.name,
-                "category": r.recipeCategory,
-                "tags": r.tags,
-                "rating": r.rating,
-                "text": r.get_text_for_embedding(),
-            },
+    try:
+        _run_full(client, state)
+    except Exception:
+        logger.error(
+            f"Ingest interrupted after page {checkpoint.last_page}. "
+            "Run again with --resume to continue."
         )
-        points.append(point)
+        raise
 
-    # Upsert batch
-    client.upsert(collection_name=settings.vectordb_collection_name, points=points)
-    logger.info(f"Successfully indexed {len(points)} recipes.")
+    if reindex:
+        _finish_reindex(client, checkpoint)
+
+    # 5. Only a successful run moves the watermark forward
+    save_ingest_state(
+        settings.ingest_state_path,
+        IngestState(collection_name=alias, watermark=checkpoint.watermark),
+    )
+    logger.info(f"Successfully indexed {checkpoint.indexed} recipes.")
 
 
 if __name__ == "__main__":
@@ -7,6 +7,7 @@ import sys
 
 from qdrant_client.http.models import ScoredPoint
 
+from .metrics import request_timer
 from .service import MealieRAGService
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,9 @@ def main():
     print("Welcome to Mealie QA! (Type 'exit' to quit)")
 
     service = MealieRAGService()
+    if not service.warm_up_finished.is_set():
+        print(" 🔥 Warming up models...")
+        service.warm_up_finished.wait()
 
     # Initial check
     if not service.check_health():
@@ -39,38 +43,42 @@ def main():
             if not user_input.strip():
                 continue
 
-            print(" 👾 Consulting the digital oracles...")
-            queries = service.generate_queries(user_input)
-
-            print(" 🔍 Finding relevant recipes...")
-
-            hits = service.retrieve_recipes(queries)
-
-            if not hits:
-                print("No relevant recipes found.")
-                continue
-            print_hits(hits)
-
-            # Populate messages
-            messages = service.populate_messages(user_input, hits)
-
-            # Generate response
-            print("\nThinking...\n", end="", flush=True)
-            try:
-                response_stream = service.chat(messages)
-                print("\r🤖 MealieChef: ", end="")
-                for chunk in response_stream:
-                    content = chunk["message"]["content"]
-                    print(content, end="", flush=True)
-                print("\n")
-            except Exception as e:
-                logger.error(f"Error generating response: {e}", exc_info=True)
-                print("Sorry, I encountered an error talking to the AI.")
+            with request_timer() as timings:
+                answer(service, user_input)
+            logger.info("Request completed", extra={"timings": timings})
 
         except KeyboardInterrupt:
             print("\nGoodbye!")
             break
 
 
+def answer(service: MealieRAGService, user_input: str):
+    print(" 👾 Consulting the digital oracles...")
+    print(" 🔍 Finding relevant recipes...")
+
+    hits = service.find_recipes(user_input)
+
+    if not hits:
+        print("No relevant recipes found.")
+        return
+    print_hits(hits)
+
+    # Populate messages
+    messages = service.populate_messages(user_input, hits)
+
+    # Generate response
+    print("\nThinking...\n", end="", flush=True)
+    try:
+        response_stream = service.chat(messages, user_input, hits)
+        print("\r🤖 MealieChef: ", end="")
+        for chunk in response_stream:
+            content = chunk["message"]["content"]
+            print(content, end="", flush=True)
+        print("\n")
+    except Exception as e:
+        logger.error(f"Error generating response: {e}", exc_info=True)
+        print("Sorry, I encountered an error talking to the AI.")
+
+
 if __name__ == "__main__":
     main()
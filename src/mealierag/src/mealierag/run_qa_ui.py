@@ -2,18 +2,21 @@
 Serve the QA Rag interface in the browser.
 """
 
+import asyncio
 import logging
 
 import gradio as gr
 from qdrant_client.http.models import ScoredPoint
 
 from .config import settings
-from .service import MealieRAGService
+from .metrics import request_timer
+from .service import AsyncMealieRAGService
 
 logger = logging.getLogger(__name__)
 
-# Initialize service
-service = MealieRAGService()
+# Initialize service. The async service lets a single worker serve many
+# concurrent chats without a thread per in-flight LLM stream.
+service = AsyncMealieRAGService()
 
 
 def print_hits(hits: list[ScoredPoint]):
@@ -27,16 +30,27 @@ def print_hits(hits: list[ScoredPoint]):
     return hits_table
 
 
-def chat_fn(message: str, history: list[list[str]]):
+async def chat_fn(message: str, history: list[list[str]]):
+    with request_timer() as timings:
+        async for partial in _chat(message):
+            yield partial
+    logger.info("Request completed", extra={"timings": timings})
+
+
+async def _chat(message: str):
+    if not service.models_ready.is_set():
+        yield " 🔥 Warming up models..."
+        # Wait off the event loop; after a failed warm-up the request loads
+        # the models itself, or reports the error
+        await asyncio.to_thread(service.warm_up_finished.wait)
+
     partial = " 👾 Consulting the digital oracles..."
     yield partial
 
-    queries = service.generate_queries(message)
-
     partial += "\n 🔍 Finding relevant recipes..."
     yield partial
 
-    hits = service.retrieve_recipes(queries)
+    hits = await service.find_recipes(message)
 
     if not hits:
         yield "I couldn't find any relevant recipes."
@@ -50,10 +64,10 @@ def chat_fn(message: str, history: list[list[str]]):
     messages = service.populate_messages(message, hits)
 
     logger.debug("Generating response...")
-    response_stream = service.chat(messages)
+    response_stream = await service.chat(messages, message, hits)
 
     partial = "**🤖 MealieChef:**\n"
-    for chunk in response_stream:
+    async for chunk in response_stream:
         partial += chunk["message"]["content"]
         yield partial
 
@@ -72,6 +86,7 @@ with gr.Blocks(title="🍳 MealieChef") as demo:
         fn=chat_fn,
         chatbot=gr.Chatbot(height=500),
         textbox=gr.Textbox(placeholder="Ask me about your recipes...", scale=7),
+        concurrency_limit=settings.ui_concurrency_limit,
     )
     logout_button = gr.Button("Logout", link="/logout")
 
@@ -1,65 +1,661 @@
+import asyncio
+import contextvars
 import logging
-from collections.abc import Generator
-from typing import Any
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from contextlib import closing
+from functools import partial
+from typing import Any, NamedTuple
 
+from qdrant_client.http import models
 from qdrant_client.http.models import ScoredPoint
 
+from .adaptive import (
+    AMBIGUOUS,
+    FUSED_SCORES,
+    SCORE_MARGIN,
+    record_strategy,
+    score_margin,
+    select_by_query,
+    tokenize_names,
+)
+from .answer_cache import (
+    AnswerCache,
+    SemanticAnswerCache,
+    answer_key,
+    arecord_answer,
+    areplay,
+    record_answer,
+    replay,
+)
+from .cache import SQLiteStore, TTLCache, hash_key, normalize_text
 from .chat import populate_messages
-from .config import SearchStrategy, settings
-from .embeddings import get_embedding
-from .llm_client import OllamaClient
+from .config import (
+    FieldStrategy,
+    FusionMethod,
+    SearchEngine,
+    SearchStrategy,
+    settings,
+)
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .embeddings import aget_embedding, get_embedding
+from .filters import RecipeFilter, extract_filter, to_qdrant_filter
+from .llm_client import AsyncOllamaClient, OllamaClient
+from .metrics import atimed_stream, timed, timed_stream
 from .query_builder import DefaultQueryBuilder, MultiQueryQueryBuilder
+from .sparse import encode_query
 from .vectordb import (
+    FIELD_VECTOR_NAMES,
+    ahas_matching_points,
+    alist_payload_values,
+    aretrieve_results_batch,
+    aretrieve_results_best_field,
+    aretrieve_results_hybrid,
+    aretrieve_results_rrf,
+    aretrieve_results_simple,
+    fuse_results,
+    get_async_vector_db_client,
+    get_search_params,
     get_vector_db_client,
+    has_matching_points,
+    list_payload_values,
+    retrieve_results_batch,
+    retrieve_results_best_field,
+    retrieve_results_hybrid,
     retrieve_results_rrf,
     retrieve_results_simple,
 )
 
 logger = logging.getLogger(__name__)
 
+# Payload keys whose values are matched against the user input
+VOCABULARY_KEYS = ["name", "tags", "category"]
+
+# Upper bound on expanded queries embedded and searched concurrently
+MAX_PARALLEL_QUERIES = 8
+
+# Upper bound on concurrent query expansions of the sync service
+MAX_PARALLEL_EXPANSIONS = 4
+
+
+def _cache_store(path: str | None, max_entries: int) -> SQLiteStore | None:
+    """Create the on-disk store of a cache, None if it has no path."""
+    return SQLiteStore(path, max_entries=max_entries) if path else None
+
+
+def _query_embedding_cache() -> TTLCache[list[float]] | None:
+    """Create the in-process query embedding cache from the settings."""
+    if settings.query_embedding_cache_size <= 0:
+        return None
+    return TTLCache(
+        "query_embedding",
+        settings.query_embedding_cache_size,
+        ttl=settings.query_embedding_cache_ttl,
+    )
+
+
+def _shared_query_embedding_cache() -> EmbeddingCache | None:
+    """Open the on-disk query embedding cache shared between processes."""
+    return get_embedding_cache(
+        settings.query_embedding_cache_path,
+        max_bytes=settings.query_embedding_cache_max_mb * 1024 * 1024,
+    )
+
+
+def _query_expansion_cache() -> TTLCache[list[str]] | None:
+    """Create the multi-query expansion cache from the settings."""
+    store = _cache_store(
+        settings.query_expansion_cache_path,
+        settings.query_expansion_cache_path_max_entries,
+    )
+    if settings.query_expansion_cache_size <= 0 and store is None:
+        return None
+    return TTLCache(
+        "query_expansion",
+        settings.query_expansion_cache_size,
+        ttl=settings.query_expansion_cache_ttl,
+        store=store,
+    )
+
+
+def _answer_cache() -> AnswerCache | None:
+    """Create the LLM answer cache from the settings."""
+    store = _cache_store(
+        settings.answer_cache_path, settings.answer_cache_path_max_entries
+    )
+    if settings.answer_cache_size <= 0 and store is None:
+        return None
+    return AnswerCache(
+        settings.answer_cache_size, ttl=settings.answer_cache_ttl, store=store
+    )
+
+
+def _semantic_answer_cache() -> SemanticAnswerCache | None:
+    """Create the semantic LLM answer cache from the settings."""
+    if settings.semantic_answer_cache_size <= 0:
+        return None
+    return SemanticAnswerCache(
+        settings.semantic_answer_cache_size,
+        threshold=settings.semantic_answer_cache_threshold,
+        ttl=settings.semantic_answer_cache_ttl,
+    )
+
+
+def _ollama_client_options() -> dict[str, Any]:
+    """Keep-alive and context window options of the Ollama clients."""
+    return {
+        "keep_alive": settings.llm_keep_alive,
+        "num_ctx": settings.llm_num_ctx,
+        "embed_keep_alive": settings.embedding_keep_alive,
+    }
+
+
+def warm_up_models() -> None:
+    """
+    Load the embedding model and the LLM into Ollama.
+
+    Both are loaded with the keep-alive and context window of later requests,
+    so they stay resident and the first question does not pay the model load.
+    """
+    client = OllamaClient(settings.ollama_base_url, **_ollama_client_options())
+    start = time.perf_counter()
+    client.embed(model=settings.embedding_model, input=["warm-up"])
+    client.load(settings.llm_model)
+    logger.info(
+        "Models warmed up",
+        extra={
+            "embedding_model": settings.embedding_model,
+            "llm_model": settings.llm_model,
+            "seconds": round(time.perf_counter() - start, 3),
+        },
+    )
+
+
+def _start_warm_up() -> tuple[threading.Event, threading.Event]:
+    """
+    Warm up the models in a background thread if enabled.
+
+    A thread with its own sync client serves both services, as the async
+    services are created before their event loop runs.
+
+    Returns:
+        Event set once the warm-up finished, successfully or not, and event
+        set once the models are loaded. Both are set immediately if disabled.
+    """
+    finished = threading.Event()
+    ready = threading.Event()
+    if not settings.model_warmup:
+        ready.set()
+        finished.set()
+        return finished, ready
+
+    def run():
+        try:
+            warm_up_models()
+            ready.set()
+        except Exception as e:
+            logger.error(f"Model warm-up failed: {e}")
+        finally:
+            finished.set()
+
+    threading.Thread(target=run, name="model-warm-up", daemon=True).start()
+    return finished, ready
+
+
+def _answer_key(messages: list[dict[str, str]]) -> str:
+    """Cache key of a chat request with the configured model and options."""
+    return answer_key(
+        settings.llm_model,
+        {
+            "temperature": settings.llm_temperature,
+            "seed": settings.llm_seed,
+            "num_ctx": settings.llm_num_ctx,
+        },
+        messages,
+    )
+
+
+def _answer_store(
+    answer_cache: AnswerCache | None,
+    key: str | None,
+    semantic_answer_cache: SemanticAnswerCache | None,
+    embedding: list[float] | None,
+    hits: list[ScoredPoint] | None,
+) -> Callable[[str], None] | None:
+    """Callback storing a generated answer in the enabled answer caches."""
+    if key is None and embedding is None:
+        return None
+
+    def store(answer: str) -> None:
+        if key is not None:
+            answer_cache.put(key, answer)
+        if embedding is not None:
+            semantic_answer_cache.put(embedding, hits, answer)
+
+    return store
+
+
+def _query_embedding_key(query: str) -> str:
+    """Query embedding cache key of a query with the configured model."""
+    return hash_key(settings.embedding_model, normalize_text(query))
 
-class MealieRAGService:
-    def __init__(self):
-        self.ollama_client = OllamaClient(settings.ollama_base_url)
-        self.vector_db_client = get_vector_db_client(settings.vectordb_url)
 
-        if settings.search_strategy == SearchStrategy.MULTIQUERY:
+def _missing_queries(
+    queries: list[str], embeddings: list[list[float] | None]
+) -> list[str]:
+    """Queries without a cached embedding, one per normalized text."""
+    missing: dict[str, str] = {}
+    for query, embedding in zip(queries, embeddings):
+        if embedding is None:
+            missing.setdefault(normalize_text(query), query)
+    return list(missing.values())
+
+
+def _merge_embeddings(
+    queries: list[str],
+    embeddings: list[list[float] | None],
+    missing: list[str],
+    computed: list[list[float]],
+) -> list[list[float]]:
+    """Fill cache misses with the embeddings computed for `missing`."""
+    by_text = {
+        normalize_text(query): embedding for query, embedding in zip(missing, computed)
+    }
+    return [
+        embedding if embedding is not None else by_text[normalize_text(query)]
+        for query, embedding in zip(queries, embeddings)
+    ]
+
+
+class _VectorDBFunctions(NamedTuple):
+    """Vector database functions of a service, either all sync or all async."""
+
+    simple: Callable[..., Any]
+    rrf: Callable[..., Any]
+    batch: Callable[..., Any]
+    hybrid: Callable[..., Any]
+    best_field: Callable[..., Any]
+    payload_values: Callable[..., Any]
+    has_matches: Callable[..., Any]
+
+
+class _BaseRAGService:
+    """
+    Configuration and I/O-free logic shared by `MealieRAGService` and
+    `AsyncMealieRAGService`.
+
+    Vector database requests are built here as calls of the service's
+    functions, which the sync service calls and the async service awaits.
+    """
+
+    def __init__(self, ollama_client, vector_db_client, functions: _VectorDBFunctions):
+        self.ollama_client = ollama_client
+        self.vector_db_client = vector_db_client
+        self.query_embedding_cache = _query_embedding_cache()
+        self.shared_query_embedding_cache = _shared_query_embedding_cache()
+        self.answer_cache = _answer_cache()
+        # Set once the warm-up finished and once it loaded the models, see
+        # `check_health`
+        self.warm_up_finished, self.models_ready = _start_warm_up()
+        self.semantic_answer_cache = _semantic_answer_cache()
+        self._functions = functions
+        self._adaptive = settings.search_strategy == SearchStrategy.ADAPTIVE
+        self._search_filters = settings.search_filters
+        self._vocabulary: dict[str, list[str]] = {key: [] for key in VOCABULARY_KEYS}
+        self._recipe_names: list[tuple[str, frozenset[str]]] = []
+        self._vocabulary_loaded_at: float | None = None
+        multiquery = settings.search_strategy in (
+            SearchStrategy.MULTIQUERY,
+            SearchStrategy.ADAPTIVE,
+        )
+        self._streaming_expansion = multiquery and settings.query_expansion_streaming
+        self._speculative_retrieval = multiquery and settings.speculative_retrieval
+        # Candidates per query and fusion of client-side fused retrievals
+        batch = settings.vectordb_search_engine == SearchEngine.BATCH
+        self._candidate_depth = (
+            settings.vectordb_candidate_depth if batch else settings.vectordb_k
+        )
+        self._fusion = settings.vectordb_fusion if batch else FusionMethod.RRF
+        # Searches involving sparse or field vectors
+        self._hybrid = settings.vectordb_hybrid
+        self._field_vectors = settings.vectordb_field_vectors
+        self._multi_vector = self._hybrid or self._field_vectors
+        # Hybrid and fused field searches score hits by RRF, not similarity
+        self._fused_scores = self._hybrid or (
+            self._field_vectors
+            and settings.vectordb_field_strategy != FieldStrategy.BEST_FIELD
+        )
+        if (
+            self._multi_vector
+            and batch
+            and not (self._streaming_expansion or self._speculative_retrieval)
+        ):
+            logger.warning(
+                "VECTORDB_SEARCH_ENGINE=batch, VECTORDB_FUSION and "
+                "VECTORDB_FUSION_WEIGHTS are ignored with hybrid search or field "
+                "vectors, which fuse all queries in Qdrant with RRF"
+            )
+        self._search_params = get_search_params(
+            settings.vectordb_hnsw_ef,
+            settings.vectordb_quantization,
+            settings.vectordb_quantization_rescore,
+            settings.vectordb_quantization_oversampling,
+        )
+
+        if multiquery:
             self.query_builder = MultiQueryQueryBuilder(
                 ollama_client=self.ollama_client,
                 model=settings.llm_model,
                 temperature=settings.llm_temperature,
                 seed=settings.llm_seed,
+                cache=_query_expansion_cache(),
+            )
+            self._retrieve_results = (
+                partial(
+                    functions.batch,
+                    depth=settings.vectordb_candidate_depth,
+                    fusion=settings.vectordb_fusion,
+                    weights=settings.vectordb_fusion_weights,
+                )
+                if batch
+                else functions.rrf
             )
-            self._retrieve_results = retrieve_results_rrf
         else:
             self.query_builder = DefaultQueryBuilder()
-            self._retrieve_results = retrieve_results_simple
+            self._retrieve_results = functions.simple
 
-    def generate_queries(self, user_input: str) -> list[str]:
+    def _retrieve_request(
+        self,
+        query_vectors: list[list[float]],
+        queries: list[str],
+        query_filter: models.Filter | None = None,
+    ) -> partial:
         """
-        Generate search queries based on user input.
+        Search of all query vectors for the final k hits.
         """
-        logger.debug("Generating queries", extra={"user_input": user_input})
-        return self.query_builder(user_input)
+        if self._multi_vector:
+            return self._multi_vector_request(
+                query_vectors, queries, settings.vectordb_k, query_filter
+            )
+        return partial(
+            self._retrieve_results,
+            query_vectors,
+            self.vector_db_client,
+            settings.vectordb_collection_name,
+            k=settings.vectordb_k,
+            query_filter=query_filter,
+            search_params=self._search_params,
+        )
 
-    def retrieve_recipes(self, queries: list[str]) -> list[ScoredPoint]:
-        """
-        Retrieve relevant recipes using the provided queries.
+    def _vector_request(
+        self,
+        query_vector: list[float],
+        limit: int | None = None,
+        query_filter: models.Filter | None = None,
+        query: str | None = None,
+    ) -> partial:
         """
-        logger.debug("Retrieving recipes", extra={"queries_count": len(queries)})
-        query_vectors = get_embedding(queries, self.ollama_client, settings)
+        Search of a single query vector, for `limit` hits (default: k).
 
-        if not query_vectors:
-            logger.warning("No embeddings generated for queries")
-            return []
+        With field vectors or hybrid search, the search goes through
+        `_multi_vector_request`, hybrid search using the `query` text.
+        """
+        if self._multi_vector:
+            return self._multi_vector_request(
+                [query_vector],
+                [query] if query is not None else [],
+                limit or settings.vectordb_k,
+                query_filter,
+            )
+        return partial(
+            self._functions.simple,
+            [query_vector],
+            self.vector_db_client,
+            settings.vectordb_collection_name,
+            k=limit or settings.vectordb_k,
+            query_filter=query_filter,
+            search_params=self._search_params,
+        )
 
-        return self._retrieve_results(
+    def _multi_vector_request(
+        self,
+        query_vectors: list[list[float]],
+        queries: list[str],
+        k: int,
+        query_filter: models.Filter | None = None,
+    ) -> partial:
+        """
+        Search of the field vectors and, with hybrid search, the sparse vectors
+        of the `queries` texts.
+        """
+        sparse_vectors = (
+            [encode_query(query) for query in queries] if self._hybrid else []
+        )
+        if (
+            self._field_vectors
+            and settings.vectordb_field_strategy == FieldStrategy.BEST_FIELD
+        ):
+            return partial(
+                self._functions.best_field,
+                query_vectors,
+                sparse_vectors,
+                self.vector_db_client,
+                settings.vectordb_collection_name,
+                k=k,
+                depth=settings.vectordb_candidate_depth,
+                query_filter=query_filter,
+                search_params=self._search_params,
+            )
+        return partial(
+            self._functions.hybrid,
             query_vectors,
+            sparse_vectors,
+            self.vector_db_client,
+            settings.vectordb_collection_name,
+            k=k,
+            depth=settings.vectordb_candidate_depth,
+            query_filter=query_filter,
+            search_params=self._search_params,
+            vector_names=FIELD_VECTOR_NAMES if self._field_vectors else (None,),
+        )
+
+    def _vocabulary_request(self) -> partial | None:
+        """
+        Reload of the known recipe names, tags and categories, or None while
+        the loaded vocabulary is fresh.
+        """
+        now = time.monotonic()
+        if (
+            self._vocabulary_loaded_at is not None
+            and now - self._vocabulary_loaded_at <= settings.vocabulary_ttl
+        ):
+            return None
+        self._vocabulary_loaded_at = now
+        return partial(
+            self._functions.payload_values,
             self.vector_db_client,
             settings.vectordb_collection_name,
+            VOCABULARY_KEYS,
+        )
+
+    def _set_vocabulary(self, vocabulary: dict[str, list[str]]) -> None:
+        """
+        Replace the vocabulary, tokenizing the recipe names once.
+        """
+        self._vocabulary = vocabulary
+        self._recipe_names = tokenize_names(vocabulary["name"])
+
+    def _expand_without_search(self, reason: str | None) -> bool:
+        """
+        Check whether the adaptive strategy needs the expansion before any
+        simple search.
+
+        Without a `select_by_query` reason, the choice rests on the score
+        margin of the simple search. RRF scores of hybrid or fused field
+        searches depend on ranks only, so their margin says nothing about a
+        clear best hit and the expansion is used right away.
+        """
+        if reason is not None or not self._fused_scores:
+            return False
+        record_strategy(SearchStrategy.MULTIQUERY, FUSED_SCORES)
+        return True
+
+    def _select_simple(
+        self, reason: str | None, hits: list[ScoredPoint]
+    ) -> list[ScoredPoint] | None:
+        """
+        Decide on the adaptive strategy from the `select_by_query` reason and
+        the simple search hits of the user input.
+
+        Returns:
+            The simple search hits, or None if the multi-query expansion is needed.
+        """
+        if reason is None:
+            if score_margin(hits) < settings.adaptive_score_margin:
+                record_strategy(SearchStrategy.MULTIQUERY, AMBIGUOUS)
+                return None
+            reason = SCORE_MARGIN
+        record_strategy(SearchStrategy.SIMPLE, reason)
+        return hits
+
+    def _fuse(self, results: list[list[ScoredPoint]]) -> list[ScoredPoint]:
+        """
+        Fuse the per-query results of a parallel retrieval.
+        """
+        if not results:
+            logger.warning("No queries generated for user input")
+            return []
+        return fuse_results(
+            results,
             k=settings.vectordb_k,
+            method=self._fusion,
+            weights=settings.vectordb_fusion_weights,
+        )
+
+    def _query_filter(self, recipe_filter: RecipeFilter | None) -> models.Filter | None:
+        """
+        Qdrant filter of a recipe filter, if it constrains anything.
+        """
+        query_filter = to_qdrant_filter(recipe_filter) if recipe_filter else None
+        if query_filter is not None:
+            logger.debug(
+                "Filtering recipes", extra={"filter": recipe_filter.model_dump()}
+            )
+        return query_filter
+
+    def _matches_request(self, query_filter: models.Filter) -> partial:
+        """
+        Check whether any recipe matches `query_filter`.
+
+        Searches restricted to a filter only come back empty when no recipe
+        matches it, so this check decides up front whether to filter, and
+        the queries are generated and embedded only once.
+        """
+        return partial(
+            self._functions.has_matches,
+            self.vector_db_client,
+            settings.vectordb_collection_name,
+            query_filter,
         )
 
+    def _chat_request(self, messages: list[dict[str, str]]) -> dict[str, Any]:
+        """
+        Arguments of the LLM chat request.
+        """
+        logger.debug(
+            "Generating chat response",
+            extra={"messages_count": len(messages), "messages": messages},
+        )
+        return {
+            "messages": messages,
+            "model": settings.llm_model,
+            "temperature": settings.llm_temperature,
+            "seed": settings.llm_seed,
+        }
+
+    def _caches_query_embeddings(self) -> bool:
+        """
+        Check whether query embeddings are cached in process or on disk.
+        """
+        return (
+            self.query_embedding_cache is not None
+            or self.shared_query_embedding_cache is not None
+        )
+
+    def _cached_query_embeddings(self, queries: list[str]) -> list[list[float] | None]:
+        """
+        Look up queries in the query embedding caches, None for misses.
+
+        In-process misses are looked up in the shared on-disk cache, whose
+        hits are kept in process.
+        """
+        embeddings = [
+            self.query_embedding_cache.get(_query_embedding_key(query))
+            if self.query_embedding_cache is not None
+            else None
+            for query in queries
+        ]
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if self.shared_query_embedding_cache is None or not misses:
+            return embeddings
+
+        shared = self.shared_query_embedding_cache.get_many(
+            settings.embedding_model, [normalize_text(queries[i]) for i in misses]
+        )
+        for i, embedding in zip(misses, shared):
+            if embedding is None:
+                continue
+            embeddings[i] = embedding
+            if self.query_embedding_cache is not None:
+                self.query_embedding_cache.put(
+                    _query_embedding_key(queries[i]), embedding
+                )
+        return embeddings
+
+    def _cache_query_embeddings(
+        self, queries: list[str], missing: list[str], computed: list[list[float]]
+    ) -> None:
+        """
+        Store the embeddings computed for the cache misses of `queries`.
+        """
+        if self.query_embedding_cache is not None:
+            for query, embedding in zip(missing, computed):
+                self.query_embedding_cache.put(_query_embedding_key(query), embedding)
+        if self.shared_query_embedding_cache is not None and missing:
+            self.shared_query_embedding_cache.put_many(
+                settings.embedding_model,
+                [normalize_text(query) for query in missing],
+                computed,
+            )
+        logger.debug(
+            "Query embedding cache lookup",
+            extra={"queries": len(queries), "embedded": len(missing)},
+        )
+
+    def _warming_up(self) -> bool:
+        """
+        Check whether the models are not loaded yet, retrying a failed warm-up.
+        """
+        if self.models_ready.is_set():
+            return False
+        if self.warm_up_finished.is_set():
+            logger.warning("Models are not loaded, retrying the warm-up.")
+            self.warm_up_finished, self.models_ready = _start_warm_up()
+        else:
+            logger.info("Models are still warming up.")
+        return True
+
+    def _log_health(self, healthy: bool) -> bool:
+        """
+        Log a missing collection, passing the health check result through.
+        """
+        if not healthy:
+            logger.error(f"Collection '{settings.vectordb_collection_name}' not found.")
+        return healthy
+
     def populate_messages(
         self, user_input: str, hits: list[ScoredPoint]
     ) -> list[dict[str, str]]:
@@ -72,28 +668,619 @@ class MealieRAGService:
         )
         return populate_messages(user_input, hits)
 
+
+class MealieRAGService(_BaseRAGService):
+    def __init__(self):
+        super().__init__(
+            OllamaClient(settings.ollama_base_url, **_ollama_client_options()),
+            get_vector_db_client(settings.vectordb_url),
+            _VectorDBFunctions(
+                simple=retrieve_results_simple,
+                rrf=retrieve_results_rrf,
+                batch=retrieve_results_batch,
+                hybrid=retrieve_results_hybrid,
+                best_field=retrieve_results_best_field,
+                payload_values=list_payload_values,
+                has_matches=has_matching_points,
+            ),
+        )
+        # Shared by all requests of the service. Expansions wait for their
+        # searches, so they get their own workers and can never take all
+        # workers the searches need.
+        self._search_executor = ThreadPoolExecutor(
+            max_workers=MAX_PARALLEL_QUERIES, thread_name_prefix="search"
+        )
+        self._expansion_executor = ThreadPoolExecutor(
+            max_workers=MAX_PARALLEL_EXPANSIONS, thread_name_prefix="query-expansion"
+        )
+
+    def generate_queries(self, user_input: str) -> list[str]:
+        """
+        Generate search queries based on user input.
+        """
+        logger.debug("Generating queries", extra={"user_input": user_input})
+        with timed("query_expansion"):
+            return self.query_builder(user_input)
+
+    def retrieve_recipes(
+        self, queries: list[str], query_filter: models.Filter | None = None
+    ) -> list[ScoredPoint]:
+        """
+        Retrieve relevant recipes using the provided queries.
+        """
+        logger.debug("Retrieving recipes", extra={"queries_count": len(queries)})
+        with timed("embedding"):
+            query_vectors = self._embed_queries(queries)
+
+        if not query_vectors:
+            logger.warning("No embeddings generated for queries")
+            return []
+
+        with timed("search"):
+            return self._retrieve_request(query_vectors, queries, query_filter)()
+
+    def extract_filter(self, user_input: str) -> RecipeFilter:
+        """
+        Extract tag, category and rating constraints from the user input.
+        """
+        vocabulary = self._get_vocabulary()
+        return extract_filter(user_input, vocabulary["tags"], vocabulary["category"])
+
+    def find_recipes(
+        self, user_input: str, recipe_filter: RecipeFilter | None = None
+    ) -> list[ScoredPoint]:
+        """
+        Generate search queries for the user input and retrieve relevant recipes.
+
+        The search is restricted to recipes matching `recipe_filter`, or with
+        search filters enabled, the filter extracted from the user input. If no
+        recipe matches the filter, the search runs without it.
+        """
+        if recipe_filter is None and self._search_filters:
+            recipe_filter = self.extract_filter(user_input)
+        query_filter = self._query_filter(recipe_filter)
+        if query_filter is not None and not self._matches_request(query_filter)():
+            logger.info("No recipes match the filter, searching without it")
+            query_filter = None
+        return self._find_recipes(user_input, query_filter)
+
+    def _find_recipes(
+        self, user_input: str, query_filter: models.Filter | None = None
+    ) -> list[ScoredPoint]:
+        """
+        Retrieve recipes for the user input, restricted to `query_filter`.
+
+        With streaming expansion enabled, each query is embedded and searched
+        as soon as the LLM has generated it. With speculative retrieval
+        enabled, the raw user input is searched while the expansion runs and
+        its hits are fused with the expanded-query hits, or returned alone if
+        the expansion fails or exceeds its latency budget. If the raw search
+        fails, the expanded-query hits are used alone. In both modes the
+        per-query results are fused client-side.
+
+        An expansion over its budget is told to stop: a streamed expansion
+        stops reading the LLM response and submitting searches, a batch
+        expansion skips its searches. A blocking LLM call cannot be
+        interrupted, so it keeps its expansion worker until it returns,
+        which bounds such abandoned calls to `MAX_PARALLEL_EXPANSIONS`.
+
+        With the adaptive strategy, the expansion is skipped for short queries,
+        queries naming a known recipe and queries whose simple search has a
+        clear best hit.
+        """
+        if self._adaptive:
+            hits = self._find_recipes_simple(user_input, query_filter)
+            if hits is not None:
+                return hits
+
+        if not (self._streaming_expansion or self._speculative_retrieval):
+            return self.retrieve_recipes(
+                self.generate_queries(user_input), query_filter
+            )
+
+        logger.debug("Parallel retrieval", extra={"user_input": user_input})
+        start = time.perf_counter()
+        raw = (
+            self._search_executor.submit(
+                contextvars.copy_context().run,
+                self._search_query,
+                user_input,
+                self._candidate_depth,
+                query_filter,
+            )
+            if self._speculative_retrieval
+            else None
+        )
+        cancelled = threading.Event()
+        expansion = self._expansion_executor.submit(
+            contextvars.copy_context().run,
+            self._search_expanded,
+            user_input,
+            query_filter,
+            cancelled,
+        )
+
+        with timed("search"):
+            if raw is None:
+                return self._fuse(expansion.result())
+
+            budget = settings.query_expansion_budget
+            timeout = (
+                max(budget - (time.perf_counter() - start), 0)
+                if budget is not None
+                else None
+            )
+            try:
+                expanded = expansion.result(timeout=timeout)
+            except FuturesTimeoutError:
+                cancelled.set()
+                expansion.cancel()
+                logger.warning(
+                    f"Query expansion exceeded {budget}s, using raw query results"
+                )
+                return raw.result()
+            except Exception as e:
+                logger.warning(f"Query expansion failed, using raw query results: {e}")
+                return raw.result()
+            try:
+                raw_hits = raw.result()
+            except Exception as e:
+                if not expanded:
+                    raise
+                logger.warning(
+                    f"Raw query search failed, using expanded query results: {e}"
+                )
+                return self._fuse(expanded)
+        return self._fuse([raw_hits] + expanded)
+
+    def _find_recipes_simple(
+        self, user_input: str, query_filter: models.Filter | None = None
+    ) -> list[ScoredPoint] | None:
+        """
+        Answer with the simple strategy if the adaptive heuristics allow it.
+
+        Returns:
+            The simple search hits, or None if the multi-query expansion is needed.
+        """
+        self._get_vocabulary()
+        reason = select_by_query(
+            user_input,
+            self._recipe_names,
+            settings.adaptive_simple_max_words,
+        )
+        if self._expand_without_search(reason):
+            return None
+        with timed("search"):
+            hits = self._search_query(user_input, query_filter=query_filter)
+        return self._select_simple(reason, hits)
+
+    def _get_vocabulary(self) -> dict[str, list[str]]:
+        """
+        Known recipe names, tags and categories, reloaded from the collection
+        periodically.
+        """
+        request = self._vocabulary_request()
+        if request is not None:
+            try:
+                self._set_vocabulary(request())
+            except Exception as e:
+                logger.warning(f"Could not load recipe vocabulary: {e}")
+        return self._vocabulary
+
+    def _search_expanded(
+        self,
+        user_input: str,
+        query_filter: models.Filter | None = None,
+        cancelled: threading.Event | None = None,
+    ) -> list[list[ScoredPoint]]:
+        """
+        Expand the user input and search each generated query.
+
+        Once `cancelled` is set, no further query is read or searched.
+        """
+        cancelled = cancelled or threading.Event()
+        with timed("query_expansion"):
+            if self._streaming_expansion:
+                futures = []
+                with closing(self.query_builder.stream(user_input)) as stream:
+                    for query in stream:
+                        if cancelled.is_set():
+                            break
+                        futures.append(
+                            self._search_executor.submit(
+                                contextvars.copy_context().run,
+                                self._search_query,
+                                query,
+                                self._candidate_depth,
+                                query_filter,
+                            )
+                        )
+            else:
+                queries = self.query_builder(user_input)
+        if self._streaming_expansion:
+            if cancelled.is_set():
+                for future in futures:
+                    future.cancel()
+                return []
+            return [future.result() for future in futures]
+
+        if not queries or cancelled.is_set():
+            return []
+        query_vectors = self._embed_queries(queries)
+        return list(
+            self._search_executor.map(
+                lambda query, query_vector: contextvars.copy_context().run(
+                    self._vector_request(
+                        query_vector, self._candidate_depth, query_filter, query
+                    )
+                ),
+                queries,
+                query_vectors,
+            )
+        )
+
+    def _search_query(
+        self,
+        query: str,
+        limit: int | None = None,
+        query_filter: models.Filter | None = None,
+    ) -> list[ScoredPoint]:
+        """
+        Embed and search a single query, for `limit` hits (default: k).
+        """
+        query_vector = self._embed_queries([query])[0]
+        return self._vector_request(query_vector, limit, query_filter, query)()
+
+    def _embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """
+        Embed queries, sending only query embedding cache misses to the model.
+        """
+        if not self._caches_query_embeddings() or not queries:
+            return get_embedding(queries, self.ollama_client, settings)
+
+        cached = self._cached_query_embeddings(queries)
+        missing = _missing_queries(queries, cached)
+        computed = (
+            get_embedding(missing, self.ollama_client, settings) if missing else []
+        )
+        self._cache_query_embeddings(queries, missing, computed)
+        return _merge_embeddings(queries, cached, missing, computed)
+
     def chat(
-        self, messages: list[dict[str, str]]
+        self,
+        messages: list[dict[str, str]],
+        query: str | None = None,
+        hits: list[ScoredPoint] | None = None,
     ) -> Generator[dict[str, Any], None, None]:
         """
         Stream chat response from LLM.
+
+        With the answer cache enabled, an answer to identical messages is
+        replayed as a stream instead of being generated again. With the
+        semantic answer cache enabled and the user `query` and retrieved
+        `hits` given, so is the answer to a similar question over the same
+        recipes.
         """
-        logger.debug(
-            "Generating chat response",
-            extra={"messages_count": len(messages), "messages": messages},
+        key = _answer_key(messages) if self.answer_cache is not None else None
+        if key is not None:
+            answer = self.answer_cache.get(key)
+            if answer is not None:
+                logger.debug("Replaying cached answer")
+                return replay(answer)
+
+        embedding = None
+        if self.semantic_answer_cache is not None and query and hits:
+            embedding = self._embed_queries([query])[0]
+            answer = self.semantic_answer_cache.get(embedding, hits)
+            if answer is not None:
+                logger.debug("Replaying semantically cached answer")
+                return replay(answer)
+
+        stream = timed_stream(
+            self.ollama_client.streaming_chat(**self._chat_request(messages))
         )
-        return self.ollama_client.streaming_chat(
-            messages=messages,
-            model=settings.llm_model,
-            temperature=settings.llm_temperature,
-            seed=settings.llm_seed,
+        store = _answer_store(
+            self.answer_cache, key, self.semantic_answer_cache, embedding, hits
         )
+        return record_answer(stream, store) if store is not None else stream
 
     def check_health(self) -> bool:
-        """Check if service is healthy."""
-        healthy = self.vector_db_client.collection_exists(
-            settings.vectordb_collection_name
+        """Check if service is healthy and, with warm-up enabled, models loaded."""
+        if self._warming_up():
+            return False
+        return self._log_health(
+            self.vector_db_client.collection_exists(settings.vectordb_collection_name)
+        )
+
+
+class AsyncMealieRAGService(_BaseRAGService):
+    """
+    Asyncio-native variant of `MealieRAGService`.
+
+    Uses async Ollama and Qdrant clients, so a single event loop can serve
+    many concurrent requests without a thread per in-flight LLM stream. The
+    query embedding, query expansion and answer caches may be backed by
+    SQLite, so their lookups and writes run in a worker thread.
+    """
+
+    def __init__(self):
+        super().__init__(
+            AsyncOllamaClient(settings.ollama_base_url, **_ollama_client_options()),
+            get_async_vector_db_client(settings.vectordb_url),
+            _VectorDBFunctions(
+                simple=aretrieve_results_simple,
+                rrf=aretrieve_results_rrf,
+                batch=aretrieve_results_batch,
+                hybrid=aretrieve_results_hybrid,
+                best_field=aretrieve_results_best_field,
+                payload_values=alist_payload_values,
+                has_matches=ahas_matching_points,
+            ),
+        )
+
+    async def generate_queries(self, user_input: str) -> list[str]:
+        """
+        Generate search queries based on user input.
+        """
+        logger.debug("Generating queries", extra={"user_input": user_input})
+        with timed("query_expansion"):
+            return await self.query_builder.abuild(user_input)
+
+    async def retrieve_recipes(
+        self, queries: list[str], query_filter: models.Filter | None = None
+    ) -> list[ScoredPoint]:
+        """
+        Retrieve relevant recipes using the provided queries.
+        """
+        logger.debug("Retrieving recipes", extra={"queries_count": len(queries)})
+        with timed("embedding"):
+            query_vectors = await self._embed_queries(queries)
+
+        if not query_vectors:
+            logger.warning("No embeddings generated for queries")
+            return []
+
+        with timed("search"):
+            return await self._retrieve_request(query_vectors, queries, query_filter)()
+
+    async def extract_filter(self, user_input: str) -> RecipeFilter:
+        """
+        Extract tag, category and rating constraints from the user input.
+        """
+        vocabulary = await self._get_vocabulary()
+        return extract_filter(user_input, vocabulary["tags"], vocabulary["category"])
+
+    async def find_recipes(
+        self, user_input: str, recipe_filter: RecipeFilter | None = None
+    ) -> list[ScoredPoint]:
+        """
+        Generate search queries for the user input and retrieve relevant recipes.
+
+        Async variant of `MealieRAGService.find_recipes`.
+        """
+        if recipe_filter is None and self._search_filters:
+            recipe_filter = await self.extract_filter(user_input)
+        query_filter = self._query_filter(recipe_filter)
+        if query_filter is not None and not await self._matches_request(query_filter)():
+            logger.info("No recipes match the filter, searching without it")
+            query_filter = None
+        return await self._find_recipes(user_input, query_filter)
+
+    async def _find_recipes(
+        self, user_input: str, query_filter: models.Filter | None = None
+    ) -> list[ScoredPoint]:
+        """
+        Async variant of `MealieRAGService._find_recipes`. An expansion that
+        exceeds its latency budget is cancelled, including its LLM request.
+        """
+        if self._adaptive:
+            hits = await self._find_recipes_simple(user_input, query_filter)
+            if hits is not None:
+                return hits
+
+        if not (self._streaming_expansion or self._speculative_retrieval):
+            return await self.retrieve_recipes(
+                await self.generate_queries(user_input), query_filter
+            )
+
+        logger.debug("Parallel retrieval", extra={"user_input": user_input})
+        raw = (
+            asyncio.create_task(
+                self._search_query(user_input, self._candidate_depth, query_filter)
+            )
+            if self._speculative_retrieval
+            else None
+        )
+        expansion = asyncio.create_task(self._search_expanded(user_input, query_filter))
+        try:
+            with timed("search"):
+                if raw is None:
+                    results = await expansion
+                else:
+                    budget = settings.query_expansion_budget
+                    try:
+                        expanded = await asyncio.wait_for(expansion, timeout=budget)
+                    except TimeoutError:
+                        logger.warning(
+                            f"Query expansion exceeded {budget}s, "
+                            "using raw query results"
+                        )
+                        return await raw
+                    except Exception as e:
+                        logger.warning(
+                            f"Query expansion failed, using raw query results: {e}"
+                        )
+                        return await raw
+                    try:
+                        results = [await raw]
+                    except Exception as e:
+                        if not expanded:
+                            raise
+                        logger.warning(
+                            "Raw query search failed, using expanded query "
+                            f"results: {e}"
+                        )
+                        results = []
+                    results += expanded
+        finally:
+            for task in (raw, expansion):
+                if task is not None:
+                    task.cancel()
+
+        return self._fuse(results)
+
+    async def _find_recipes_simple(
+        self, user_input: str, query_filter: models.Filter | None = None
+    ) -> list[ScoredPoint] | None:
+        """
+        Async variant of `MealieRAGService._find_recipes_simple`.
+        """
+        await self._get_vocabulary()
+        reason = select_by_query(
+            user_input,
+            self._recipe_names,
+            settings.adaptive_simple_max_words,
+        )
+        if self._expand_without_search(reason):
+            return None
+        with timed("search"):
+            hits = await self._search_query(user_input, query_filter=query_filter)
+        return self._select_simple(reason, hits)
+
+    async def _get_vocabulary(self) -> dict[str, list[str]]:
+        """
+        Async variant of `MealieRAGService._get_vocabulary`.
+        """
+        request = self._vocabulary_request()
+        if request is not None:
+            try:
+                self._set_vocabulary(await request())
+            except Exception as e:
+                logger.warning(f"Could not load recipe vocabulary: {e}")
+        return self._vocabulary
+
+    async def _search_expanded(
+        self, user_input: str, query_filter: models.Filter | None = None
+    ) -> list[list[ScoredPoint]]:
+        """
+        Expand the user input and search each generated query, at most
+        `MAX_PARALLEL_QUERIES` at a time.
+        """
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_QUERIES)
+
+        async def search(query: str) -> list[ScoredPoint]:
+            async with semaphore:
+                return await self._search_query(
+                    query, self._candidate_depth, query_filter
+                )
+
+        async def search_vector(
+            query: str, query_vector: list[float]
+        ) -> list[ScoredPoint]:
+            async with semaphore:
+                return await self._vector_request(
+                    query_vector, self._candidate_depth, query_filter, query
+                )()
+
+        if not self._streaming_expansion:
+            with timed("query_expansion"):
+                queries = await self.query_builder.abuild(user_input)
+            if not queries:
+                return []
+            query_vectors = await self._embed_queries(queries)
+            return list(
+                await asyncio.gather(
+                    *(
+                        search_vector(query, query_vector)
+                        for query, query_vector in zip(queries, query_vectors)
+                    )
+                )
+            )
+
+        tasks = []
+        try:
+            with timed("query_expansion"):
+                async for query in self.query_builder.astream(user_input):
+                    tasks.append(asyncio.create_task(search(query)))
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _search_query(
+        self,
+        query: str,
+        limit: int | None = None,
+        query_filter: models.Filter | None = None,
+    ) -> list[ScoredPoint]:
+        """
+        Embed and search a single query, for `limit` hits (default: k).
+        """
+        query_vectors = await self._embed_queries([query])
+        return await self._vector_request(
+            query_vectors[0], limit, query_filter, query
+        )()
+
+    async def _embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """
+        Async variant of `MealieRAGService._embed_queries`.
+        """
+        if not self._caches_query_embeddings() or not queries:
+            return await aget_embedding(queries, self.ollama_client, settings)
+
+        cached = await asyncio.to_thread(self._cached_query_embeddings, queries)
+        missing = _missing_queries(queries, cached)
+        computed = (
+            await aget_embedding(missing, self.ollama_client, settings)
+            if missing
+            else []
+        )
+        await asyncio.to_thread(
+            self._cache_query_embeddings, queries, missing, computed
+        )
+        return _merge_embeddings(queries, cached, missing, computed)
+
+    async def chat(
+        self,
+        messages: list[dict[str, str]],
+        query: str | None = None,
+        hits: list[ScoredPoint] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream chat response from LLM.
+
+        Async variant of `MealieRAGService.chat`.
+        """
+        key = _answer_key(messages) if self.answer_cache is not None else None
+        if key is not None:
+            answer = await asyncio.to_thread(self.answer_cache.get, key)
+            if answer is not None:
+                logger.debug("Replaying cached answer")
+                return areplay(answer)
+
+        embedding = None
+        if self.semantic_answer_cache is not None and query and hits:
+            embedding = (await self._embed_queries([query]))[0]
+            answer = self.semantic_answer_cache.get(embedding, hits)
+            if answer is not None:
+                logger.debug("Replaying semantically cached answer")
+                return areplay(answer)
+
+        stream = atimed_stream(
+            await self.ollama_client.streaming_chat(**self._chat_request(messages))
+        )
+        store = _answer_store(
+            self.answer_cache, key, self.semantic_answer_cache, embedding, hits
+        )
+        return arecord_answer(stream, store) if store is not None else stream
+
+    async def check_health(self) -> bool:
+        """Check if service is healthy and, with warm-up enabled, models loaded."""
+        if self._warming_up():
+            return False
+        return self._log_health(
+            await self.vector_db_client.collection_exists(
+                settings.vectordb_collection_name
+            )
         )
-        if not healthy:
-            logger.error(f"Collection '{settings.vectordb_collection_name}' not found.")
-        return healthy
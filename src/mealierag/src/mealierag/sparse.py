@@ -0,0 +1,107 @@
+"""
+Sparse vectors module.
+
+Contains a local BM25-style encoder turning recipe texts and queries into
+sparse lexical vectors. Term frequencies are saturated and length normalized
+on the client, while the inverse document frequency is applied by Qdrant
+(`Modifier.IDF` on the sparse vector), so no vocabulary or corpus statistics
+have to be kept locally.
+"""
+
+import re
+import zlib
+from collections import Counter
+
+from qdrant_client import models
+
+# BM25 term frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+# Typical number of terms in a recipe text, for length normalization
+AVG_DOCUMENT_LENGTH = 256
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+STOP_WORDS = frozenset(
+    """
+    a about an and any are as at be but by can do for from have how i if in
+    into is it me my no not of on or our so some that the their them then
+    there these this to up us was we what when which with without you your
+    """.split()
+)
+
+
+def terms(text: str) -> list[str]:
+    """
+    Split a text into lowercase terms.
+
+    Stop words and single characters are dropped and a plural "s" is folded
+    away, so "Tomatoes" and "tomato" share a term.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Terms in order of appearance, with repetitions
+    """
+    result = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if len(token) < 2 or token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("es") and token[-3] in "hosx":
+            token = token[:-2]
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        result.append(token)
+    return result
+
+
+def term_index(term: str) -> int:
+    """Stable sparse vector index of a term."""
+    return zlib.crc32(term.encode())
+
+
+def encode_document(
+    text: str, avg_length: float = AVG_DOCUMENT_LENGTH
+) -> models.SparseVector:
+    """
+    Encode a document as BM25 term weights.
+
+    Args:
+        text: Document text
+        avg_length: Average document length in terms
+
+    Returns:
+        Sparse vector of saturated, length-normalized term frequencies
+    """
+    counts = _index_counts(terms(text))
+    length = sum(counts.values())
+    norm = K1 * (1 - B + B * length / avg_length)
+    weights = {
+        index: count * (K1 + 1) / (count + norm) for index, count in counts.items()
+    }
+    return _sparse_vector(weights)
+
+
+def encode_query(text: str) -> models.SparseVector:
+    """
+    Encode a query as the set of its terms.
+
+    Args:
+        text: Query text
+
+    Returns:
+        Sparse vector with a weight of 1 per distinct term
+    """
+    return _sparse_vector(dict.fromkeys(_index_counts(terms(text)), 1.0))
+
+
+def _index_counts(document_terms: list[str]) -> Counter[int]:
+    return Counter(term_index(term) for term in document_terms)
+
+
+def _sparse_vector(weights: dict[int, float]) -> models.SparseVector:
+    indices = sorted(weights)
+    return models.SparseVector(
+        indices=indices, values=[weights[index] for index in indices]
+    )
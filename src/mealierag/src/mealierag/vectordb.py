@@ -3,12 +3,36 @@ Vector database client for Qdrant.
 """
 
 import logging
+import uuid
+from typing import Any
 
-from qdrant_client import QdrantClient, models
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
 from qdrant_client.http.models import ScoredPoint
+from qdrant_client.hybrid.fusion import (
+    DEFAULT_RANKING_CONSTANT_K,
+    reciprocal_rank_fusion,
+)
+
+from .config import FusionMethod, Quantization
 
 logger = logging.getLogger(__name__)
 
+# Namespace for point IDs derived from Mealie recipe IDs
+RECIPE_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "mealierag/recipe")
+
+# Payload keys indexed for filtering, and their index types
+PAYLOAD_INDEXES = {
+    "tags": models.PayloadSchemaType.KEYWORD,
+    "category": models.PayloadSchemaType.KEYWORD,
+    "rating": models.PayloadSchemaType.FLOAT,
+}
+
+# Name of the BM25-style sparse vector of hybrid collections
+SPARSE_VECTOR_NAME = "sparse"
+
+# Names of the dense vectors of collections with field vectors
+FIELD_VECTOR_NAMES = ("title", "ingredients", "instructions")
+
 
 def get_vector_db_client(url: str) -> QdrantClient:
     """
@@ -23,11 +47,427 @@ def get_vector_db_client(url: str) -> QdrantClient:
     return QdrantClient(url=url)
 
 
+def get_async_vector_db_client(url: str) -> AsyncQdrantClient:
+    """
+    Get an async Qdrant client instance.
+
+    Args:
+        url: The URL of the Qdrant service.
+
+    Returns:
+        AsyncQdrantClient: Configured async Qdrant client.
+    """
+    return AsyncQdrantClient(url=url)
+
+
+def recipe_point_id(recipe_id: str) -> str:
+    """
+    Get the deterministic point ID of a Mealie recipe.
+
+    Args:
+        recipe_id: The Mealie recipe ID.
+
+    Returns:
+        UUIDv5 string, identical across ingest runs and workers.
+    """
+    return str(uuid.uuid5(RECIPE_NAMESPACE, recipe_id))
+
+
+def get_content_hashes(
+    client: QdrantClient, collection_name: str, point_ids: list[str]
+) -> dict[str, str]:
+    """
+    Get the content hashes stored in the payload of existing points.
+
+    Args:
+        client: The Qdrant client.
+        collection_name: The name of the collection.
+        point_ids: IDs of the points to look up.
+
+    Returns:
+        Mapping of point ID to content hash, for points that exist.
+    """
+    if not point_ids:
+        return {}
+    points = client.retrieve(
+        collection_name=collection_name,
+        ids=point_ids,
+        with_payload=["content_hash"],
+        with_vectors=False,
+    )
+    return {
+        str(p.id): p.payload["content_hash"]
+        for p in points
+        if p.payload and p.payload.get("content_hash")
+    }
+
+
+def list_indexed_recipe_ids(client: QdrantClient, collection_name: str) -> set[str]:
+    """
+    List the Mealie recipe IDs indexed in a collection.
+
+    Args:
+        client: The Qdrant client.
+        collection_name: The name of the collection.
+
+    Returns:
+        Set of recipe IDs found in the point payloads.
+    """
+    recipe_ids: set[str] = set()
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            with_payload=["recipe_id"],
+            with_vectors=False,
+            limit=256,
+            offset=offset,
+        )
+        recipe_ids.update(
+            p.payload["recipe_id"] for p in points if p.payload.get("recipe_id")
+        )
+        if offset is None:
+            return recipe_ids
+
+
+def create_payload_indexes(client: QdrantClient, collection_name: str) -> None:
+    """
+    Create the payload indexes used to filter recipes.
+
+    Creating an index that already exists is a no-op, so this can be called
+    on existing collections.
+
+    Args:
+        client: The Qdrant client.
+        collection_name: The name of the collection.
+    """
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=field_schema,
+        )
+
+
+def get_hnsw_config(
+    m: int | None = None, ef_construct: int | None = None
+) -> models.HnswConfigDiff | None:
+    """
+    Build the HNSW index config of a collection.
+
+    Args:
+        m: Links per node, more improves recall at the cost of memory.
+        ef_construct: Neighbours considered while building the index.
+
+    Returns:
+        The HNSW config, or None to keep the Qdrant defaults.
+    """
+    if m is None and ef_construct is None:
+        return None
+    return models.HnswConfigDiff(m=m, ef_construct=ef_construct)
+
+
+def get_quantization_config(
+    quantization: Quantization,
+) -> models.QuantizationConfig | None:
+    """
+    Build the quantization config of a collection.
+
+    Quantized vectors are always kept in RAM, so they can be searched
+    quickly while the original vectors are on disk.
+
+    Args:
+        quantization: The quantization method.
+
+    Returns:
+        The quantization config, or None without quantization.
+    """
+    if quantization == Quantization.SCALAR:
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        )
+    if quantization == Quantization.BINARY:
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    return None
+
+
+def get_search_params(
+    hnsw_ef: int | None = None,
+    quantization: Quantization = Quantization.NONE,
+    rescore: bool = True,
+    oversampling: float | None = None,
+) -> models.SearchParams | None:
+    """
+    Build the per-query search parameters.
+
+    Args:
+        hnsw_ef: Neighbours considered while searching the HNSW index.
+        quantization: The quantization method of the collection.
+        rescore: Whether quantized candidates are rescored with the originals.
+        oversampling: Candidates searched per result before rescoring.
+
+    Returns:
+        The search parameters, or None to keep the Qdrant defaults.
+    """
+    quantization_params = (
+        models.QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+        if quantization != Quantization.NONE
+        else None
+    )
+    if hnsw_ef is None and quantization_params is None:
+        return None
+    return models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization_params)
+
+
+def _collect_payload_values(
+    values: dict[str, set[str]], points: list[models.Record]
+) -> None:
+    for point in points:
+        for key, found in values.items():
+            value = (point.payload or {}).get(key)
+            if isinstance(value, list):
+                found.update(v for v in value if v)
+            elif value:
+                found.add(value)
+
+
+def list_payload_values(
+    client: QdrantClient, collection_name: str, keys: list[str]
+) -> dict[str, list[str]]:
+    """
+    List the distinct values of string payload fields in a collection.
+
+    List-valued fields, such as tags, contribute each of their items.
+
+    Args:
+        client: The Qdrant client.
+        collection_name: The name of the collection.
+        keys: Payload keys to collect.
+
+    Returns:
+        Sorted distinct values per key.
+    """
+    values: dict[str, set[str]] = {key: set() for key in keys}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            with_payload=keys,
+            with_vectors=False,
+            limit=256,
+            offset=offset,
+        )
+        _collect_payload_values(values, points)
+        if offset is None:
+            return {key: sorted(found) for key, found in values.items()}
+
+
+async def alist_payload_values(
+    client: AsyncQdrantClient, collection_name: str, keys: list[str]
+) -> dict[str, list[str]]:
+    """
+    Async variant of `list_payload_values`.
+    """
+    values: dict[str, set[str]] = {key: set() for key in keys}
+    offset = None
+    while True:
+        points, offset = await client.scroll(
+            collection_name=collection_name,
+            with_payload=keys,
+            with_vectors=False,
+            limit=256,
+            offset=offset,
+        )
+        _collect_payload_values(values, points)
+        if offset is None:
+            return {key: sorted(found) for key, found in values.items()}
+
+
+def has_matching_points(
+    client: QdrantClient, collection_name: str, query_filter: models.Filter
+) -> bool:
+    """
+    Check whether any point of a collection matches a payload filter.
+
+    Args:
+        client: The Qdrant client.
+        collection_name: The name of the collection.
+        query_filter: The payload filter.
+
+    Returns:
+        True if at least one point matches.
+    """
+    result = client.count(
+        collection_name=collection_name, count_filter=query_filter, exact=True
+    )
+    return bool(result.count)
+
+
+async def ahas_matching_points(
+    client: AsyncQdrantClient, collection_name: str, query_filter: models.Filter
+) -> bool:
+    """
+    Async variant of `has_matching_points`.
+    """
+    result = await client.count(
+        collection_name=collection_name, count_filter=query_filter, exact=True
+    )
+    return bool(result.count)
+
+
+def delete_recipes(
+    client: QdrantClient, collection_name: str, recipe_ids: list[str]
+) -> None:
+    """
+    Delete all points belonging to the given Mealie recipes.
+
+    Args:
+        client: The Qdrant client.
+        collection_name: The name of the collection.
+        recipe_ids: Mealie recipe IDs whose points should be deleted.
+    """
+    if not recipe_ids:
+        return
+    logger.debug(
+        "Deleting recipe points",
+        extra={"collection": collection_name, "recipes_count": len(recipe_ids)},
+    )
+    client.delete(
+        collection_name=collection_name,
+        points_selector=models.FilterSelector(
+            filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="recipe_id", match=models.MatchAny(any=recipe_ids)
+                    )
+                ]
+            )
+        ),
+    )
+
+
+def get_alias_target(client: QdrantClient, alias: str) -> str | None:
+    """
+    Get the collection an alias points to.
+
+    Args:
+        client: The Qdrant client.
+        alias: The alias name.
+
+    Returns:
+        The collection name, or None if the alias does not exist.
+    """
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def switch_alias(client: QdrantClient, alias: str, collection_name: str) -> None:
+    """
+    Atomically point an alias to a collection.
+
+    A plain collection already named like the alias (e.g. from an ingest run
+    without reindex) is deleted first, since both cannot coexist. This
+    one-time migration to aliases is not zero-downtime: searches fail
+    between the deletion and the alias creation. Later switches between
+    versioned collections are atomic.
+
+    Args:
+        client: The Qdrant client.
+        alias: The alias name.
+        collection_name: The collection the alias should point to.
+    """
+    operations = []
+    if get_alias_target(client, alias) is not None:
+        operations.append(
+            models.DeleteAliasOperation(
+                delete_alias=models.DeleteAlias(alias_name=alias)
+            )
+        )
+    elif client.collection_exists(alias):
+        logger.warning(
+            f"Migrating collection '{alias}' to an alias: deleting it first, "
+            "so searches fail until the alias is created. Later reindex "
+            "switches are zero-downtime.",
+        )
+        client.delete_collection(alias)
+
+    operations.append(
+        models.CreateAliasOperation(
+            create_alias=models.CreateAlias(
+                collection_name=collection_name, alias_name=alias
+            )
+        )
+    )
+    # All operations are applied in a single atomic request
+    client.update_collection_aliases(change_aliases_operations=operations)
+    logger.info(f"Alias '{alias}' now points to '{collection_name}'.")
+
+
+def delete_old_versions(client: QdrantClient, alias: str, keep: int = 2) -> list[str]:
+    """
+    Delete old versioned collections of an alias.
+
+    Versioned collections are named `{alias}_v{timestamp}`. The collection the
+    alias currently points to is never deleted.
+
+    Args:
+        client: The Qdrant client.
+        alias: The alias name.
+        keep: Number of most recent versions to keep, including the current one.
+
+    Returns:
+        Names of the deleted collections.
+    """
+    current = get_alias_target(client, alias)
+    versions = sorted(
+        (
+            c.name
+            for c in client.get_collections().collections
+            if c.name.startswith(f"{alias}_v")
+        ),
+        reverse=True,
+    )
+    removed = []
+    for name in versions[max(keep, 1) :]:
+        if name == current:
+            continue
+        client.delete_collection(name)
+        removed.append(name)
+    return removed
+
+
+def _simple_query(
+    query_vectors: list[list[float]],
+    k: int,
+    query_filter: models.Filter | None,
+    search_params: models.SearchParams | None,
+) -> dict[str, Any]:
+    """Query arguments of a single query vector search."""
+    if len(query_vectors) != 1:
+        error_msg = f"Simple retrieval supports exactly one query vector, got {len(query_vectors)}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    return {
+        "query": query_vectors[0],
+        "limit": k,
+        "query_filter": query_filter,
+        "search_params": search_params,
+    }
+
+
 def retrieve_results_simple(
     query_vectors: list[list[float]],
     client: QdrantClient,
     collection_name: str,
     k: int = 3,
+    query_filter: models.Filter | None = None,
+    search_params: models.SearchParams | None = None,
 ) -> list[ScoredPoint]:
     """
     Retrieve search results from Qdrant using a single query vector.
@@ -37,6 +477,8 @@ def retrieve_results_simple(
         client: The Qdrant client.
         collection_name: The name of the collection to search.
         k: The number of results to return.
+        query_filter: Optional payload filter applied server-side.
+        search_params: Optional HNSW and quantization search parameters.
 
     Returns:
         List[ScoredPoint]: The search results.
@@ -44,27 +486,49 @@ def retrieve_results_simple(
     Raises:
         ValueError: If more than one query vector is provided.
     """
-    if len(query_vectors) != 1:
-        error_msg = f"Simple retrieval supports exactly one query vector, got {len(query_vectors)}"
-        logger.error(error_msg)
-        raise ValueError(error_msg)
-
     logger.debug(
         "Executing simple vector search",
         extra={"collection": collection_name, "k": k},
     )
 
     results = client.query_points(
-        collection_name=collection_name, query=query_vectors[0], limit=k
+        collection_name=collection_name,
+        **_simple_query(query_vectors, k, query_filter, search_params),
     )
     return results.points
 
 
+def _rrf_query(
+    query_vectors: list[list[float]],
+    k: int,
+    query_filter: models.Filter | None,
+    search_params: models.SearchParams | None,
+) -> dict[str, Any]:
+    """Query arguments of a server-side RRF fusion of the query vectors."""
+    prefetch = [
+        models.Prefetch(
+            query=query_vector,
+            filter=query_filter,
+            params=search_params,
+            limit=k,
+        )
+        for query_vector in query_vectors
+    ]
+    return {
+        "prefetch": prefetch,
+        "query": models.FusionQuery(fusion=models.Fusion.RRF),
+        "limit": k,
+        "query_filter": query_filter,
+    }
+
+
 def retrieve_results_rrf(
     query_vectors: list[list[float]],
     client: QdrantClient,
     collection_name: str,
     k: int = 3,
+    query_filter: models.Filter | None = None,
+    search_params: models.SearchParams | None = None,
 ) -> list[ScoredPoint]:
     """
     Retrieve search results from Qdrant using Reciprocal Rank Fusion (RRF).
@@ -74,6 +538,8 @@ def retrieve_results_rrf(
         client: The Qdrant client.
         collection_name: The name of the collection to search.
         k: The number of results to return.
+        query_filter: Optional payload filter applied server-side.
+        search_params: Optional HNSW and quantization search parameters.
 
     Returns:
         List[ScoredPoint]: The search results.
@@ -83,18 +549,571 @@ def retrieve_results_rrf(
         extra={"collection": collection_name, "k": k},
     )
 
-    prefetch = [
+    results = client.query_points(
+        collection_name=collection_name,
+        **_rrf_query(query_vectors, k, query_filter, search_params),
+    )
+    return results.points
+
+
+def fuse_results_rrf(results: list[list[ScoredPoint]], k: int = 3) -> list[ScoredPoint]:
+    """
+    Fuse per-query search results client-side with Reciprocal Rank Fusion.
+
+    Uses the same scoring as Qdrant's server-side RRF, so fusing the results
+    of `retrieve_results_simple` for each vector yields the same ranking as
+    `retrieve_results_rrf` on all vectors.
+
+    Args:
+        results: Search results of each query, best first.
+        k: The number of results to return.
+
+    Returns:
+        List[ScoredPoint]: The fused results.
+    """
+    return reciprocal_rank_fusion(results, limit=k)
+
+
+def _weight(weights: list[float] | None, i: int) -> float:
+    return weights[i] if weights is not None and i < len(weights) else 1.0
+
+
+def fuse_results_weighted_rrf(
+    results: list[list[ScoredPoint]],
+    k: int = 3,
+    weights: list[float] | None = None,
+) -> list[ScoredPoint]:
+    """
+    Fuse per-query search results with weighted Reciprocal Rank Fusion.
+
+    Each query contributes `weight / (ranking_constant + rank)` to the
+    score of its hits. With all weights at 1.0 this is `fuse_results_rrf`.
+
+    Args:
+        results: Search results of each query, best first.
+        k: The number of results to return.
+        weights: Per-query weights, missing weights default to 1.0.
+
+    Returns:
+        List[ScoredPoint]: The fused results.
+    """
+    scores: dict = {}
+    points: dict = {}
+    for i, hits in enumerate(results):
+        weight = _weight(weights, i)
+        for rank, hit in enumerate(hits):
+            points.setdefault(hit.id, hit)
+            scores[hit.id] = scores.get(hit.id, 0.0) + weight / (
+                DEFAULT_RANKING_CONSTANT_K + rank
+            )
+    return _top_k(points, scores, k)
+
+
+def fuse_results_score_sum(
+    results: list[list[ScoredPoint]],
+    k: int = 3,
+    weights: list[float] | None = None,
+) -> list[ScoredPoint]:
+    """
+    Fuse per-query search results by summing min-max normalized scores.
+
+    Scores of each query are scaled to [0, 1] before summing, so queries
+    with generally higher similarities do not dominate.
+
+    Args:
+        results: Search results of each query, best first.
+        k: The number of results to return.
+        weights: Per-query weights, missing weights default to 1.0.
+
+    Returns:
+        List[ScoredPoint]: The fused results.
+    """
+    scores: dict = {}
+    points: dict = {}
+    for i, hits in enumerate(results):
+        if not hits:
+            continue
+        weight = _weight(weights, i)
+        low = min(hit.score for hit in hits)
+        high = max(hit.score for hit in hits)
+        for hit in hits:
+            normalized = (hit.score - low) / (high - low) if high > low else 1.0
+            points.setdefault(hit.id, hit)
+            scores[hit.id] = scores.get(hit.id, 0.0) + weight * normalized
+    return _top_k(points, scores, k)
+
+
+def _top_k(points: dict, scores: dict, k: int) -> list[ScoredPoint]:
+    """Return the k best points, with their fused score."""
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [
+        points[point_id].model_copy(update={"score": score})
+        for point_id, score in ranked
+    ]
+
+
+def fuse_results(
+    results: list[list[ScoredPoint]],
+    k: int = 3,
+    method: FusionMethod = FusionMethod.RRF,
+    weights: list[float] | None = None,
+) -> list[ScoredPoint]:
+    """
+    Fuse per-query search results client-side.
+
+    Args:
+        results: Search results of each query, best first.
+        k: The number of results to return.
+        method: The fusion method.
+        weights: Per-query weights for the weighted methods.
+
+    Returns:
+        List[ScoredPoint]: The fused results.
+    """
+    if method == FusionMethod.WEIGHTED_RRF:
+        return fuse_results_weighted_rrf(results, k=k, weights=weights)
+    if method == FusionMethod.SCORE_SUM:
+        return fuse_results_score_sum(results, k=k, weights=weights)
+    return fuse_results_rrf(results, k=k)
+
+
+def _batch_requests(
+    query_vectors: list[list[float]],
+    depth: int,
+    query_filter: models.Filter | None = None,
+    search_params: models.SearchParams | None = None,
+) -> list[models.QueryRequest]:
+    return [
+        models.QueryRequest(
+            query=query_vector,
+            filter=query_filter,
+            params=search_params,
+            limit=depth,
+            with_payload=True,
+        )
+        for query_vector in query_vectors
+    ]
+
+
+def retrieve_results_batch(
+    query_vectors: list[list[float]],
+    client: QdrantClient,
+    collection_name: str,
+    k: int = 3,
+    depth: int = 20,
+    fusion: FusionMethod = FusionMethod.RRF,
+    weights: list[float] | None = None,
+    query_filter: models.Filter | None = None,
+    search_params: models.SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Retrieve search results with one batch request and client-side fusion.
+
+    All query vectors are searched in a single `query_batch_points`
+    round-trip, retrieving `depth` candidates each, and the per-query
+    results are fused locally.
+
+    Args:
+        query_vectors: A list of query vectors.
+        client: The Qdrant client.
+        collection_name: The name of the collection to search.
+        k: The number of results to return.
+        depth: The number of candidates retrieved per query vector.
+        fusion: The client-side fusion method.
+        weights: Per-query weights for the weighted fusion methods.
+        query_filter: Optional payload filter applied server-side.
+        search_params: Optional HNSW and quantization search parameters.
+
+    Returns:
+        List[ScoredPoint]: The fused results.
+    """
+    logger.debug(
+        f"Executing batch search with {len(query_vectors)} vectors",
+        extra={"collection": collection_name, "k": k, "depth": depth},
+    )
+
+    responses = client.query_batch_points(
+        collection_name=collection_name,
+        requests=_batch_requests(
+            query_vectors, max(depth, k), query_filter, search_params
+        ),
+    )
+    return fuse_results(
+        [response.points for response in responses],
+        k=k,
+        method=fusion,
+        weights=weights,
+    )
+
+
+def _hybrid_prefetch(
+    query_vectors: list[list[float]],
+    sparse_vectors: list[models.SparseVector],
+    depth: int,
+    query_filter: models.Filter | None = None,
+    vector_names: tuple[str | None, ...] = (None,),
+    search_params: models.SearchParams | None = None,
+) -> list[models.Prefetch]:
+    dense = [
         models.Prefetch(
             query=query_vector,
-            limit=k,
+            using=using,
+            filter=query_filter,
+            params=search_params,
+            limit=depth,
         )
         for query_vector in query_vectors
+        for using in vector_names
+    ]
+    sparse = [
+        models.Prefetch(
+            query=sparse_vector,
+            using=SPARSE_VECTOR_NAME,
+            filter=query_filter,
+            params=search_params,
+            limit=depth,
+        )
+        for sparse_vector in sparse_vectors
+        if sparse_vector.indices
     ]
+    return dense + sparse
+
+
+def _hybrid_query(
+    query_vectors: list[list[float]],
+    sparse_vectors: list[models.SparseVector],
+    k: int,
+    depth: int,
+    query_filter: models.Filter | None,
+    vector_names: tuple[str | None, ...],
+    search_params: models.SearchParams | None,
+) -> dict[str, Any]:
+    """Query arguments of a server-side RRF fusion of dense and sparse vectors."""
+    return {
+        "prefetch": _hybrid_prefetch(
+            query_vectors,
+            sparse_vectors,
+            max(depth, k),
+            query_filter,
+            vector_names,
+            search_params,
+        ),
+        "query": models.FusionQuery(fusion=models.Fusion.RRF),
+        "limit": k,
+        "query_filter": query_filter,
+    }
+
+
+def retrieve_results_hybrid(
+    query_vectors: list[list[float]],
+    sparse_vectors: list[models.SparseVector],
+    client: QdrantClient,
+    collection_name: str,
+    k: int = 3,
+    depth: int = 20,
+    query_filter: models.Filter | None = None,
+    vector_names: tuple[str | None, ...] = (None,),
+    search_params: models.SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Retrieve search results from dense and sparse vectors fused server-side.
+
+    Each dense query vector against each of the `vector_names` and each sparse
+    query vector retrieves `depth` candidates in its own prefetch, and Qdrant
+    fuses all of them with RRF. Sparse vectors without any term are skipped.
+
+    Args:
+        query_vectors: A list of dense query vectors.
+        sparse_vectors: A list of sparse query vectors.
+        client: The Qdrant client.
+        collection_name: The name of the collection to search.
+        k: The number of results to return.
+        depth: The number of candidates retrieved per query vector.
+        query_filter: Optional payload filter applied server-side.
+        vector_names: Dense vectors searched, None for the unnamed vector.
+        search_params: Optional HNSW and quantization search parameters.
+
+    Returns:
+        List[ScoredPoint]: The search results.
+    """
+    logger.debug(
+        f"Executing hybrid search with {len(query_vectors)} dense and "
+        f"{len(sparse_vectors)} sparse vectors",
+        extra={"collection": collection_name, "k": k, "depth": depth},
+    )
 
     results = client.query_points(
         collection_name=collection_name,
-        prefetch=prefetch,
-        query=models.FusionQuery(fusion=models.Fusion.RRF),
-        limit=k,
+        **_hybrid_query(
+            query_vectors,
+            sparse_vectors,
+            k,
+            depth,
+            query_filter,
+            vector_names,
+            search_params,
+        ),
     )
     return results.points
+
+
+def _best_field_requests(
+    query_vectors: list[list[float]],
+    sparse_vectors: list[models.SparseVector],
+    depth: int,
+    query_filter: models.Filter | None,
+    vector_names: tuple[str, ...],
+    search_params: models.SearchParams | None = None,
+) -> list[models.QueryRequest]:
+    dense = [
+        models.QueryRequest(
+            query=query_vector,
+            using=using,
+            filter=query_filter,
+            params=search_params,
+            limit=depth,
+            with_payload=True,
+        )
+        for query_vector in query_vectors
+        for using in vector_names
+    ]
+    sparse = [
+        models.QueryRequest(
+            query=sparse_vector,
+            using=SPARSE_VECTOR_NAME,
+            filter=query_filter,
+            params=search_params,
+            limit=depth,
+            with_payload=True,
+        )
+        for sparse_vector in sparse_vectors
+        if sparse_vector.indices
+    ]
+    return dense + sparse
+
+
+def _fuse_best_field(
+    responses: list[models.QueryResponse],
+    queries: int,
+    vector_names: tuple[str, ...],
+    k: int,
+) -> list[ScoredPoint]:
+    """
+    Score each recipe by its best field per query vector, then fuse the
+    per-query results (and the sparse results) with RRF.
+    """
+    fields = len(vector_names)
+    results = []
+    for i in range(queries):
+        best: dict = {}
+        for response in responses[i * fields : (i + 1) * fields]:
+            for point in response.points:
+                if point.id not in best or point.score > best[point.id].score:
+                    best[point.id] = point
+        results.append(sorted(best.values(), key=lambda p: p.score, reverse=True))
+    results += [response.points for response in responses[queries * fields :]]
+    if len(results) == 1:
+        return results[0][:k]
+    return fuse_results_rrf(results, k=k)
+
+
+def retrieve_results_best_field(
+    query_vectors: list[list[float]],
+    sparse_vectors: list[models.SparseVector],
+    client: QdrantClient,
+    collection_name: str,
+    k: int = 3,
+    depth: int = 20,
+    query_filter: models.Filter | None = None,
+    vector_names: tuple[str, ...] = FIELD_VECTOR_NAMES,
+    search_params: models.SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Retrieve search results scored by the best matching field vector.
+
+    Each query vector is searched against every field vector in one batch
+    request, and each recipe keeps its highest field score, so a question
+    about an ingredient is not diluted by long instructions. With several
+    query vectors or sparse vectors, the per-query results are fused with RRF.
+
+    Args:
+        query_vectors: A list of dense query vectors.
+        sparse_vectors: A list of sparse query vectors, may be empty.
+        client: The Qdrant client.
+        collection_name: The name of the collection to search.
+        k: The number of results to return.
+        depth: The number of candidates retrieved per query and field vector.
+        query_filter: Optional payload filter applied server-side.
+        vector_names: Field vectors searched.
+        search_params: Optional HNSW and quantization search parameters.
+
+    Returns:
+        List[ScoredPoint]: The search results.
+    """
+    logger.debug(
+        f"Executing best field search with {len(query_vectors)} vectors",
+        extra={"collection": collection_name, "k": k, "depth": depth},
+    )
+
+    responses = client.query_batch_points(
+        collection_name=collection_name,
+        requests=_best_field_requests(
+            query_vectors,
+            sparse_vectors,
+            max(depth, k),
+            query_filter,
+            vector_names,
+            search_params,
+        ),
+    )
+    return _fuse_best_field(responses, len(query_vectors), vector_names, k)
+
+
+async def aretrieve_results_simple(
+    query_vectors: list[list[float]],
+    client: AsyncQdrantClient,
+    collection_name: str,
+    k: int = 3,
+    query_filter: models.Filter | None = None,
+    search_params: models.SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Async variant of `retrieve_results_simple`.
+
+    Raises:
+        ValueError: If more than one query vector is provided.
+    """
+    logger.debug(
+        "Executing simple vector search",
+        extra={"collection": collection_name, "k": k},
+    )
+
+    results = await client.query_points(
+        collection_name=collection_name,
+        **_simple_query(query_vectors, k, query_filter, search_params),
+    )
+    return results.points
+
+
+async def aretrieve_results_rrf(
+    query_vectors: list[list[float]],
+    client: AsyncQdrantClient,
+    collection_name: str,
+    k: int = 3,
+    query_filter: models.Filter | None = None,
+    search_params: models.SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Async variant of `retrieve_results_rrf`.
+    """
+    logger.debug(
+        f"Executing RRF search with {len(query_vectors)} vectors",
+        extra={"collection": collection_name, "k": k},
+    )
+
+    results = await client.query_points(
+        collection_name=collection_name,
+        **_rrf_query(query_vectors, k, query_filter, search_params),
+    )
+    return results.points
+
+
+async def aretrieve_results_batch(
+    query_vectors: list[list[float]],
+    client: AsyncQdrantClient,
+    collection_name: str,
+    k: int = 3,
+    depth: int = 20,
+    fusion: FusionMethod = FusionMethod.RRF,
+    weights: list[float] | None = None,
+    query_filter: models.Filter | None = None,
+    search_params: models.SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Async variant of `retrieve_results_batch`.
+    """
+    logger.debug(
+        f"Executing batch search with {len(query_vectors)} vectors",
+        extra={"collection": collection_name, "k": k, "depth": depth},
+    )
+
+    responses = await client.query_batch_points(
+        collection_name=collection_name,
+        requests=_batch_requests(
+            query_vectors, max(depth, k), query_filter, search_params
+        ),
+    )
+    return fuse_results(
+        [response.points for response in responses],
+        k=k,
+        method=fusion,
+        weights=weights,
+    )
+
+
+async def aretrieve_results_hybrid(
+    query_vectors: list[list[float]],
+    sparse_vectors: list[models.SparseVector],
+    client: AsyncQdrantClient,
+    collection_name: str,
+    k: int = 3,
+    depth: int = 20,
+    query_filter: models.Filter | None = None,
+    vector_names: tuple[str | None, ...] = (None,),
+    search_params: models.SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Async variant of `retrieve_results_hybrid`.
+    """
+    logger.debug(
+        f"Executing hybrid search with {len(query_vectors)} dense and "
+        f"{len(sparse_vectors)} sparse vectors",
+        extra={"collection": collection_name, "k": k, "depth": depth},
+    )
+
+    results = await client.query_points(
+        collection_name=collection_name,
+        **_hybrid_query(
+            query_vectors,
+            sparse_vectors,
+            k,
+            depth,
+            query_filter,
+            vector_names,
+            search_params,
+        ),
+    )
+    return results.points
+
+
+async def aretrieve_results_best_field(
+    query_vectors: list[list[float]],
+    sparse_vectors: list[models.SparseVector],
+    client: AsyncQdrantClient,
+    collection_name: str,
+    k: int = 3,
+    depth: int = 20,
+    query_filter: models.Filter | None = None,
+    vector_names: tuple[str, ...] = FIELD_VECTOR_NAMES,
+    search_params: models.SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Async variant of `retrieve_results_best_field`.
+    """
+    logger.debug(
+        f"Executing best field search with {len(query_vectors)} vectors",
+        extra={"collection": collection_name, "k": k, "depth": depth},
+    )
+
+    responses = await client.query_batch_points(
+        collection_name=collection_name,
+        requests=_best_field_requests(
+            query_vectors,
+            sparse_vectors,
+            max(depth, k),
+            query_filter,
+            vector_names,
+            search_params,
+        ),
+    )
+    return _fuse_best_field(responses, len(query_vectors), vector_names, k)
@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -6,10 +6,11 @@ from mealierag.config import Settings
 
 
 @pytest.fixture
-def mock_env(monkeypatch):
+def mock_env(monkeypatch, tmp_path):
     """
     Mock environment variables for testing.
     """
+    monkeypatch.setenv("INGEST_STATE_PATH", str(tmp_path / "ingest_state.json"))
     monkeypatch.setenv("MEALIE_API_URL", "http://test-mealie/api/recipes")
     monkeypatch.setenv("MEALIE_TOKEN", "test-token")
     monkeypatch.setenv("VECTORDB_URL", "http://test-qdrant")
@@ -42,3 +43,23 @@ def mock_ollama_client(mocker):
     mock_client = MagicMock()
     mocker.patch("mealierag.llm_client.ollama.Client", return_value=mock_client)
     return mock_client
+
+
+@pytest.fixture
+def mock_async_qdrant_client(mocker):
+    """
+    Mock the AsyncQdrantClient.
+    """
+    mock_client = AsyncMock()
+    mocker.patch("mealierag.vectordb.AsyncQdrantClient", return_value=mock_client)
+    return mock_client
+
+
+@pytest.fixture
+def mock_async_ollama_client(mocker):
+    """
+    Mock the async Ollama client.
+    """
+    mock_client = AsyncMock()
+    mocker.patch("mealierag.llm_client.ollama.AsyncClient", return_value=mock_client)
+    return mock_client
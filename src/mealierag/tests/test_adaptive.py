@@ -0,0 +1,66 @@
+from qdrant_client.http.models import ScoredPoint
+
+from mealierag.adaptive import (
+    LLM_SECONDS_SAVED,
+    RECIPE_NAME,
+    SHORT_QUERY,
+    STRATEGY_REQUESTS,
+    match_recipe_name,
+    record_strategy,
+    score_margin,
+    select_by_query,
+    tokenize_names,
+)
+from mealierag.config import SearchStrategy
+from mealierag.metrics import observe
+
+
+def _hit(score: float) -> ScoredPoint:
+    return ScoredPoint(id=1, version=1, score=score)
+
+
+def test_match_recipe_name():
+    """Test names are matched ignoring case, word order and plurals."""
+    names = tokenize_names(["Chicken Curry", "Banana Pancakes", "!!"])
+
+    assert match_recipe_name("my banana pancake recipe", names) == "Banana Pancakes"
+    assert match_recipe_name("a curry with chicken please", names) == "Chicken Curry"
+    assert match_recipe_name("something with chicken", names) is None
+
+
+def test_match_single_word_recipe_name():
+    """Test single-word names only match an input that is just the name."""
+    names = tokenize_names(["Soup", "Pancakes"])
+
+    assert match_recipe_name("Pancakes", names) == "Pancakes"
+    assert match_recipe_name("soups", names) == "Soup"
+    assert match_recipe_name("what soup is good for a cold day", names) is None
+
+
+def test_select_by_query():
+    """Test short queries and recipe names select the simple strategy."""
+    names = tokenize_names(["Banana Pancakes"])
+
+    assert select_by_query("chicken curry", names, 3) == SHORT_QUERY
+    assert select_by_query("show me my banana pancake recipe", names, 3) == RECIPE_NAME
+    assert select_by_query("something warm for a rainy day", names, 3) is None
+
+
+def test_score_margin():
+    """Test the margin between the two best hits."""
+    assert score_margin([_hit(0.9), _hit(0.7)]) == 0.9 - 0.7
+    assert score_margin([_hit(0.9)]) == float("inf")
+    assert score_margin([]) == 0.0
+
+
+def test_record_strategy():
+    """Test strategy counters and the estimated LLM time saved."""
+    observe("query_expansion", 2.0)
+    saved = LLM_SECONDS_SAVED.value()
+    simple = STRATEGY_REQUESTS.value(SearchStrategy.SIMPLE, SHORT_QUERY)
+
+    record_strategy(SearchStrategy.SIMPLE, SHORT_QUERY)
+    record_strategy(SearchStrategy.MULTIQUERY, "ambiguous")
+
+    assert STRATEGY_REQUESTS.value(SearchStrategy.SIMPLE, SHORT_QUERY) == simple + 1
+    assert LLM_SECONDS_SAVED.value() > saved
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from qdrant_client.http.models import ScoredPoint
+
+from mealierag.answer_cache import (
+    AnswerCache,
+    SemanticAnswerCache,
+    answer_key,
+    arecord_answer,
+    areplay,
+    record_answer,
+    replay,
+)
+from mealierag.cache import SQLiteStore
+
+MESSAGES = [
+    {"role": "system", "content": "You are a chef."},
+    {"role": "user", "content": "Pancakes?"},
+]
+
+
+def _chunks(*contents):
+    return [{"message": {"content": content}} for content in contents]
+
+
+def test_answer_key():
+    """Test keys change with the model, the options and the messages."""
+    key = answer_key("llama", {"temperature": 0.2, "seed": 1}, MESSAGES)
+
+    assert key == answer_key("llama", {"seed": 1, "temperature": 0.2}, MESSAGES)
+    assert key != answer_key("mistral", {"temperature": 0.2, "seed": 1}, MESSAGES)
+    assert key != answer_key("llama", {"temperature": 0.2, "seed": 2}, MESSAGES)
+    assert key != answer_key("llama", {"temperature": 0.2, "seed": 1}, MESSAGES[1:])
+
+
+def test_replay():
+    """Test answers are replayed line by line, ending with a done chunk."""
+    chunks = list(replay("Mix.\nBake.\n"))
+
+    assert [c["message"]["content"] for c in chunks] == ["Mix.\n", "Bake.\n"]
+    assert [c["done"] for c in chunks] == [False, True]
+
+
+def test_record():
+    """Test a completed stream is passed through and cached."""
+    cache = AnswerCache(max_size=10)
+    stream = iter(_chunks("Hello", " there"))
+
+    chunks = list(record_answer(stream, lambda answer: cache.put("key", answer)))
+
+    assert chunks == _chunks("Hello", " there")
+    assert cache.get("key") == "Hello there"
+
+
+def test_record_interrupted():
+    """Test a failed stream is not cached."""
+    cache = AnswerCache(max_size=10)
+
+    def stream():
+        yield from _chunks("Hel")
+        raise ConnectionError
+
+    with pytest.raises(ConnectionError):
+        list(record_answer(stream(), lambda answer: cache.put("key", answer)))
+    assert cache.get("key") is None
+
+
+def test_arecord_and_areplay():
+    """Test async recording and replay."""
+    cache = AnswerCache(max_size=10)
+
+    async def stream():
+        for chunk in _chunks("Hello", "!"):
+            yield chunk
+
+    async def run():
+        recorded = [
+            chunk
+            async for chunk in arecord_answer(
+                stream(), lambda answer: cache.put("key", answer)
+            )
+        ]
+        replayed = [chunk async for chunk in areplay(cache.get("key"))]
+        return recorded, replayed
+
+    recorded, replayed = asyncio.run(run())
+    assert len(recorded) == 2
+    assert replayed[0]["message"]["content"] == "Hello!"
+
+
+def test_answer_cache_persistence(tmp_path):
+    """Test answers survive a restart with an on-disk store."""
+    path = str(tmp_path / "answers.sqlite")
+    AnswerCache(10, store=SQLiteStore(path)).put("key", "Hi")
+
+    assert AnswerCache(10, store=SQLiteStore(path)).get("key") == "Hi"
+
+
+def _hits(*recipes):
+    return [
+        ScoredPoint(
+            id=i,
+            version=0,
+            score=1.0,
+            payload={"recipe_id": recipe_id, "content_hash": content_hash},
+        )
+        for i, (recipe_id, content_hash) in enumerate(recipes)
+    ]
+
+
+def test_semantic_answer_cache():
+    """Test similar questions over the same recipes share an answer."""
+    cache = SemanticAnswerCache(max_size=10, threshold=0.9)
+    hits = _hits(("r1", "h1"), ("r2", "h2"))
+    cache.put([1.0, 0.0], hits, "Pancakes.")
+
+    assert cache.get([0.95, 0.1], list(reversed(hits))) == "Pancakes."
+    assert cache.get([0.5, 0.5], hits) is None
+    assert cache.get([1.0, 0.0], _hits(("r1", "h1"))) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_semantic_answer_cache_reingested():
+    """Test entries are dropped once a recipe has new content."""
+    cache = SemanticAnswerCache(max_size=10, threshold=0.9)
+    cache.put([1.0, 0.0], _hits(("r1", "h1")), "Pancakes.")
+
+    assert cache.get([1.0, 0.0], _hits(("r1", "h2"))) is None
+    assert len(cache) == 0
+
+
+def test_semantic_answer_cache_eviction():
+    """Test the least recently used entry is evicted."""
+    cache = SemanticAnswerCache(max_size=1, threshold=0.9)
+    cache.put([1.0, 0.0], _hits(("r1", "h1")), "Pancakes.")
+    cache.put([0.0, 1.0], _hits(("r2", "h2")), "Waffles.")
+
+    assert len(cache) == 1
+    assert cache.get([1.0, 0.0], _hits(("r1", "h1"))) is None
+    assert cache.get([0.0, 1.0], _hits(("r2", "h2"))) == "Waffles."
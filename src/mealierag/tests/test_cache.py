@@ -0,0 +1,103 @@
+from mealierag.cache import SQLiteStore, TTLCache, hash_key, normalize_text
+from mealierag.metrics import CACHE_REQUESTS
+
+
+def test_normalize_text():
+    """Test case and whitespace differences are ignored."""
+    assert normalize_text("  Quick   Chicken\tdinner ") == "quick chicken dinner"
+
+
+def test_hash_key():
+    """Test keys depend on every part, exactly."""
+    assert hash_key("m1", "text") == hash_key("m1", "text")
+    assert hash_key("m1", "text") != hash_key("m2", "text")
+    assert hash_key("m1", "text") != hash_key("m1", "text ")
+    assert hash_key({"a": 1, "b": 2}) == hash_key({"b": 2, "a": 1})
+
+
+def test_ttl_cache_lru_eviction():
+    """Test the least recently used entry is evicted when full."""
+    cache = TTLCache("test_lru", max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expiry(mocker):
+    """Test entries expire after the time-to-live."""
+    now = mocker.patch("mealierag.cache.time.time", return_value=100.0)
+    cache = TTLCache("test_ttl", max_size=10, ttl=5)
+    cache.put("a", 1)
+
+    now.return_value = 104.0
+    assert cache.get("a") == 1
+    now.return_value = 105.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_stats():
+    """Test hits and misses are counted and exported as metrics."""
+    cache = TTLCache("test_stats", max_size=10)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.get("c")
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert CACHE_REQUESTS.value("test_stats", "hit") == 1
+    assert CACHE_REQUESTS.value("test_stats", "miss") == 2
+
+
+def test_ttl_cache_disabled():
+    """Test a zero-sized cache stores nothing."""
+    cache = TTLCache("test_disabled", max_size=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_sqlite_store_roundtrip(tmp_path):
+    """Test values survive reopening the store and honour their expiry."""
+    path = str(tmp_path / "store.sqlite")
+    store = SQLiteStore(path)
+    store.put("a", ["x", "y"], expires_at=None)
+    store.put("b", ["z"], expires_at=1.0)
+    store.close()
+
+    store = SQLiteStore(path)
+    assert store.get("a") == (["x", "y"], None)
+    assert store.get("b") is None
+    assert len(store) == 1
+    store.close()
+
+
+def test_sqlite_store_eviction(tmp_path):
+    """Test least recently used entries are evicted over the limit."""
+    store = SQLiteStore(str(tmp_path / "store.sqlite"), max_entries=2)
+    store.put("a", 1, None)
+    store.put("b", 2, None)
+    store.get("a")
+    store.put("c", 3, None)
+
+    assert store.get("b") is None
+    assert store.get("a") == (1, None)
+    assert store.get("c") == (3, None)
+    store.close()
+
+
+def test_ttl_cache_store_fallback(tmp_path):
+    """Test in-process misses are served from the store and keep its expiry."""
+    store = SQLiteStore(str(tmp_path / "store.sqlite"))
+    TTLCache("test_store_writer", max_size=10, ttl=60, store=store).put("a", [1])
+
+    cache = TTLCache("test_store_reader", max_size=10, ttl=60, store=store)
+    assert cache.get("a") == [1]
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (1, 0)
+    store.close()
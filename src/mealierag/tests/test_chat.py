@@ -3,8 +3,10 @@ from qdrant_client.http.models import ScoredPoint
 from mealierag.chat import (
     SYSTEM_PROMPT,
     USER_MESSAGE,
+    estimate_tokens,
     populate_context,
     populate_messages,
+    system_prompt,
 )
 from mealierag.config import settings
 
@@ -68,3 +70,94 @@ def test_populate_messages():
     expected_user_msg = USER_MESSAGE.format(context_text=context_text, query=query)
 
     assert messages[1]["content"] == expected_user_msg
+
+
+def _recipe_hit(i, steps):
+    text = (
+        f"Title: Recipe {i}\nDescription: Tasty dish {i}\nRating: 4.5\n"
+        "Category: Dinner\nTags: quick\nIngredients:\n- 1 egg\n- 2 cups flour\n"
+        "Instructions:\n" + "".join(f"- Step {n} of a long method.\n" for n in steps)
+    )
+    return ScoredPoint(
+        id=i,
+        version=1,
+        score=1.0 - i / 10,
+        payload={"name": f"Recipe {i}", "recipe_id": f"uuid-{i}", "text": text},
+    )
+
+
+def test_populate_context_unlimited():
+    """Test the full recipe texts are kept without a budget."""
+    hits = [_recipe_hit(1, range(50)), _recipe_hit(2, range(50))]
+
+    context = populate_context(hits, token_budget=0)
+
+    assert context.count("of a long method") == 100
+    assert "- ...\n" not in context
+
+
+def test_populate_context_trims_instructions_first():
+    """Test instructions of the least relevant recipe are trimmed first."""
+    hits = [_recipe_hit(1, range(20)), _recipe_hit(2, range(20))]
+    full = populate_context(hits, token_budget=0)
+
+    context = populate_context(hits, token_budget=estimate_tokens(full) - 50)
+
+    first, second = context.split("[RECIPE_END]\n")[:2]
+    assert first.count("of a long method") == 20
+    assert 0 < second.count("of a long method") < 20
+    assert "- ...\n" in second
+    assert "- 2 cups flour" in second
+    assert estimate_tokens(context) <= estimate_tokens(full) - 50
+
+
+def test_populate_context_keeps_ratings_and_links():
+    """Test names, IDs and ratings survive a tiny budget."""
+    hits = [_recipe_hit(i, range(10)) for i in range(3)]
+
+    context = populate_context(hits, token_budget=10)
+
+    assert "of a long method" not in context
+    assert "- 1 egg" not in context
+    assert "Description:" not in context
+    for i in range(3):
+        assert f"RecipeName: Recipe {i}\nRecipeID: uuid-{i}\n" in context
+        assert f"Title: Recipe {i}\n" in context
+    assert context.count("Rating: 4.5") == 3
+    assert context.count("Tags: quick") == 3
+
+
+def test_populate_context_trims_multi_line_description(caplog):
+    """Test every line of a multi-line description can be trimmed."""
+    hit = _recipe_hit(1, range(10))
+    hit.payload["text"] = hit.payload["text"].replace(
+        "Tasty dish 1\n", "Tasty dish 1\n" + "A long family story.\n" * 200
+    )
+
+    context = populate_context([hit], token_budget=100)
+
+    assert estimate_tokens(context) <= 100
+    assert 0 < context.count("family story") < 200
+    assert "Rating: 4.5\nCategory: Dinner\nTags: quick\n" in context
+    assert "exceeds token budget" not in caplog.text
+
+
+def test_populate_context_default_budget(mocker):
+    """Test the budget defaults to the setting."""
+    mocker.patch.object(settings, "context_token_budget", 10)
+
+    context = populate_context([_recipe_hit(1, range(10))])
+
+    assert "of a long method" not in context
+
+
+def test_populate_messages_stable_prefix():
+    """Test the system prompt is the same string for every request."""
+    hits = [_recipe_hit(1, range(3))]
+
+    first = populate_messages("Pancakes?", hits)
+    second = populate_messages("Waffles?", hits)
+
+    assert first[0]["content"] is second[0]["content"]
+    assert first[0]["content"] is system_prompt(settings.mealie_external_url)
+    assert "[CONTEXT]:" in first[1]["content"]
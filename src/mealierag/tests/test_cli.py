@@ -34,7 +34,15 @@ def test_cli_ingest(mocker):
     mock_main = mocker.patch("mealierag.cli.ingest_main")
     result = runner.invoke(app, ["ingest"])
     assert result.exit_code == 0
-    mock_main.assert_called_once()
+    mock_main.assert_called_once_with(incremental=False, reindex=False, resume=False)
+
+
+def test_cli_ingest_incremental(mocker):
+    """Test incremental ingest command."""
+    mock_main = mocker.patch("mealierag.cli.ingest_main")
+    result = runner.invoke(app, ["ingest", "--incremental"])
+    assert result.exit_code == 0
+    mock_main.assert_called_once_with(incremental=True, reindex=False, resume=False)
 
 
 def test_cli_qa_cli(mocker):
@@ -51,3 +59,29 @@ def test_cli_qa_ui(mocker):
     result = runner.invoke(app, ["qa-ui"])
     assert result.exit_code == 0
     mock_main.assert_called_once()
+
+
+def test_cli_ingest_reindex(mocker):
+    """Test reindex ingest command."""
+    mock_main = mocker.patch("mealierag.cli.ingest_main")
+    result = runner.invoke(app, ["ingest", "--reindex"])
+    assert result.exit_code == 0
+    mock_main.assert_called_once_with(incremental=False, reindex=True, resume=False)
+
+
+def test_cli_ingest_resume(mocker):
+    """Test resumed ingest command."""
+    mock_main = mocker.patch("mealierag.cli.ingest_main")
+    result = runner.invoke(app, ["ingest", "--reindex", "--resume"])
+    assert result.exit_code == 0
+    mock_main.assert_called_once_with(incremental=False, reindex=True, resume=True)
+
+
+def test_cli_starts_metrics_server(mocker):
+    """Test the metrics server is started when a port is configured."""
+    mocker.patch("mealierag.cli.settings.metrics_port", 9100)
+    mock_start = mocker.patch("mealierag.cli.start_metrics_server")
+    mocker.patch("mealierag.cli.fetch_main")
+    result = runner.invoke(app, ["fetch"])
+    assert result.exit_code == 0
+    mock_start.assert_called_once_with(9100)
@@ -8,11 +8,17 @@ def test_settings_defaults(monkeypatch):
     monkeypatch.delenv("MEALIE_API_URL", raising=False)
     monkeypatch.delenv("VECTORDB_K", raising=False)
     monkeypatch.delenv("SEARCH_STRATEGY", raising=False)
+    monkeypatch.delenv("LLM_NUM_CTX", raising=False)
+    monkeypatch.delenv("LLM_KEEP_ALIVE", raising=False)
+    monkeypatch.delenv("EMBEDDING_KEEP_ALIVE", raising=False)
 
     settings = Settings()
     assert settings.mealie_api_url == "http://localhost:9000/api/recipes"
     assert settings.vectordb_k == 3
     assert settings.search_strategy == SearchStrategy.SIMPLE
+    assert settings.llm_num_ctx is None
+    assert settings.llm_keep_alive is None
+    assert settings.embedding_keep_alive is None
 
 
 def test_settings_from_env(monkeypatch):
@@ -27,3 +33,16 @@ def test_settings_from_env(monkeypatch):
     assert settings.mealie_api_url == "http://env-api"
     assert settings.vectordb_k == 10
     assert settings.search_strategy == SearchStrategy.MULTIQUERY
+
+
+def test_vocabulary_ttl_alias(monkeypatch):
+    """
+    Test the previous ADAPTIVE_NAMES_TTL name still sets the vocabulary TTL.
+    """
+    monkeypatch.delenv("VOCABULARY_TTL", raising=False)
+    monkeypatch.setenv("ADAPTIVE_NAMES_TTL", "30")
+    assert Settings().vocabulary_ttl == 30
+
+    monkeypatch.setenv("VOCABULARY_TTL", "60")
+    monkeypatch.delenv("ADAPTIVE_NAMES_TTL")
+    assert Settings().vocabulary_ttl == 60
@@ -0,0 +1,72 @@
+import pytest
+
+from mealierag.embedding_cache import EmbeddingCache, get_embedding_cache
+from mealierag.embeddings import get_embedding
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_cache_roundtrip(cache):
+    """Test stored embeddings are returned as float32 values."""
+    cache.put_many("model", ["a", "b"], [[0.5, 0.25], [1.0, -2.0]])
+
+    assert cache.get_many("model", ["b", "c", "a"]) == [
+        [1.0, -2.0],
+        None,
+        [0.5, 0.25],
+    ]
+    assert cache.get_many("other-model", ["a"]) == [None]
+    assert cache.hits == 2
+    assert cache.misses == 2
+    # 2 dimensions * 4 bytes * 2 entries
+    assert cache.size_bytes() == 16
+
+
+def test_cache_eviction(tmp_path):
+    """Test least recently used entries are evicted over the size limit."""
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_bytes=16)
+
+    cache.put_many("model", ["a", "b"], [[1.0, 1.0], [2.0, 2.0]])
+    # Touch "a" so "b" becomes the least recently used entry
+    cache.get_many("model", ["a"])
+    cache.put_many("model", ["c"], [[3.0, 3.0]])
+
+    assert len(cache) == 2
+    assert cache.get_many("model", ["a", "b", "c"]) == [[1.0, 1.0], None, [3.0, 3.0]]
+    cache.close()
+
+
+def test_get_embedding_cache_disabled():
+    """Test no cache is used without a path."""
+    assert get_embedding_cache(None) is None
+
+
+def test_get_embedding_uses_cache(tmp_path, mock_settings, mock_ollama_client):
+    """Test only cache misses are sent to the model."""
+    mock_settings.embedding_cache_path = str(tmp_path / "embeddings.sqlite")
+    mock_ollama_client.embed.side_effect = lambda model, input: {
+        "embeddings": [[float(len(t))] for t in input]
+    }
+
+    assert get_embedding(["a", "bb"], mock_ollama_client, mock_settings) == [
+        [1.0],
+        [2.0],
+    ]
+    assert get_embedding(["bb", "ccc"], mock_ollama_client, mock_settings) == [
+        [2.0],
+        [3.0],
+    ]
+    assert get_embedding(["a", "ccc"], mock_ollama_client, mock_settings) == [
+        [1.0],
+        [3.0],
+    ]
+
+    assert [c.kwargs["input"] for c in mock_ollama_client.embed.call_args_list] == [
+        ["a", "bb"],
+        ["ccc"],
+    ]
@@ -1,6 +1,14 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import ollama
 import pytest
 
-from mealierag.embeddings import get_embedding
+from mealierag.embeddings import (
+    aget_embedding,
+    get_embedding,
+    get_embedding_batch_size,
+)
 
 
 def test_get_embedding(mock_settings, mock_ollama_client):
@@ -24,3 +32,89 @@ def test_get_embedding_error(mock_settings, mock_ollama_client):
 
     with pytest.raises(Exception, match="Error generating embedding"):
         get_embedding(["test"], mock_ollama_client, mock_settings)
+
+
+def test_get_embedding_batches(mock_settings, mock_ollama_client):
+    """Test texts are embedded in batches of the configured size."""
+    mock_settings.embedding_batch_size = 2
+    mock_ollama_client.embed.side_effect = lambda model, input: {
+        "embeddings": [[float(t)] for t in input]
+    }
+
+    embeddings = get_embedding(
+        ["1", "2", "3", "4", "5"], mock_ollama_client, mock_settings
+    )
+
+    assert embeddings == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert [c.kwargs["input"] for c in mock_ollama_client.embed.call_args_list] == [
+        ["1", "2"],
+        ["3", "4"],
+        ["5"],
+    ]
+
+
+def test_get_embedding_splits_rejected_batch(mock_settings, mock_ollama_client):
+    """Test a batch rejected by the model is split until it fits."""
+
+    def embed(model, input):
+        if len(input) > 1:
+            raise ollama.ResponseError("input exceeds context length", 400)
+        return {"embeddings": [[float(input[0])]]}
+
+    mock_ollama_client.embed.side_effect = embed
+
+    embeddings = get_embedding(["1", "2", "3"], mock_ollama_client, mock_settings)
+
+    assert embeddings == [[1.0], [2.0], [3.0]]
+
+
+def test_get_embedding_other_errors_not_split(mock_settings, mock_ollama_client):
+    """Test errors unrelated to the batch size are raised without splitting."""
+    mock_ollama_client.embed.side_effect = ollama.ResponseError(
+        'model "bge-m3" not found', 404
+    )
+
+    with pytest.raises(Exception, match="not found"):
+        get_embedding(["1", "2", "3", "4"], mock_ollama_client, mock_settings)
+    assert mock_ollama_client.embed.call_count == 1
+
+
+def test_get_embedding_batch_size_per_model(mock_settings):
+    """Test per-model batch size overrides."""
+    mock_settings.embedding_batch_size = 8
+    mock_settings.embedding_batch_sizes = {"big-model": 2}
+
+    mock_settings.embedding_model = "big-model"
+    assert get_embedding_batch_size(mock_settings) == 2
+
+    mock_settings.embedding_model = "other-model"
+    assert get_embedding_batch_size(mock_settings) == 8
+
+
+def test_aget_embedding(mock_settings):
+    """Test async embedding generation batches and splits like the sync one."""
+    mock_settings.embedding_batch_size = 2
+    client = AsyncMock()
+
+    async def embed(model, input):
+        if len(input) > 1 and input[0] == "3":
+            raise ollama.ResponseError("input exceeds context length", 400)
+        return {"embeddings": [[float(t)] for t in input]}
+
+    client.embed.side_effect = embed
+
+    embeddings = asyncio.run(
+        aget_embedding(["1", "2", "3", "4"], client, mock_settings)
+    )
+
+    assert embeddings == [[1.0], [2.0], [3.0], [4.0]]
+    assert client.embed.await_count == 4
+
+
+def test_aget_embedding_error(mock_settings):
+    """Test async embedding generation error."""
+    client = AsyncMock()
+    client.embed.side_effect = Exception("Ollama Error")
+
+    with pytest.raises(Exception, match="Error generating embedding"):
+        asyncio.run(aget_embedding(["test"], client, mock_settings))
@@ -0,0 +1,78 @@
+from qdrant_client import models
+
+from mealierag.filters import RecipeFilter, extract_filter, to_qdrant_filter
+
+TAGS = ["Vegetarian", "Quick", "Gluten Free"]
+CATEGORIES = ["Dinner", "Dessert"]
+
+
+def test_extract_filter():
+    """Test tags, categories and ratings are recognized in a question."""
+    recipe_filter = extract_filter("5-star vegetarian dinners", TAGS, CATEGORIES)
+
+    assert recipe_filter == RecipeFilter(
+        tags=["Vegetarian"], categories=["Dinner"], min_rating=5
+    )
+
+
+def test_extract_filter_multi_word_tag():
+    """Test multi-word tags need all their words and ratings allow decimals."""
+    recipe_filter = extract_filter(
+        "something gluten free rated 4.5 stars", TAGS, CATEGORIES
+    )
+
+    assert recipe_filter.tags == ["Gluten Free"]
+    assert recipe_filter.min_rating == 4.5
+    assert extract_filter("free dessert ideas", TAGS, CATEGORIES).tags == []
+
+
+def test_extract_filter_star_ingredients():
+    """Test ingredient quantities are not mistaken for ratings."""
+    for question in [
+        "pho with 2 star anise",
+        "a salad with 3 star fruits",
+        "cookies cut into 4 star shapes",
+        "a 10 star dinner",
+        "anything rated 10",
+    ]:
+        assert extract_filter(question, TAGS, CATEGORIES).min_rating is None
+
+
+def test_extract_filter_rating_phrases():
+    """Test ratings are read from numbers tied to a rating word."""
+    for question, rating in [
+        ("dinners rated 4", 4),
+        ("a dessert rated at least 3.5 stars", 3.5),
+        ("soups with a rating of 4", 4),
+        ("4+ stars pasta", 4),
+        ("3 stars or more", 3),
+    ]:
+        assert extract_filter(question, TAGS, CATEGORIES).min_rating == rating
+
+
+def test_extract_filter_empty():
+    """Test questions without constraints yield an empty filter."""
+    recipe_filter = extract_filter("what can I cook tonight", TAGS, CATEGORIES)
+
+    assert recipe_filter.is_empty()
+    assert to_qdrant_filter(recipe_filter) is None
+    assert to_qdrant_filter(None) is None
+
+
+def test_to_qdrant_filter():
+    """Test every constraint becomes a required payload condition."""
+    query_filter = to_qdrant_filter(
+        RecipeFilter(tags=["Vegetarian"], categories=["Dinner"], min_rating=4)
+    )
+
+    assert query_filter == models.Filter(
+        must=[
+            models.FieldCondition(
+                key="tags", match=models.MatchValue(value="Vegetarian")
+            ),
+            models.FieldCondition(
+                key="category", match=models.MatchValue(value="Dinner")
+            ),
+            models.FieldCondition(key="rating", range=models.Range(gte=4)),
+        ]
+    )
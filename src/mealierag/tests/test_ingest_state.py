@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+
+from mealierag.ingest_state import IngestState, load_ingest_state, save_ingest_state
+
+
+def test_load_missing_state(tmp_path):
+    """Test a missing state file yields an empty state."""
+    state = load_ingest_state(str(tmp_path / "missing.json"))
+
+    assert state == IngestState()
+
+
+def test_save_and_load_state(tmp_path):
+    """Test the state survives a roundtrip."""
+    path = str(tmp_path / "nested" / "state.json")
+    state = IngestState(collection_name="recipes", watermark=datetime(2024, 5, 1, 10))
+
+    save_ingest_state(path, state)
+
+    assert load_ingest_state(path) == state
+
+
+def test_load_corrupt_state(tmp_path):
+    """Test a corrupt state file raises a clear error."""
+    path = tmp_path / "state.json"
+    path.write_text("{not json")
+
+    with pytest.raises(Exception, match="Error loading ingest state"):
+        load_ingest_state(str(path))
@@ -1,4 +1,6 @@
-from mealierag.llm_client import OllamaClient
+import asyncio
+
+from mealierag.llm_client import AsyncOllamaClient, OllamaClient
 
 
 def test_ollama_client_init(mock_ollama_client):
@@ -55,3 +57,47 @@ def test_ollama_client_embed(mock_ollama_client):
 
     mock_ollama_client.embed.assert_called_with(model="model", input="text")
     assert response == {"embeddings": [[0.1]]}
+
+
+def test_async_ollama_client_chat(mock_async_ollama_client):
+    """Test async non-streaming chat."""
+    client = AsyncOllamaClient("http://test")
+    messages = [{"role": "user", "content": "hello"}]
+    mock_async_ollama_client.chat.return_value = {"message": {"content": "response"}}
+
+    response = asyncio.run(client.chat(messages, "model", 0.5, 42))
+
+    mock_async_ollama_client.chat.assert_awaited_with(
+        model="model",
+        messages=messages,
+        stream=False,
+        options={"temperature": 0.5, "seed": 42},
+    )
+    assert response == "response"
+
+
+def test_async_ollama_client_embed(mock_async_ollama_client):
+    """Test async embed."""
+    client = AsyncOllamaClient("http://test")
+    mock_async_ollama_client.embed.return_value = {"embeddings": [[0.1]]}
+
+    response = asyncio.run(client.embed(model="model", input="text"))
+
+    assert response == {"embeddings": [[0.1]]}
+
+
+def test_ollama_client_keep_alive_and_num_ctx(mock_ollama_client):
+    """Test keep_alive and a fixed context window are sent with every chat."""
+    client = OllamaClient("http://test", keep_alive="30m", num_ctx=8192)
+    messages = [{"role": "user", "content": "hello"}]
+    mock_ollama_client.chat.return_value = {"message": {"content": "response"}}
+
+    client.chat(messages, "model", 0.5)
+
+    mock_ollama_client.chat.assert_called_with(
+        model="model",
+        messages=messages,
+        stream=False,
+        options={"temperature": 0.5, "num_ctx": 8192},
+        keep_alive="30m",
+    )
@@ -1,8 +1,15 @@
+import threading
+import time
 from unittest.mock import MagicMock
 
 import pytest
 
-from mealierag.mealie import fetch_full_recipe, fetch_recipes
+from mealierag.mealie import (
+    fetch_full_recipe,
+    fetch_full_recipes,
+    fetch_recipes,
+    get_mealie_session,
+)
 from mealierag.models import Recipe
 
 
@@ -91,3 +98,96 @@ def test_fetch_full_recipe(mocker):
 
     assert full_recipe.name == "Full Recipe"
     assert full_recipe.description == "Full details"
+
+
+def test_get_mealie_session():
+    """
+    Test the pooled session carries the auth header and pool size.
+    """
+    session = get_mealie_session("test-token", pool_size=4)
+
+    assert session.headers["Authorization"] == "Bearer test-token"
+    assert session.get_adapter("http://test-mealie")._pool_maxsize == 4
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_fetch_full_recipes_keeps_order(mocker, max_workers):
+    """
+    Test full recipes are returned in listing order, even when detail
+    requests complete out of order.
+    """
+    base_url = "http://test-mealie/api/recipes"
+    ids = ["1", "2", "3", "4"]
+
+    def fake_get(url, headers=None, params=None):
+        response = MagicMock()
+        response.raise_for_status.return_value = None
+        if url == base_url:
+            response.json.return_value = {
+                "page": 1,
+                "per_page": 10,
+                "total": len(ids),
+                "total_pages": 1,
+                "items": [
+                    {"name": f"Recipe {i}", "slug": f"recipe-{i}", "id": i} for i in ids
+                ],
+            }
+        else:
+            recipe_id = url.rsplit("/", 1)[-1]
+            # Earlier recipes answer slower
+            time.sleep(0.01 * (len(ids) - int(recipe_id)))
+            response.json.return_value = {
+                "name": f"Full {recipe_id}",
+                "slug": f"recipe-{recipe_id}",
+                "id": recipe_id,
+            }
+        return response
+
+    mock_get = mocker.patch("requests.Session.get", side_effect=fake_get)
+
+    recipes = fetch_full_recipes(base_url, "test-token", max_workers=max_workers)
+
+    assert [r.name for r in recipes] == [f"Full {i}" for i in ids]
+    assert mock_get.call_count == len(ids) + 1
+
+
+def test_fetch_full_recipes_across_pages(mocker):
+    """
+    Test detail requests of all listing pages run concurrently, beyond the
+    page size.
+    """
+    base_url = "http://test-mealie/api/recipes"
+    ids = [str(i) for i in range(12)]
+    # Only passes once every detail request is in flight at the same time
+    in_flight = threading.Barrier(len(ids), timeout=5)
+
+    def fake_get(url, headers=None, params=None):
+        response = MagicMock()
+        response.raise_for_status.return_value = None
+        if url == base_url:
+            page_ids = ids[(params["page"] - 1) * 10 :][:10]
+            response.json.return_value = {
+                "page": params["page"],
+                "per_page": 10,
+                "total": len(ids),
+                "total_pages": 2,
+                "items": [
+                    {"name": f"Recipe {i}", "slug": f"recipe-{i}", "id": i}
+                    for i in page_ids
+                ],
+            }
+        else:
+            recipe_id = url.rsplit("/", 1)[-1]
+            in_flight.wait()
+            response.json.return_value = {
+                "name": f"Full {recipe_id}",
+                "slug": f"recipe-{recipe_id}",
+                "id": recipe_id,
+            }
+        return response
+
+    mocker.patch("requests.Session.get", side_effect=fake_get)
+
+    recipes = fetch_full_recipes(base_url, "test-token", max_workers=len(ids))
+
+    assert [r.name for r in recipes] == [f"Full {i}" for i in ids]
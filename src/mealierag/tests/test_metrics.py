@@ -0,0 +1,104 @@
+import asyncio
+import urllib.error
+import urllib.request
+
+import pytest
+
+from mealierag.metrics import (
+    Histogram,
+    atimed_stream,
+    request_timer,
+    start_metrics_server,
+    timed,
+    timed_stream,
+)
+
+
+def test_histogram_render():
+    """Test observations are rendered as cumulative Prometheus buckets."""
+    histogram = Histogram("test_seconds", "Test histogram.", "stage", (0.1, 1.0))
+    histogram.observe("a", 0.05)
+    histogram.observe("a", 0.5)
+    histogram.observe("a", 5.0)
+
+    text = histogram.render()
+
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="a"} 3' in text
+    assert histogram.count("a") == 3
+    assert histogram.count("missing") == 0
+
+
+def test_request_timer_collects_stages():
+    """Test stage timings are collected for the current request only."""
+    with request_timer() as timings:
+        with timed("stage_a"):
+            pass
+        with timed("stage_a"):
+            pass
+
+    with timed("stage_b"):
+        pass
+
+    assert set(timings) == {"stage_a", "total"}
+    assert timings["total"] >= timings["stage_a"]
+
+
+def test_timed_records_on_error():
+    """Test a failing stage is still timed."""
+    with request_timer() as timings:
+        with pytest.raises(ValueError):
+            with timed("failing"):
+                raise ValueError("boom")
+
+    assert "failing" in timings
+
+
+def test_timed_stream():
+    """Test time to first token and generation time are recorded."""
+    with request_timer() as timings:
+        chunks = list(timed_stream(iter(["a", "b"])))
+
+    assert chunks == ["a", "b"]
+    assert timings["llm_first_token"] <= timings["llm_generation"]
+
+
+def test_atimed_stream():
+    """Test the async stream wrapper records the same stages."""
+
+    async def stream():
+        yield "a"
+        yield "b"
+
+    async def run():
+        with request_timer() as timings:
+            chunks = [chunk async for chunk in atimed_stream(stream())]
+        return chunks, timings
+
+    chunks, timings = asyncio.run(run())
+
+    assert chunks == ["a", "b"]
+    assert "llm_first_token" in timings
+    assert "llm_generation" in timings
+
+
+def test_metrics_server():
+    """Test the metrics endpoint serves the stage histogram."""
+    with timed("server_test"):
+        pass
+    server = start_metrics_server(0, host="127.0.0.1")
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode()
+        assert response.status == 200
+        assert 'mealierag_stage_duration_seconds_count{stage="server_test"}' in body
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,3 +1,7 @@
+from datetime import datetime
+
+import pytest
+
 from mealierag.models import Recipe, RecipeIngredient, RecipeInstruction
 
 
@@ -39,3 +43,49 @@ def test_recipe_model_embedding_text():
 
     for part in expected_parts:
         assert part in text
+
+
+def test_recipe_field_texts():
+    """
+    Test the recipe fields are split into separately embedded texts.
+    """
+    recipe = Recipe(
+        name="Shakshuka",
+        slug="shakshuka",
+        description="Eggs in tomato sauce.",
+        tags=["Vegetarian"],
+        recipeIngredient=[RecipeIngredient(display="4 eggs")],
+        recipeInstructions=[RecipeInstruction(text="Poach the eggs.")],
+    )
+
+    fields = recipe.get_field_texts_for_embedding()
+
+    assert list(fields) == ["title", "ingredients", "instructions"]
+    assert "Shakshuka" in fields["title"]
+    assert "Eggs in tomato sauce." in fields["title"]
+    assert fields["ingredients"] == "Ingredients:\n- 4 eggs\n"
+    assert fields["instructions"] == "Instructions:\n- Poach the eggs.\n"
+    # Empty fields are not embedded
+    assert list(Recipe(name="Toast", slug="toast").get_field_texts_for_embedding()) == [
+        "title"
+    ]
+
+
+@pytest.mark.parametrize(
+    "fields,expected",
+    [
+        ({"updatedAt": "2024-05-01T10:00:00"}, datetime(2024, 5, 1, 10)),
+        ({"updatedAt": "2024-05-01T12:00:00+02:00"}, datetime(2024, 5, 1, 10)),
+        ({"updatedAt": "2024-05-01T10:00:00Z"}, datetime(2024, 5, 1, 10)),
+        ({"dateUpdated": "2024-05-01T10:00:00"}, datetime(2024, 5, 1, 10)),
+        ({"updatedAt": "not-a-date"}, None),
+        ({}, None),
+    ],
+)
+def test_recipe_get_updated_at(fields, expected):
+    """
+    Test the recipe update time is parsed as naive UTC.
+    """
+    recipe = Recipe(name="Test", slug="test", **fields)
+
+    assert recipe.get_updated_at() == expected
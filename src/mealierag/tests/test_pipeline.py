@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from mealierag.pipeline import run_pipeline
+
+
+def test_run_pipeline_order():
+    """Test items flow through all stages in source order."""
+    results = list(run_pipeline(range(10), stages=[lambda x: x * 2, lambda x: x + 1]))
+
+    assert results == [x * 2 + 1 for x in range(10)]
+
+
+def test_run_pipeline_backpressure():
+    """Test a slow stage bounds how far the source runs ahead."""
+    produced = []
+    lock = threading.Lock()
+
+    def source():
+        for i in range(20):
+            with lock:
+                produced.append(i)
+            yield i
+
+    def slow_stage(x):
+        time.sleep(0.01)
+        return x
+
+    results = run_pipeline(source(), stages=[slow_stage], queue_size=1)
+    first = next(results)
+    time.sleep(0.05)
+
+    assert first == 0
+    # source queue (1) + item in stage (1) + stage output queue (1) + yielded (1)
+    with lock:
+        assert len(produced) <= 5
+
+    assert list(results) == list(range(1, 20))
+
+
+def test_run_pipeline_stage_error():
+    """Test errors in a stage are raised to the consumer."""
+
+    def failing_stage(x):
+        if x == 3:
+            raise ValueError("boom")
+        return x
+
+    with pytest.raises(ValueError, match="boom"):
+        list(run_pipeline(range(10), stages=[failing_stage]))
+
+
+def test_run_pipeline_source_error():
+    """Test errors in the source are raised to the consumer."""
+
+    def source():
+        yield 1
+        raise RuntimeError("source failed")
+
+    with pytest.raises(RuntimeError, match="source failed"):
+        list(run_pipeline(source(), stages=[lambda x: x]))
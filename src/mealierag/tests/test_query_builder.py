@@ -1,5 +1,8 @@
-from unittest.mock import MagicMock
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
 
+from mealierag.cache import SQLiteStore, TTLCache
 from mealierag.query_builder import DefaultQueryBuilder, MultiQueryQueryBuilder
 
 
@@ -59,3 +62,153 @@ def test_multi_query_parsing():
     ]
 
     assert queries == expected
+
+
+def test_multi_query_cache(mock_ollama_client):
+    """Test repeated inputs reuse the cached expansion."""
+    cache = TTLCache("test_expansion", max_size=10)
+    builder = MultiQueryQueryBuilder(mock_ollama_client, "model", 0.2, 42, cache=cache)
+    mock_ollama_client.chat.return_value = "Query 1\nQuery 2"
+
+    assert builder("Chicken dinner") == ["Query 1", "Query 2"]
+    assert builder("  chicken   DINNER") == ["Query 1", "Query 2"]
+    mock_ollama_client.chat.assert_called_once()
+
+
+def test_multi_query_cache_key_includes_options(mock_ollama_client):
+    """Test expansions are not shared across models, temperatures or seeds."""
+    cache = TTLCache("test_expansion_options", max_size=10)
+    mock_ollama_client.chat.return_value = "Query 1"
+
+    for model, temperature, seed in [
+        ("model", 0.2, 42),
+        ("model", 0.2, 7),
+        ("model", 0.7, 42),
+        ("other", 0.2, 42),
+        ("model", 0.2, 42),
+    ]:
+        MultiQueryQueryBuilder(
+            mock_ollama_client, model, temperature, seed, cache=cache
+        )("chicken dinner")
+
+    assert mock_ollama_client.chat.call_count == 4
+
+
+def test_multi_query_cache_persistence(mock_ollama_client, tmp_path):
+    """Test expansions persisted on disk are reused after a restart."""
+    path = str(tmp_path / "expansions.sqlite")
+    mock_ollama_client.chat.return_value = "Query 1"
+    first = TTLCache("test_expansion_disk", max_size=10, store=SQLiteStore(path))
+    MultiQueryQueryBuilder(mock_ollama_client, "model", 0.2, 42, cache=first)("soup")
+
+    second = TTLCache("test_expansion_disk", max_size=10, store=SQLiteStore(path))
+    queries = MultiQueryQueryBuilder(
+        mock_ollama_client, "model", 0.2, 42, cache=second
+    )("soup")
+
+    assert queries == ["Query 1"]
+    mock_ollama_client.chat.assert_called_once()
+
+
+def _chunks(text: str, size: int = 3) -> list[dict]:
+    return [
+        {"message": {"content": text[i : i + size]}} for i in range(0, len(text), size)
+    ]
+
+
+RESPONSE = (
+    "1. Chicken curry\n- Quick chicken dinner\r\n\n* One-pot chicken\nSpicy chicken"
+)
+
+
+def test_multi_query_stream(mock_ollama_client):
+    """Test streamed queries match the parsed full response."""
+    builder = MultiQueryQueryBuilder(mock_ollama_client, "model", 0.2, 42)
+    mock_ollama_client.streaming_chat.return_value = iter(_chunks(RESPONSE))
+
+    stream = builder.stream("chicken")
+    first = next(stream)
+
+    assert first == "Chicken curry"
+    # The first query is emitted before the response is fully consumed
+    assert next(mock_ollama_client.streaming_chat.return_value)
+
+    mock_ollama_client.streaming_chat.return_value = iter(_chunks(RESPONSE))
+    assert list(builder.stream("chicken")) == builder._parse_response(RESPONSE)
+
+
+def test_multi_query_stream_cache(mock_ollama_client):
+    """Test streamed expansions are cached and replayed."""
+    cache = TTLCache("test_expansion_stream", max_size=10)
+    builder = MultiQueryQueryBuilder(mock_ollama_client, "model", 0.2, 42, cache=cache)
+    mock_ollama_client.streaming_chat.return_value = iter(_chunks(RESPONSE))
+
+    first = list(builder.stream("chicken"))
+    assert list(builder.stream("Chicken")) == first
+    assert builder("chicken") == first
+    mock_ollama_client.streaming_chat.assert_called_once()
+    mock_ollama_client.chat.assert_not_called()
+
+
+def test_multi_query_astream():
+    """Test async streamed queries match the parsed full response."""
+    client = MagicMock()
+
+    async def stream():
+        for chunk in _chunks(RESPONSE, size=5):
+            yield chunk
+
+    client.streaming_chat = AsyncMock(return_value=stream())
+    builder = MultiQueryQueryBuilder(client, "model", 0.2, 42)
+
+    async def run():
+        return [query async for query in builder.astream("chicken")]
+
+    assert asyncio.run(run()) == builder._parse_response(RESPONSE)
+
+
+def test_multi_query_async_cache_off_loop(tmp_path, mocker):
+    """Test async expansions read and write a disk-backed cache off the loop."""
+    threads = []
+    get = SQLiteStore.get
+    put = SQLiteStore.put
+    mocker.patch.object(
+        SQLiteStore,
+        "get",
+        lambda *args: (threads.append(threading.current_thread()), get(*args))[1],
+    )
+    mocker.patch.object(
+        SQLiteStore,
+        "put",
+        lambda *args: (threads.append(threading.current_thread()), put(*args))[1],
+    )
+    path = str(tmp_path / "expansions.sqlite")
+    client = MagicMock()
+    client.chat = AsyncMock(return_value=RESPONSE)
+
+    async def stream():
+        for chunk in _chunks(RESPONSE, size=5):
+            yield chunk
+
+    client.streaming_chat = AsyncMock(return_value=stream())
+
+    async def run():
+        cache = TTLCache(
+            "test_expansion_async_disk", max_size=10, store=SQLiteStore(path)
+        )
+        builder = MultiQueryQueryBuilder(client, "model", 0.2, 42, cache=cache)
+        streamed = [query async for query in builder.astream("chicken")]
+        # Dropping the in-process entries reads the expansion back from disk
+        cache = TTLCache(
+            "test_expansion_async_disk", max_size=10, store=SQLiteStore(path)
+        )
+        builder = MultiQueryQueryBuilder(client, "model", 0.2, 42, cache=cache)
+        return streamed, await builder.abuild("chicken")
+
+    streamed, built = asyncio.run(run())
+
+    assert built == streamed
+    assert len(streamed) == 4
+    client.chat.assert_not_called()
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
@@ -19,7 +19,9 @@ def test_run_fetch_main(mocker, mock_settings):
     main()
 
     mock_fetch.assert_called_with(
-        mock_settings.mealie_api_url, mock_settings.mealie_token
+        mock_settings.mealie_api_url,
+        mock_settings.mealie_token,
+        max_workers=mock_settings.mealie_fetch_workers,
     )
     mock_logger.info.assert_any_call("Successfully fetched 2 recipes.")
 
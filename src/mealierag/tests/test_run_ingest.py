@@ -1,9 +1,29 @@
+from datetime import datetime
 from unittest.mock import MagicMock
 
 import pytest
 
-from mealierag.models import Recipe
-from mealierag.run_ingest import main
+from mealierag.config import Quantization
+from mealierag.ingest_state import IngestState, load_ingest_state, save_ingest_state
+from mealierag.models import Recipe, RecipeResponse
+from mealierag.run_ingest import (
+    build_points,
+    content_hash,
+    main,
+    recipe_payload,
+    vector_layout,
+)
+from mealierag.vectordb import SPARSE_VECTOR_NAME, recipe_point_id
+
+
+def make_page(recipes: list[Recipe], page: int = 1, total_pages: int = 1):
+    return RecipeResponse(
+        page=page,
+        per_page=len(recipes),
+        total=len(recipes),
+        total_pages=total_pages,
+        items=recipes,
+    )
 
 
 def test_run_ingest_main(mocker, mock_settings, mock_qdrant_client):
@@ -12,7 +32,10 @@ def test_run_ingest_main(mocker, mock_settings, mock_qdrant_client):
 
     # Mock data
     mock_recipes = [Recipe(name="Test Recipe", slug="test", id="1")]
-    mocker.patch("mealierag.run_ingest.fetch_full_recipes", return_value=mock_recipes)
+    mocker.patch(
+        "mealierag.run_ingest.iter_full_recipe_pages",
+        return_value=iter([make_page(mock_recipes)]),
+    )
 
     # Mock embeddings
     mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1, 0.2]])
@@ -27,6 +50,7 @@ def test_run_ingest_main(mocker, mock_settings, mock_qdrant_client):
     main()
 
     mock_qdrant_client.create_collection.assert_called_once()
+    assert mock_qdrant_client.create_payload_index.call_count == 3
     mock_qdrant_client.upsert.assert_called_once()
 
     call_args = mock_qdrant_client.upsert.call_args
@@ -40,7 +64,7 @@ def test_run_ingest_recreate_collection(mocker, mock_settings, mock_qdrant_clien
     mocker.patch("mealierag.run_ingest.settings", mock_settings)
     mock_settings.delete_collection_if_exists = True
 
-    mocker.patch("mealierag.run_ingest.fetch_full_recipes", return_value=[])
+    mocker.patch("mealierag.run_ingest.iter_full_recipe_pages", return_value=iter([]))
     mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1]])
     mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
 
@@ -54,6 +78,25 @@ def test_run_ingest_recreate_collection(mocker, mock_settings, mock_qdrant_clien
     mock_qdrant_client.create_collection.assert_called()
 
 
+def test_run_ingest_collection_config(mocker, mock_settings, mock_qdrant_client):
+    """Test new collections get the HNSW, on-disk and quantization settings."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mock_settings.vectordb_hnsw_m = 32
+    mock_settings.vectordb_on_disk = True
+    mock_settings.vectordb_quantization = Quantization.SCALAR
+    mocker.patch("mealierag.run_ingest.iter_full_recipe_pages", return_value=iter([]))
+    mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1]])
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mock_qdrant_client.collection_exists.return_value = False
+
+    main()
+
+    kwargs = mock_qdrant_client.create_collection.call_args.kwargs
+    assert kwargs["vectors_config"].on_disk
+    assert kwargs["hnsw_config"].m == 32
+    assert kwargs["quantization_config"].scalar.always_ram
+
+
 def test_run_ingest_existing_collection_error(
     mocker, mock_settings, mock_qdrant_client
 ):
@@ -61,10 +104,373 @@ def test_run_ingest_existing_collection_error(
     mocker.patch("mealierag.run_ingest.settings", mock_settings)
     mock_settings.delete_collection_if_exists = False
 
-    mocker.patch("mealierag.run_ingest.fetch_full_recipes", return_value=[])
+    mocker.patch("mealierag.run_ingest.iter_full_recipe_pages", return_value=iter([]))
     mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1]])
 
     mock_qdrant_client.collection_exists.return_value = True
 
     with pytest.raises(Exception, match="already exists"):
         main()
+
+
+def test_run_ingest_streams_batches(mocker, mock_settings, mock_qdrant_client):
+    """Test each fetched page is upserted as its own batch."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+
+    pages = [
+        make_page(
+            [
+                Recipe(name=f"Recipe {p}-{i}", slug=f"r-{p}-{i}", id=f"{p}-{i}")
+                for i in range(2)
+            ],
+            page=p,
+            total_pages=3,
+        )
+        for p in range(1, 4)
+    ]
+    mock_iter = mocker.patch(
+        "mealierag.run_ingest.iter_full_recipe_pages", return_value=iter(pages)
+    )
+    mock_embedding = mocker.patch(
+        "mealierag.run_ingest.get_embedding",
+        side_effect=lambda texts, *args: [[0.1, 0.2]] * len(texts),
+    )
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mock_qdrant_client.collection_exists.return_value = False
+
+    main()
+
+    # One dimension probe, then one batched call per page
+    assert [len(c.args[0]) for c in mock_embedding.call_args_list] == [1, 2, 2, 2]
+    assert mock_iter.call_args.kwargs["per_page"] == mock_settings.ingest_batch_size
+    assert mock_qdrant_client.upsert.call_count == 3
+    ids = [
+        point.id
+        for call in mock_qdrant_client.upsert.call_args_list
+        for point in call.kwargs["points"]
+    ]
+    assert len(set(ids)) == 6
+
+
+def test_run_ingest_incremental(mocker, mock_settings, mock_qdrant_client):
+    """Test incremental ingest only re-indexes changed recipes and drops removed ones."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    save_ingest_state(
+        mock_settings.ingest_state_path,
+        IngestState(
+            collection_name=mock_settings.vectordb_collection_name,
+            watermark=datetime(2024, 5, 1),
+        ),
+    )
+
+    listing = [
+        Recipe(name="Old", slug="old", id="1", updatedAt="2024-04-01T00:00:00"),
+        Recipe(name="New", slug="new", id="2", updatedAt="2024-06-01T00:00:00"),
+        Recipe(name="Unknown", slug="unknown", id="3"),
+    ]
+    mocker.patch(
+        "mealierag.run_ingest.iter_recipe_pages",
+        return_value=iter([make_page(listing)]),
+    )
+    mock_fetch = mocker.patch(
+        "mealierag.run_ingest.fetch_full_recipe_batch",
+        side_effect=lambda batch, *args: batch,
+    )
+    mocker.patch(
+        "mealierag.run_ingest.get_embedding",
+        side_effect=lambda texts, *args: [[0.1, 0.2]] * len(texts),
+    )
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mock_delete = mocker.patch("mealierag.run_ingest.delete_recipes")
+    mocker.patch(
+        "mealierag.run_ingest.list_indexed_recipe_ids",
+        return_value={"1", "2", "3", "gone"},
+    )
+    mock_qdrant_client.collection_exists.return_value = True
+
+    main(incremental=True)
+
+    mock_qdrant_client.delete_collection.assert_not_called()
+    mock_qdrant_client.create_collection.assert_not_called()
+    assert [r.id for r in mock_fetch.call_args.args[0]] == ["2", "3"]
+
+    points = mock_qdrant_client.upsert.call_args.kwargs["points"]
+    assert [p.payload["recipe_id"] for p in points] == ["2", "3"]
+
+    # Only recipes removed from Mealie are deleted
+    mock_delete.assert_called_once()
+    assert mock_delete.call_args.args[2] == ["gone"]
+
+    state = load_ingest_state(mock_settings.ingest_state_path)
+    assert state.watermark == datetime(2024, 6, 1)
+
+
+def test_run_ingest_incremental_creates_collection(
+    mocker, mock_settings, mock_qdrant_client
+):
+    """Test incremental ingest falls back to a full ingest without a collection."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mock_full = mocker.patch(
+        "mealierag.run_ingest.iter_full_recipe_pages", return_value=iter([])
+    )
+    mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1]])
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mock_qdrant_client.collection_exists.return_value = False
+
+    main(incremental=True)
+
+    mock_qdrant_client.create_collection.assert_called_once()
+    mock_full.assert_called_once()
+
+
+def test_build_points_deterministic_ids(mocker, mock_settings, mock_qdrant_client):
+    """Test point IDs derive from the recipe ID and carry a content hash."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mocker.patch(
+        "mealierag.run_ingest.get_embedding",
+        side_effect=lambda texts, *args: [[0.1, 0.2]] * len(texts),
+    )
+    mock_qdrant_client.retrieve.return_value = []
+    recipe = Recipe(name="Test Recipe", slug="test", id="1")
+
+    first = build_points(mock_qdrant_client, "test_collection", [recipe])
+    second = build_points(mock_qdrant_client, "test_collection", [recipe])
+
+    assert first[0].id == second[0].id == recipe_point_id("1")
+    assert first[0].payload["content_hash"] == content_hash(
+        recipe_payload(recipe), mock_settings.embedding_model, vector_layout()
+    )
+
+
+def test_build_points_hybrid(mocker, mock_settings, mock_qdrant_client):
+    """Test hybrid points hold the dense and the sparse vector."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mock_settings.vectordb_hybrid = True
+    mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1, 0.2]])
+    mock_qdrant_client.retrieve.return_value = []
+    recipe = Recipe(name="Shakshuka", slug="shakshuka", id="1")
+
+    (point,) = build_points(mock_qdrant_client, "test_collection", [recipe])
+
+    assert point.vector[""] == [0.1, 0.2]
+    assert point.vector[SPARSE_VECTOR_NAME].indices
+
+
+def test_build_points_field_vectors(mocker, mock_settings, mock_qdrant_client):
+    """Test all recipe fields of a batch are embedded in one call."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mock_settings.vectordb_field_vectors = True
+    mock_embedding = mocker.patch(
+        "mealierag.run_ingest.get_embedding",
+        side_effect=lambda texts, *args: [[float(i)] for i in range(len(texts))],
+    )
+    mock_qdrant_client.retrieve.return_value = []
+    recipes = [
+        Recipe(
+            name="Shakshuka",
+            slug="shakshuka",
+            id="1",
+            recipeIngredient=[{"display": "4 eggs"}],
+        ),
+        Recipe(name="Toast", slug="toast", id="2"),
+    ]
+
+    points = build_points(mock_qdrant_client, "test_collection", recipes)
+
+    mock_embedding.assert_called_once()
+    assert points[0].vector == {"title": [0.0], "ingredients": [1.0]}
+    assert points[1].vector == {"title": [2.0]}
+
+
+def test_build_points_skips_unchanged(mocker, mock_settings, mock_qdrant_client):
+    """Test unchanged recipes are neither embedded nor upserted again."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mock_embedding = mocker.patch(
+        "mealierag.run_ingest.get_embedding",
+        side_effect=lambda texts, *args: [[0.1, 0.2]] * len(texts),
+    )
+    unchanged = Recipe(name="Unchanged", slug="unchanged", id="1")
+    changed = Recipe(name="Changed", slug="changed", id="2")
+    mock_qdrant_client.retrieve.return_value = [
+        MagicMock(
+            id=recipe_point_id("1"),
+            payload={
+                "content_hash": content_hash(
+                    recipe_payload(unchanged),
+                    mock_settings.embedding_model,
+                    vector_layout(),
+                )
+            },
+        ),
+        MagicMock(id=recipe_point_id("2"), payload={"content_hash": "outdated"}),
+    ]
+
+    points = build_points(mock_qdrant_client, "test_collection", [unchanged, changed])
+
+    assert [p.payload["recipe_id"] for p in points] == ["2"]
+    assert mock_embedding.call_args.args[0] == [changed.get_text_for_embedding()]
+
+
+def test_content_hash_depends_on_model():
+    """Test changing the embedding model invalidates the content hash."""
+    payload = {"text": "text"}
+    assert content_hash(payload, "model-a", "") != content_hash(payload, "model-b", "")
+
+
+def test_content_hash_covers_payload_and_layout():
+    """Test payload-only fields and the vector layout invalidate the hash."""
+    recipe = Recipe(name="Toast", slug="toast", id="1")
+    moved = Recipe(name="Toast", slug="toast-2", id="1")
+    base = content_hash(recipe_payload(recipe), "model", "hybrid=False")
+
+    assert recipe_payload(recipe)["text"] == recipe_payload(moved)["text"]
+    assert content_hash(recipe_payload(moved), "model", "hybrid=False") != base
+    assert content_hash(recipe_payload(recipe), "model", "hybrid=True") != base
+
+
+def test_run_ingest_reindex(mocker, mock_settings, mock_qdrant_client):
+    """Test reindex builds a new version and switches the alias to it."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    recipes = [Recipe(name="Test Recipe", slug="test", id="1")]
+    mocker.patch(
+        "mealierag.run_ingest.iter_full_recipe_pages",
+        return_value=iter([make_page(recipes)]),
+    )
+    mocker.patch(
+        "mealierag.run_ingest.get_embedding",
+        side_effect=lambda texts, *args: [[0.1, 0.2]] * len(texts),
+    )
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mock_switch = mocker.patch("mealierag.run_ingest.switch_alias")
+    mock_gc = mocker.patch("mealierag.run_ingest.delete_old_versions", return_value=[])
+    mock_qdrant_client.count.return_value = MagicMock(count=1)
+
+    main(reindex=True)
+
+    alias = mock_settings.vectordb_collection_name
+    target = mock_qdrant_client.create_collection.call_args.kwargs["collection_name"]
+    assert target.startswith(f"{alias}_v")
+    assert mock_qdrant_client.upsert.call_args.kwargs["collection_name"] == target
+    mock_qdrant_client.delete_collection.assert_not_called()
+    mock_switch.assert_called_once_with(mock_qdrant_client, alias, target)
+    mock_gc.assert_called_once_with(
+        mock_qdrant_client, alias, keep=mock_settings.vectordb_keep_versions
+    )
+
+
+def test_run_ingest_reindex_count_mismatch(mocker, mock_settings, mock_qdrant_client):
+    """Test the alias is not switched when the new version is incomplete."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mocker.patch("mealierag.run_ingest.iter_full_recipe_pages", return_value=iter([]))
+    mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1]])
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mock_switch = mocker.patch("mealierag.run_ingest.switch_alias")
+    mock_qdrant_client.count.return_value = MagicMock(count=0)
+
+    with pytest.raises(Exception, match="holds 0 points"):
+        main(reindex=True)
+
+    mock_switch.assert_not_called()
+    mock_qdrant_client.delete_collection.assert_not_called()
+    target = mock_qdrant_client.create_collection.call_args.kwargs["collection_name"]
+    state = load_ingest_state(mock_settings.ingest_state_path)
+    assert state.checkpoint.collection_name == target
+
+
+def test_run_ingest_checkpoints_and_resume(mocker, mock_settings, mock_qdrant_client):
+    """Test a failed ingest keeps its checkpoint and --resume continues from it."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mocker.patch(
+        "mealierag.run_ingest.get_embedding",
+        side_effect=lambda texts, *args: [[0.1, 0.2]] * len(texts),
+    )
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mocker.patch("mealierag.run_ingest.switch_alias")
+    mocker.patch("mealierag.run_ingest.delete_old_versions", return_value=[])
+    mock_qdrant_client.collection_exists.return_value = True
+    mock_qdrant_client.retrieve.return_value = []
+
+    page1 = make_page(
+        [Recipe(name="R1", slug="r1", id="1", updatedAt="2024-01-01T00:00:00")],
+        page=1,
+        total_pages=2,
+    )
+    page2 = make_page(
+        [Recipe(name="R2", slug="r2", id="2", updatedAt="2024-02-01T00:00:00")],
+        page=2,
+        total_pages=2,
+    )
+
+    def failing_pages(*args, **kwargs):
+        yield page1
+        raise Exception("Mealie timed out")
+
+    mocker.patch("mealierag.run_ingest.iter_full_recipe_pages", failing_pages)
+    with pytest.raises(Exception, match="Mealie timed out"):
+        main(reindex=True)
+
+    checkpoint = load_ingest_state(mock_settings.ingest_state_path).checkpoint
+    assert checkpoint.mode == "reindex"
+    assert checkpoint.last_page == 1
+    assert checkpoint.indexed == 1
+    target = checkpoint.collection_name
+    mock_qdrant_client.delete_collection.assert_not_called()
+
+    mocker.patch(
+        "mealierag.run_ingest.iter_full_recipe_pages",
+        return_value=iter([page1, page2]),
+    )
+    mock_qdrant_client.create_collection.reset_mock()
+    mock_qdrant_client.count.return_value = MagicMock(count=2)
+    # Recipe 3 was removed from Mealie since the interrupted run
+    mock_qdrant_client.scroll.return_value = (
+        [MagicMock(payload={"recipe_id": r}) for r in ["1", "2", "3"]],
+        None,
+    )
+    mock_delete = mocker.patch("mealierag.run_ingest.delete_recipes")
+
+    main(reindex=True, resume=True)
+
+    mock_delete.assert_called_once_with(mock_qdrant_client, target, ["3"])
+
+    mock_qdrant_client.create_collection.assert_not_called()
+    assert mock_qdrant_client.upsert.call_args.kwargs["collection_name"] == target
+
+    state = load_ingest_state(mock_settings.ingest_state_path)
+    assert state.checkpoint is None
+    assert state.watermark == datetime(2024, 2, 1)
+
+
+def test_run_ingest_resume_without_checkpoint(
+    mocker, mock_settings, mock_qdrant_client
+):
+    """Test --resume without a checkpoint starts a fresh full ingest."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mock_iter = mocker.patch(
+        "mealierag.run_ingest.iter_full_recipe_pages", return_value=iter([])
+    )
+    mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1]])
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mock_qdrant_client.collection_exists.return_value = False
+
+    main(resume=True)
+
+    mock_qdrant_client.create_collection.assert_called_once()
+    mock_iter.assert_called_once()
+
+
+def test_run_ingest_resume_without_checkpoint_existing_collection(
+    mocker, mock_settings, mock_qdrant_client
+):
+    """Test --resume without a checkpoint never writes into the live collection."""
+    mocker.patch("mealierag.run_ingest.settings", mock_settings)
+    mock_settings.delete_collection_if_exists = False
+    mocker.patch("mealierag.run_ingest.iter_full_recipe_pages", return_value=iter([]))
+    mocker.patch("mealierag.run_ingest.get_embedding", return_value=[[0.1]])
+    mocker.patch("mealierag.run_ingest.ollama_client", MagicMock())
+    mock_qdrant_client.collection_exists.return_value = True
+
+    with pytest.raises(Exception, match="already exists"):
+        main(resume=True)
+
+    mock_qdrant_client.upsert.assert_not_called()
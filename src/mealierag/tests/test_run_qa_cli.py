@@ -20,8 +20,7 @@ def test_run_qa_cli_loop(mocker):
     """Test CLI loop execution."""
     mock_service = MagicMock()
     mock_service.check_health.return_value = True
-    mock_service.generate_queries.return_value = ["query"]
-    mock_service.retrieve_recipes.return_value = [
+    mock_service.find_recipes.return_value = [
         ScoredPoint(
             id=1,
             version=1,
@@ -39,6 +38,5 @@ def test_run_qa_cli_loop(mocker):
 
     main()
 
-    mock_service.generate_queries.assert_called_once()
-    mock_service.retrieve_recipes.assert_called_once()
+    mock_service.find_recipes.assert_called_once_with("Who am I?")
     mock_service.chat.assert_called_once()
@@ -1,4 +1,6 @@
-from unittest.mock import MagicMock
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
 
 from qdrant_client.http.models import ScoredPoint
 
@@ -20,23 +22,35 @@ def test_print_hits():
     assert "| Recipe 1 | 5 | t1 | c1 |" in table
 
 
+async def _collect(generator):
+    return [item async for item in generator]
+
+
+async def _stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
 def test_chat_fn(mocker):
     """Test chat generator function."""
     mock_service_instance = MagicMock()
     mocker.patch("mealierag.run_qa_ui.service", mock_service_instance)
 
-    mock_service_instance.generate_queries.return_value = ["query"]
-    mock_service_instance.retrieve_recipes.return_value = [
-        ScoredPoint(id=1, version=1, score=1.0, payload={"name": "Recipe 1"})
-    ]
+    mock_service_instance.find_recipes = AsyncMock(
+        return_value=[
+            ScoredPoint(id=1, version=1, score=1.0, payload={"name": "Recipe 1"})
+        ]
+    )
     mock_service_instance.populate_messages.return_value = []
 
     # Mock chat stream
-    mock_service_instance.chat.return_value = iter([{"message": {"content": "Hello"}}])
+    mock_service_instance.chat = AsyncMock(
+        return_value=_stream([{"message": {"content": "Hello"}}])
+    )
 
     generator = chat_fn("test message", [])
 
-    responses = list(generator)
+    responses = asyncio.run(_collect(generator))
 
     # Check progression of messages
     assert any("Consulting" in r for r in responses)
@@ -44,8 +58,7 @@ def test_chat_fn(mocker):
     assert any("Hello" in r for r in responses)
     assert any("Recipe 1" in r for r in responses)
 
-    mock_service_instance.generate_queries.assert_called_once()
-    mock_service_instance.retrieve_recipes.assert_called_once()
+    mock_service_instance.find_recipes.assert_called_once_with("test message")
     mock_service_instance.chat.assert_called_once()
 
 
@@ -54,10 +67,30 @@ def test_chat_fn_no_results(mocker):
     mock_service_instance = MagicMock()
     mocker.patch("mealierag.run_qa_ui.service", mock_service_instance)
 
-    mock_service_instance.generate_queries.return_value = ["query"]
-    mock_service_instance.retrieve_recipes.return_value = []
+    mock_service_instance.find_recipes = AsyncMock(return_value=[])
 
     generator = chat_fn("test message", [])
-    responses = list(generator)
+    responses = asyncio.run(_collect(generator))
+
+    assert any("couldn't find" in r for r in responses)
+
+
+def test_chat_fn_waits_for_warm_up(mocker):
+    """Test questions asked while the models warm up wait for them."""
+    mock_service_instance = MagicMock()
+    mocker.patch("mealierag.run_qa_ui.service", mock_service_instance)
+    mock_service_instance.models_ready = threading.Event()
+    mock_service_instance.warm_up_finished = threading.Event()
+    mock_service_instance.find_recipes = AsyncMock(return_value=[])
+
+    async def run():
+        generator = chat_fn("test message", [])
+        first = await anext(generator)
+        mock_service_instance.find_recipes.assert_not_called()
+        mock_service_instance.warm_up_finished.set()
+        return [first] + [item async for item in generator]
+
+    responses = asyncio.run(run())
 
+    assert "Warming up" in responses[0]
     assert any("couldn't find" in r for r in responses)
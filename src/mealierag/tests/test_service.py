@@ -1,9 +1,27 @@
-from unittest.mock import MagicMock
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.models import ScoredPoint
 
-from mealierag.config import settings
-from mealierag.service import MealieRAGService, SearchStrategy
+from mealierag.cache import SQLiteStore
+from mealierag.config import (
+    FieldStrategy,
+    FusionMethod,
+    Quantization,
+    SearchEngine,
+    settings,
+)
+from mealierag.filters import RecipeFilter
+from mealierag.metrics import request_timer
+from mealierag.service import (
+    AsyncMealieRAGService,
+    MealieRAGService,
+    SearchStrategy,
+)
 
 
 @pytest.fixture
@@ -52,6 +70,69 @@ def test_retrieve_recipes(
     mock_retrieve_results.assert_called_once()
 
 
+def test_retrieve_recipes_embedding_cache(
+    mock_settings,
+    mock_qdrant_client,
+    mock_ollama_client,
+    mock_embedding_func,
+    mock_retrieve_results,
+):
+    """Test only query embedding cache misses are embedded, in one call"""
+    mock_embedding_func.side_effect = lambda texts, *args: [
+        [float(len(text))] for text in texts
+    ]
+    service = MealieRAGService()
+    service.retrieve_recipes(["chicken", "pasta"])
+    service.retrieve_recipes(["Chicken ", "soup", "SOUP"])
+
+    assert mock_embedding_func.call_count == 2
+    assert mock_embedding_func.call_args[0][0] == ["soup"]
+    assert mock_retrieve_results.call_args[0][0] == [[7.0], [4.0], [4.0]]
+    assert service.query_embedding_cache.hits == 1
+    assert service.query_embedding_cache.misses == 4
+
+
+def test_query_embedding_cache_shared_path(
+    tmp_path,
+    mock_settings,
+    mock_qdrant_client,
+    mock_ollama_client,
+    mock_embedding_func,
+    mock_retrieve_results,
+    mocker,
+):
+    """Test a second service reuses the query embeddings stored on disk"""
+    mocker.patch.object(
+        settings, "query_embedding_cache_path", str(tmp_path / "queries.sqlite")
+    )
+    MealieRAGService().retrieve_recipes(["pasta"])
+
+    service = MealieRAGService()
+    service.retrieve_recipes(["Pasta"])
+
+    assert mock_embedding_func.call_count == 1
+    assert mock_retrieve_results.call_args[0][0] == [pytest.approx([0.1, 0.2, 0.3])]
+    assert service.shared_query_embedding_cache.hits == 1
+    # The shared hit is kept in process
+    service.retrieve_recipes(["pasta"])
+    assert service.query_embedding_cache.hits == 1
+
+
+def test_retrieve_recipes_timings(
+    mock_settings,
+    mock_qdrant_client,
+    mock_ollama_client,
+    mock_embedding_func,
+    mock_retrieve_results,
+):
+    """Test query stages are timed for the current request"""
+    service = MealieRAGService()
+    with request_timer() as timings:
+        service.retrieve_recipes(service.generate_queries("test query"))
+
+    assert {"query_expansion", "embedding", "search", "total"} <= set(timings)
+
+
 def test_check_health(mock_settings, mock_qdrant_client, mock_ollama_client):
     """Test health check"""
     mock_qdrant_client.collection_exists.return_value = True
@@ -62,6 +143,53 @@ def test_check_health(mock_settings, mock_qdrant_client, mock_ollama_client):
     assert service.check_health() is False
 
 
+def test_check_health_waits_for_warm_up(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test models are loaded in the background before reporting healthy"""
+    mocker.patch.object(settings, "model_warmup", True)
+    mocker.patch.object(settings, "llm_num_ctx", 4096)
+    mocker.patch.object(settings, "llm_keep_alive", "1h")
+    mocker.patch.object(settings, "embedding_keep_alive", "30m")
+    mock_qdrant_client.collection_exists.return_value = True
+    loaded = threading.Event()
+    mock_ollama_client.generate.side_effect = lambda **_: loaded.wait(5)
+
+    service = MealieRAGService()
+    assert service.check_health() is False
+
+    loaded.set()
+    assert service.models_ready.wait(5)
+    assert service.check_health() is True
+    mock_ollama_client.embed.assert_any_call(
+        model=settings.embedding_model, input=["warm-up"], keep_alive="30m"
+    )
+    mock_ollama_client.generate.assert_called_once_with(
+        model=settings.llm_model, options={"num_ctx": 4096}, keep_alive="1h"
+    )
+
+
+def test_check_health_after_failed_warm_up(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test a failed warm-up is reported unhealthy and retried"""
+    mocker.patch.object(settings, "model_warmup", True)
+    mock_qdrant_client.collection_exists.return_value = True
+    mock_ollama_client.embed.side_effect = ConnectionError
+
+    service = MealieRAGService()
+
+    assert service.warm_up_finished.wait(5)
+    assert not service.models_ready.is_set()
+
+    # The failed health check starts another warm-up, which now succeeds
+    mock_ollama_client.embed.side_effect = None
+    assert service.check_health() is False
+    assert service.warm_up_finished.wait(5)
+    assert service.models_ready.is_set()
+    assert service.check_health() is True
+
+
 def test_multiquery_strategy(
     mock_settings, mock_qdrant_client, mock_ollama_client, mocker
 ):
@@ -83,3 +211,830 @@ def test_multiquery_strategy(
 
     finally:
         settings.search_strategy = previous_strategy
+
+
+def test_query_expansion_cache_settings(
+    tmp_path, mock_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test the expansion cache is off by default and bounded on disk"""
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.MULTIQUERY)
+    assert MealieRAGService().query_builder.cache is None
+
+    mocker.patch.object(
+        settings, "query_expansion_cache_path", str(tmp_path / "expansions.sqlite")
+    )
+    mocker.patch.object(settings, "query_expansion_cache_path_max_entries", 5)
+    cache = MealieRAGService().query_builder.cache
+
+    assert cache.max_size == 0
+    assert cache.store.max_entries == 5
+
+
+def test_async_service_retrieve_recipes(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test async retrieval awaits async embedding and search"""
+    mock_embedding = mocker.patch(
+        "mealierag.service.aget_embedding",
+        AsyncMock(return_value=[[0.1, 0.2, 0.3]]),
+    )
+    mock_retrieve = mocker.patch(
+        "mealierag.service.aretrieve_results_simple",
+        AsyncMock(return_value=[MagicMock(id="1", payload={"name": "Recipe 1"})]),
+    )
+
+    async def run():
+        service = AsyncMealieRAGService()
+        queries = await service.generate_queries("test query")
+        return queries, await service.retrieve_recipes(queries)
+
+    queries, recipes = asyncio.run(run())
+
+    assert queries == ["test query"]
+    assert recipes[0].payload["name"] == "Recipe 1"
+    mock_embedding.assert_awaited_once()
+    mock_retrieve.assert_awaited_once()
+
+
+def test_async_service_chat(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client
+):
+    """Test async chat streams chunks from the async Ollama client"""
+
+    async def stream():
+        yield {"message": {"content": "Hello"}}
+
+    mock_async_ollama_client.chat.return_value = stream()
+
+    async def run():
+        service = AsyncMealieRAGService()
+        response = await service.chat([{"role": "user", "content": "hi"}])
+        return [chunk async for chunk in response]
+
+    assert asyncio.run(run()) == [{"message": {"content": "Hello"}}]
+    assert mock_async_ollama_client.chat.call_args.kwargs["stream"] is True
+
+
+def test_async_service_check_health(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client
+):
+    """Test async health check"""
+    mock_async_qdrant_client.collection_exists.return_value = False
+
+    assert asyncio.run(AsyncMealieRAGService().check_health()) is False
+
+
+def test_async_multiquery_strategy(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client
+):
+    """Test async multiquery strategy awaits the LLM for query variations"""
+    previous_strategy = settings.search_strategy
+    settings.search_strategy = SearchStrategy.MULTIQUERY
+
+    try:
+        mock_async_ollama_client.chat.return_value = {"message": {"content": "q1\nq2"}}
+
+        service = AsyncMealieRAGService()
+        queries = asyncio.run(service.generate_queries("test"))
+
+        assert queries == ["q1", "q2"]
+        assert service._retrieve_results.__name__ == "aretrieve_results_rrf"
+    finally:
+        settings.search_strategy = previous_strategy
+
+
+def _vector(text: str) -> list[float]:
+    return [1.0, (sum(map(ord, text)) % 10) / 10]
+
+
+def test_streaming_expansion_matches_batch(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test streamed expansion and per-query search fuse to the same hits"""
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.MULTIQUERY)
+    mocker.patch.object(settings, "vectordb_collection_name", "recipes")
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda texts, *args: [_vector(text) for text in texts],
+    )
+    response = "1. Chicken curry\n2. Quick dinner\n3. Spicy stew\n4. Chicken curry"
+    mock_ollama_client.chat.side_effect = lambda **kwargs: (
+        iter([{"message": {"content": response[i : i + 4]}} for i in range(0, 80, 4)])
+        if kwargs["stream"]
+        else {"message": {"content": response}}
+    )
+
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "recipes",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    client.upsert(
+        "recipes",
+        points=[
+            models.PointStruct(id=i, vector=[1.0, i / 10], payload={})
+            for i in range(10)
+        ],
+    )
+
+    batch_service = MealieRAGService()
+    batch_service.vector_db_client = client
+    expected = batch_service.find_recipes("chicken")
+
+    mocker.patch.object(settings, "query_expansion_streaming", True)
+    streaming_service = MealieRAGService()
+    streaming_service.vector_db_client = client
+    with request_timer() as timings:
+        hits = streaming_service.find_recipes("chicken")
+
+    assert [(p.id, p.score) for p in hits] == [(p.id, p.score) for p in expected]
+    assert mock_ollama_client.chat.call_args.kwargs["stream"] is True
+    assert {"query_expansion", "search"} <= set(timings)
+
+
+def test_async_streaming_expansion(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test async streamed expansion searches each query and fuses the hits"""
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.MULTIQUERY)
+    mocker.patch.object(settings, "query_expansion_streaming", True)
+    mocker.patch(
+        "mealierag.service.aget_embedding",
+        AsyncMock(side_effect=lambda texts, *args: [_vector(t) for t in texts]),
+    )
+    mock_search = mocker.patch(
+        "mealierag.service.aretrieve_results_simple",
+        AsyncMock(
+            side_effect=lambda vectors, *args, **kwargs: [
+                ScoredPoint(id=int(vectors[0][1] * 10), version=1, score=1.0)
+            ]
+        ),
+    )
+
+    async def stream():
+        for chunk in ["q1\nq", "2\n", "q3"]:
+            yield {"message": {"content": chunk}}
+
+    mock_async_ollama_client.chat.return_value = stream()
+
+    hits = asyncio.run(AsyncMealieRAGService().find_recipes("test"))
+
+    assert mock_search.await_count == 3
+    assert len(hits) == 3
+
+
+@pytest.fixture
+def speculative_settings(mock_settings, mocker):
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.MULTIQUERY)
+    mocker.patch.object(settings, "speculative_retrieval", True)
+    mocker.patch.object(settings, "query_expansion_budget", 0.2)
+
+
+def _search_by_vector(vectors, *args, **kwargs):
+    return [ScoredPoint(id=int(vectors[0][1] * 10), version=1, score=1.0)]
+
+
+def test_speculative_retrieval(
+    speculative_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test raw query hits are fused with the expanded query hits"""
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda texts, *args: [_vector(text) for text in texts],
+    )
+    mock_search = mocker.patch(
+        "mealierag.service.retrieve_results_simple", side_effect=_search_by_vector
+    )
+    mock_ollama_client.chat.return_value = {"message": {"content": "q1\nq2"}}
+
+    hits = MealieRAGService().find_recipes("raw")
+
+    searched = {call.args[0][0][1] for call in mock_search.call_args_list}
+    assert searched == {_vector(text)[1] for text in ["raw", "q1", "q2"]}
+    assert {hit.id for hit in hits} == {
+        int(_vector(text)[1] * 10) for text in ["raw", "q1", "q2"]
+    }
+
+
+def test_speculative_retrieval_shares_executor(
+    speculative_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test requests search on the service's workers instead of new pools"""
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda texts, *args: [_vector(text) for text in texts],
+    )
+    threads = set()
+
+    def search(vectors, *args, **kwargs):
+        threads.add(threading.current_thread().name)
+        return _search_by_vector(vectors)
+
+    mocker.patch("mealierag.service.retrieve_results_simple", side_effect=search)
+    mock_ollama_client.chat.return_value = {"message": {"content": "q1\nq2"}}
+    service = MealieRAGService()
+    executor = mocker.patch("mealierag.service.ThreadPoolExecutor")
+
+    for _ in range(3):
+        service.find_recipes("raw")
+
+    executor.assert_not_called()
+    assert threads and all(name.startswith("search") for name in threads)
+
+
+def test_speculative_retrieval_budget_fallback(
+    speculative_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test the raw query hits are returned when expansion is too slow"""
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda texts, *args: [_vector(text) for text in texts],
+    )
+    mocker.patch(
+        "mealierag.service.retrieve_results_simple", side_effect=_search_by_vector
+    )
+    mock_ollama_client.chat.side_effect = lambda **kwargs: (
+        time.sleep(1),
+        {"message": {"content": "q1"}},
+    )[1]
+
+    start = time.perf_counter()
+    hits = MealieRAGService().find_recipes("raw")
+
+    assert time.perf_counter() - start < 0.9
+    assert [hit.id for hit in hits] == [int(_vector("raw")[1] * 10)]
+
+
+def test_speculative_retrieval_expansion_error(
+    speculative_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test the raw query hits are returned when expansion fails"""
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda texts, *args: [_vector(text) for text in texts],
+    )
+    mocker.patch(
+        "mealierag.service.retrieve_results_simple", side_effect=_search_by_vector
+    )
+    mock_ollama_client.chat.side_effect = Exception("LLM overloaded")
+
+    hits = MealieRAGService().find_recipes("raw")
+
+    assert [hit.id for hit in hits] == [int(_vector("raw")[1] * 10)]
+
+
+def test_speculative_retrieval_raw_error(
+    speculative_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test a failed raw search falls back to the expanded query hits"""
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda texts, *args: [_vector(text) for text in texts],
+    )
+
+    def search(vectors, *args, **kwargs):
+        if vectors[0] == _vector("raw"):
+            raise ConnectionError("Qdrant unavailable")
+        return _search_by_vector(vectors)
+
+    mocker.patch("mealierag.service.retrieve_results_simple", side_effect=search)
+    mock_ollama_client.chat.return_value = {"message": {"content": "q1"}}
+
+    hits = MealieRAGService().find_recipes("raw")
+
+    assert [hit.id for hit in hits] == [int(_vector("q1")[1] * 10)]
+
+
+def test_speculative_retrieval_stops_streamed_expansion(
+    speculative_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test an expansion over budget stops searching its remaining queries"""
+    mocker.patch.object(settings, "query_expansion_streaming", True)
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda texts, *args: [_vector(text) for text in texts],
+    )
+    mock_search = mocker.patch(
+        "mealierag.service.retrieve_results_simple", side_effect=_search_by_vector
+    )
+    closed = threading.Event()
+
+    def slow_stream():
+        try:
+            for query in ["q1\n", "q2\n", "q3\n"]:
+                time.sleep(0.3)
+                yield {"message": {"content": query}}
+        finally:
+            closed.set()
+
+    mock_ollama_client.chat.side_effect = lambda **kwargs: slow_stream()
+
+    hits = MealieRAGService().find_recipes("raw")
+
+    assert [hit.id for hit in hits] == [int(_vector("raw")[1] * 10)]
+    assert closed.wait(2)
+    # Only the raw query was searched, the late q1 was dropped
+    assert mock_search.call_count == 1
+
+
+def test_async_speculative_retrieval_budget_fallback(
+    speculative_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test a slow async expansion is cancelled and the raw hits are returned"""
+    mocker.patch(
+        "mealierag.service.aget_embedding",
+        AsyncMock(side_effect=lambda texts, *args: [_vector(t) for t in texts]),
+    )
+    mocker.patch(
+        "mealierag.service.aretrieve_results_simple",
+        AsyncMock(side_effect=_search_by_vector),
+    )
+    cancelled = []
+
+    async def slow_chat(**kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    mock_async_ollama_client.chat.side_effect = slow_chat
+
+    hits = asyncio.run(AsyncMealieRAGService().find_recipes("raw"))
+
+    assert [hit.id for hit in hits] == [int(_vector("raw")[1] * 10)]
+    assert cancelled
+
+
+def test_async_expanded_search_concurrency(
+    speculative_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test the async expanded-query searches are bounded like streamed ones"""
+    mocker.patch("mealierag.service.MAX_PARALLEL_QUERIES", 2)
+    mocker.patch.object(settings, "query_expansion_budget", None)
+    mocker.patch(
+        "mealierag.service.aget_embedding",
+        AsyncMock(side_effect=lambda texts, *args: [_vector(t) for t in texts]),
+    )
+    active = []
+    peak = []
+
+    async def search(vectors, *args, **kwargs):
+        active.append(True)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.pop()
+        return _search_by_vector(vectors)
+
+    mocker.patch("mealierag.service.aretrieve_results_simple", side_effect=search)
+    mock_async_ollama_client.chat.return_value = {
+        "message": {"content": "\n".join(f"q{i}" for i in range(6))}
+    }
+
+    asyncio.run(AsyncMealieRAGService().find_recipes("raw"))
+
+    # Six expanded queries at most two at a time, plus the raw query
+    assert len(peak) == 7
+    assert max(peak) <= 3
+
+
+def test_async_query_embedding_cache_off_loop(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test the async service reads and writes the query cache off the loop"""
+    mocker.patch.object(settings, "query_embedding_cache_size", 10)
+    mocker.patch("mealierag.service.aget_embedding", AsyncMock(return_value=[[0.1]]))
+    threads = []
+
+    service = AsyncMealieRAGService()
+    get = service.query_embedding_cache.get
+    put = service.query_embedding_cache.put
+    service.query_embedding_cache.get = lambda *args: (
+        threads.append(threading.current_thread()),
+        get(*args),
+    )[1]
+    service.query_embedding_cache.put = lambda *args: (
+        threads.append(threading.current_thread()),
+        put(*args),
+    )[1]
+
+    assert asyncio.run(service._embed_queries(["pasta"])) == [[0.1]]
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+@pytest.fixture
+def adaptive_settings(mock_settings, mocker):
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.ADAPTIVE)
+    mocker.patch.object(settings, "adaptive_simple_max_words", 3)
+    mocker.patch.object(settings, "adaptive_score_margin", 0.1)
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda texts, *args: [_vector(text) for text in texts],
+    )
+
+
+def test_adaptive_short_query(
+    adaptive_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test short queries skip the multi-query expansion"""
+    mock_qdrant_client.scroll.return_value = ([], None)
+    mock_search = mocker.patch(
+        "mealierag.service.retrieve_results_simple", return_value=["hit"]
+    )
+
+    assert MealieRAGService().find_recipes("pancakes") == ["hit"]
+    mock_search.assert_called_once()
+    mock_ollama_client.chat.assert_not_called()
+
+
+def test_adaptive_recipe_name(
+    adaptive_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test queries naming a known recipe skip the multi-query expansion"""
+    mock_qdrant_client.scroll.return_value = (
+        [MagicMock(payload={"name": "Banana Pancakes"})],
+        None,
+    )
+    mocker.patch(
+        "mealierag.service.retrieve_results_simple",
+        return_value=[ScoredPoint(id=1, version=1, score=0.5)] * 2,
+    )
+
+    service = MealieRAGService()
+    assert len(service.find_recipes("show me my banana pancake recipe")) == 2
+    service.find_recipes("what about my favourite banana pancakes recipe")
+
+    mock_ollama_client.chat.assert_not_called()
+    # Recipe names are loaded once and reused
+    mock_qdrant_client.scroll.assert_called_once()
+
+
+def test_adaptive_score_margin(
+    adaptive_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test the expansion only runs when the simple search is ambiguous"""
+    mock_qdrant_client.scroll.return_value = ([], None)
+    clear = [
+        ScoredPoint(id=1, version=1, score=0.9),
+        ScoredPoint(id=2, version=1, score=0.5),
+    ]
+    ambiguous = [
+        ScoredPoint(id=1, version=1, score=0.9),
+        ScoredPoint(id=2, version=1, score=0.88),
+    ]
+    mocker.patch(
+        "mealierag.service.retrieve_results_simple", side_effect=[clear, ambiguous]
+    )
+    mock_rrf = mocker.patch(
+        "mealierag.service.retrieve_results_rrf", return_value=["fused"]
+    )
+    mock_ollama_client.chat.return_value = {"message": {"content": "q1\nq2"}}
+
+    service = MealieRAGService()
+    assert service.find_recipes("something warm for a rainy day") == clear
+    mock_ollama_client.chat.assert_not_called()
+
+    assert service.find_recipes("something light for a hot day") == ["fused"]
+    mock_ollama_client.chat.assert_called_once()
+    assert len(mock_rrf.call_args[0][0]) == 2
+
+
+def test_adaptive_hybrid_skips_score_margin(
+    adaptive_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test RRF-scored hybrid hits never decide the strategy by their margin"""
+    mocker.patch.object(settings, "vectordb_hybrid", True)
+    mock_qdrant_client.scroll.return_value = ([], None)
+    mock_hybrid = mocker.patch(
+        "mealierag.service.retrieve_results_hybrid", return_value=["fused"]
+    )
+    mock_record = mocker.patch("mealierag.service.record_strategy")
+    mock_ollama_client.chat.return_value = {"message": {"content": "q1\nq2"}}
+
+    assert MealieRAGService().find_recipes("something warm for a rainy day") == [
+        "fused"
+    ]
+
+    # Only the expanded queries were searched, no simple search first
+    mock_hybrid.assert_called_once()
+    assert len(mock_hybrid.call_args.args[0]) == 2
+    mock_record.assert_called_once_with(SearchStrategy.MULTIQUERY, "fused_scores")
+
+
+def test_multi_vector_batch_engine_warning(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mocker, caplog
+):
+    """Test the batch engine settings ignored by hybrid search are reported"""
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.MULTIQUERY)
+    mocker.patch.object(settings, "vectordb_search_engine", SearchEngine.BATCH)
+    mocker.patch.object(settings, "vectordb_hybrid", True)
+
+    MealieRAGService()
+
+    assert "VECTORDB_SEARCH_ENGINE=batch" in caplog.text
+
+
+def test_async_adaptive_short_query(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test the async service skips the expansion for short queries"""
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.ADAPTIVE)
+    mock_async_qdrant_client.scroll.return_value = ([], None)
+    mocker.patch(
+        "mealierag.service.aget_embedding", AsyncMock(return_value=[[0.1, 0.2]])
+    )
+    mocker.patch(
+        "mealierag.service.aretrieve_results_simple", AsyncMock(return_value=["hit"])
+    )
+
+    assert asyncio.run(AsyncMealieRAGService().find_recipes("pancakes")) == ["hit"]
+    mock_async_ollama_client.chat.assert_not_called()
+
+
+def test_batch_search_engine(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test the batch engine is used for multi-query retrieval when configured"""
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.MULTIQUERY)
+    mocker.patch.object(settings, "vectordb_search_engine", SearchEngine.BATCH)
+    mocker.patch.object(settings, "vectordb_candidate_depth", 10)
+    mocker.patch.object(settings, "vectordb_fusion", FusionMethod.SCORE_SUM)
+    mocker.patch(
+        "mealierag.service.get_embedding", return_value=[[0.1, 0.2], [0.3, 0.4]]
+    )
+    mock_batch = mocker.patch(
+        "mealierag.service.retrieve_results_batch", return_value=["hit"]
+    )
+
+    service = MealieRAGService()
+
+    assert service.retrieve_recipes(["q1", "q2"]) == ["hit"]
+    kwargs = mock_batch.call_args.kwargs
+    assert kwargs["depth"] == 10
+    assert kwargs["fusion"] == FusionMethod.SCORE_SUM
+
+
+def test_search_filters(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mock_embedding_func, mocker
+):
+    """Test filters extracted from the question are pushed down to Qdrant"""
+    mocker.patch.object(settings, "search_filters", True)
+    mock_qdrant_client.scroll.return_value = (
+        [MagicMock(payload={"name": "Soup", "tags": ["Vegetarian"], "category": []})],
+        None,
+    )
+    mock_search = mocker.patch(
+        "mealierag.service.retrieve_results_simple", return_value=["hit"]
+    )
+
+    assert MealieRAGService().find_recipes("5-star vegetarian soups") == ["hit"]
+    query_filter = mock_search.call_args.kwargs["query_filter"]
+    assert [c.key for c in query_filter.must] == ["tags", "rating"]
+
+
+def test_search_filters_fallback(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mock_embedding_func, mocker
+):
+    """Test the search runs once, unfiltered, when no recipe matches the filter"""
+    mocker.patch.object(settings, "search_strategy", SearchStrategy.ADAPTIVE)
+    mocker.patch.object(settings, "adaptive_score_margin", 1.0)
+    mock_qdrant_client.count.return_value = models.CountResult(count=0)
+    mock_embedding_func.side_effect = lambda texts, *args: [[0.1]] * len(texts)
+    mock_ollama_client.chat.return_value = {"message": {"content": "q1\nq2"}}
+    mock_search = mocker.patch(
+        "mealierag.service.retrieve_results_simple",
+        return_value=[ScoredPoint(id=i, version=1, score=0.5) for i in range(2)],
+    )
+    mock_rrf = mocker.patch(
+        "mealierag.service.retrieve_results_rrf", return_value=["hit"]
+    )
+    mock_record = mocker.patch("mealierag.service.record_strategy")
+    recipe_filter = RecipeFilter(min_rating=5)
+
+    hits = MealieRAGService().find_recipes("soups for a cold winter day", recipe_filter)
+
+    assert hits == ["hit"]
+    assert mock_qdrant_client.count.call_args.kwargs["count_filter"] is not None
+    assert mock_search.call_args.kwargs["query_filter"] is None
+    assert mock_rrf.call_args.kwargs["query_filter"] is None
+    mock_ollama_client.chat.assert_called_once()
+    mock_record.assert_called_once()
+
+
+def test_async_search_filters(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test the async service pushes extracted filters down to Qdrant"""
+    mocker.patch.object(settings, "search_filters", True)
+    mock_async_qdrant_client.scroll.return_value = (
+        [MagicMock(payload={"name": "Stew", "tags": [], "category": ["Dinner"]})],
+        None,
+    )
+    mocker.patch("mealierag.service.aget_embedding", AsyncMock(return_value=[[0.1]]))
+    mock_search = mocker.patch(
+        "mealierag.service.aretrieve_results_simple", AsyncMock(return_value=["hit"])
+    )
+
+    service = AsyncMealieRAGService()
+
+    assert asyncio.run(service.find_recipes("quick dinner ideas")) == ["hit"]
+    query_filter = mock_search.call_args.kwargs["query_filter"]
+    assert query_filter.must[0].key == "category"
+
+
+def test_hybrid_search(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mock_embedding_func, mocker
+):
+    """Test hybrid search sends the sparse vector of every query"""
+    mocker.patch.object(settings, "vectordb_hybrid", True)
+    mock_hybrid = mocker.patch(
+        "mealierag.service.retrieve_results_hybrid", return_value=["hit"]
+    )
+
+    assert MealieRAGService().find_recipes("shakshuka") == ["hit"]
+    dense, sparse = mock_hybrid.call_args.args[:2]
+    assert dense == [[0.1, 0.2, 0.3]]
+    assert len(sparse) == 1 and sparse[0].indices
+
+
+def test_async_hybrid_search(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test the async service runs hybrid searches"""
+    mocker.patch.object(settings, "vectordb_hybrid", True)
+    mocker.patch("mealierag.service.aget_embedding", AsyncMock(return_value=[[0.1]]))
+    mock_hybrid = mocker.patch(
+        "mealierag.service.aretrieve_results_hybrid", AsyncMock(return_value=["hit"])
+    )
+
+    assert asyncio.run(AsyncMealieRAGService().find_recipes("gochujang")) == ["hit"]
+    assert len(mock_hybrid.call_args.args[1]) == 1
+
+
+@pytest.mark.parametrize(
+    "strategy, search",
+    [
+        (FieldStrategy.FUSE, "retrieve_results_hybrid"),
+        (FieldStrategy.BEST_FIELD, "retrieve_results_best_field"),
+    ],
+)
+def test_field_vector_search(
+    mock_settings,
+    mock_qdrant_client,
+    mock_ollama_client,
+    mock_embedding_func,
+    mocker,
+    strategy,
+    search,
+):
+    """Test field vector searches use the configured field strategy"""
+    mocker.patch.object(settings, "vectordb_field_vectors", True)
+    mocker.patch.object(settings, "vectordb_field_strategy", strategy)
+    mock_search = mocker.patch(f"mealierag.service.{search}", return_value=["hit"])
+
+    assert MealieRAGService().find_recipes("eggs in tomato sauce") == ["hit"]
+    # Without hybrid search no sparse vectors are sent
+    assert mock_search.call_args.args[1] == []
+
+
+def test_async_field_vector_search(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test the async service searches the best field"""
+    mocker.patch.object(settings, "vectordb_field_vectors", True)
+    mocker.patch.object(settings, "vectordb_field_strategy", FieldStrategy.BEST_FIELD)
+    mocker.patch("mealierag.service.aget_embedding", AsyncMock(return_value=[[0.1]]))
+    mock_search = mocker.patch(
+        "mealierag.service.aretrieve_results_best_field",
+        AsyncMock(return_value=["hit"]),
+    )
+
+    assert asyncio.run(AsyncMealieRAGService().find_recipes("eggs")) == ["hit"]
+    mock_search.assert_awaited_once()
+
+
+def test_search_params(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mock_embedding_func, mocker
+):
+    """Test HNSW and quantization search params are sent with searches"""
+    mocker.patch.object(settings, "vectordb_hnsw_ef", 128)
+    mocker.patch.object(settings, "vectordb_quantization", Quantization.BINARY)
+    mocker.patch.object(settings, "vectordb_quantization_oversampling", 3.0)
+    mock_search = mocker.patch(
+        "mealierag.service.retrieve_results_simple", return_value=["hit"]
+    )
+
+    MealieRAGService().find_recipes("pancakes")
+
+    params = mock_search.call_args.kwargs["search_params"]
+    assert params.hnsw_ef == 128
+    assert params.quantization.rescore
+    assert params.quantization.oversampling == 3.0
+
+
+def test_chat_answer_cache(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test identical messages are answered from the cache"""
+    mocker.patch.object(settings, "answer_cache_size", 10)
+    mock_ollama_client.chat.return_value = iter(
+        [{"message": {"content": "Bake"}}, {"message": {"content": " it."}}]
+    )
+    messages = [{"role": "user", "content": "How?"}]
+
+    service = MealieRAGService()
+    first = "".join(c["message"]["content"] for c in service.chat(messages))
+    second = "".join(c["message"]["content"] for c in service.chat(messages))
+
+    assert first == second == "Bake it."
+    mock_ollama_client.chat.assert_called_once()
+
+
+def test_async_chat_answer_cache(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker
+):
+    """Test the async service replays cached answers"""
+    mocker.patch.object(settings, "answer_cache_size", 10)
+
+    async def stream():
+        yield {"message": {"content": "Hello"}}
+
+    mock_async_ollama_client.chat.return_value = stream()
+
+    async def run():
+        service = AsyncMealieRAGService()
+        answers = []
+        for _ in range(2):
+            response = await service.chat([{"role": "user", "content": "hi"}])
+            answers.append("".join([c["message"]["content"] async for c in response]))
+        return answers
+
+    assert asyncio.run(run()) == ["Hello", "Hello"]
+    mock_async_ollama_client.chat.assert_called_once()
+
+
+def test_async_chat_answer_cache_on_disk(
+    mock_settings, mock_async_qdrant_client, mock_async_ollama_client, mocker, tmp_path
+):
+    """Test the async service reads and writes a disk-backed answer cache off the loop"""
+    mocker.patch.object(settings, "answer_cache_path", str(tmp_path / "answers.db"))
+    threads = []
+    get = SQLiteStore.get
+    put = SQLiteStore.put
+    mocker.patch.object(
+        SQLiteStore,
+        "get",
+        lambda *args: (threads.append(threading.current_thread()), get(*args))[1],
+    )
+    mocker.patch.object(
+        SQLiteStore,
+        "put",
+        lambda *args: (threads.append(threading.current_thread()), put(*args))[1],
+    )
+
+    async def stream():
+        yield {"message": {"content": "Hello"}}
+
+    mock_async_ollama_client.chat.return_value = stream()
+
+    async def run():
+        answers = []
+        # A new service only sees the first answer through the file
+        for _ in range(2):
+            response = await AsyncMealieRAGService().chat(
+                [{"role": "user", "content": "hi"}]
+            )
+            answers.append("".join([c["message"]["content"] async for c in response]))
+        return answers
+
+    assert asyncio.run(run()) == ["Hello", "Hello"]
+    mock_async_ollama_client.chat.assert_called_once()
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+
+
+def test_chat_semantic_answer_cache(
+    mock_settings, mock_qdrant_client, mock_ollama_client, mocker
+):
+    """Test a paraphrased question over the same recipes reuses the answer"""
+    mocker.patch.object(settings, "semantic_answer_cache_size", 10)
+    mocker.patch(
+        "mealierag.service.get_embedding",
+        side_effect=lambda queries, *_: [
+            [1.0, 0.0] if "quick" in q else [0.98, 0.05] for q in queries
+        ],
+    )
+    mock_ollama_client.chat.return_value = iter([{"message": {"content": "Salad."}}])
+    hits = [
+        ScoredPoint(
+            id=1, version=0, score=1.0, payload={"recipe_id": "r1", "content_hash": "h"}
+        )
+    ]
+
+    service = MealieRAGService()
+    first = list(service.chat([{"role": "user", "content": "a"}], "quick dinner", hits))
+    second = list(service.chat([{"role": "user", "content": "b"}], "fast dinner", hits))
+
+    assert first[0]["message"]["content"] == second[0]["message"]["content"]
+    mock_ollama_client.chat.assert_called_once()
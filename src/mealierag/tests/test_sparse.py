@@ -0,0 +1,35 @@
+from mealierag.sparse import encode_document, encode_query, term_index, terms
+
+
+def test_terms():
+    """Test stop words are dropped and plurals folded."""
+    assert terms("The Tomatoes and peaches, with gochujang!") == [
+        "tomato",
+        "peach",
+        "gochujang",
+    ]
+
+
+def test_encode_query():
+    """Test a query has one unit weight per distinct term."""
+    vector = encode_query("shakshuka with eggs and more eggs")
+
+    assert vector.indices == sorted(
+        {term_index("shakshuka"), term_index("egg"), term_index("more")}
+    )
+    assert vector.values == [1.0, 1.0, 1.0]
+
+
+def test_encode_document_saturates_and_normalizes():
+    """Test repeated terms saturate and long documents weigh terms less."""
+    short = encode_document("gochujang gochujang rice")
+    long = encode_document("gochujang " + "filler " * 500)
+    weights = dict(zip(short.indices, short.values))
+
+    assert weights[term_index("gochujang")] > weights[term_index("rice")]
+    assert weights[term_index("gochujang")] < 2 * weights[term_index("rice")]
+    assert (
+        dict(zip(long.indices, long.values))[term_index("gochujang")]
+        < weights[term_index("rice")]
+    )
+    assert encode_document("").indices == []
@@ -1,12 +1,42 @@
-from unittest.mock import MagicMock
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from qdrant_client import models
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.models import ScoredPoint
 
+from mealierag.config import FusionMethod, Quantization
+from mealierag.sparse import encode_document, encode_query
 from mealierag.vectordb import (
+    FIELD_VECTOR_NAMES,
+    SPARSE_VECTOR_NAME,
+    aretrieve_results_batch,
+    aretrieve_results_best_field,
+    aretrieve_results_hybrid,
+    aretrieve_results_rrf,
+    aretrieve_results_simple,
+    create_payload_indexes,
+    delete_old_versions,
+    delete_recipes,
+    fuse_results,
+    fuse_results_rrf,
+    fuse_results_score_sum,
+    fuse_results_weighted_rrf,
+    get_alias_target,
+    get_content_hashes,
+    get_hnsw_config,
+    get_quantization_config,
+    get_search_params,
     get_vector_db_client,
+    list_indexed_recipe_ids,
+    list_payload_values,
+    recipe_point_id,
+    retrieve_results_batch,
+    retrieve_results_best_field,
+    retrieve_results_hybrid,
     retrieve_results_rrf,
     retrieve_results_simple,
+    switch_alias,
 )
 
 
@@ -28,7 +58,11 @@ def test_retrieve_results_simple(mock_qdrant_client):
     )
 
     mock_qdrant_client.query_points.assert_called_with(
-        collection_name="test_collection", query=[0.1, 0.2], limit=2
+        collection_name="test_collection",
+        query=[0.1, 0.2],
+        limit=2,
+        query_filter=None,
+        search_params=None,
     )
     assert results == ["result1", "result2"]
 
@@ -61,3 +95,516 @@ def test_retrieve_results_rrf(mock_qdrant_client):
     assert len(call_args.kwargs["prefetch"]) == 2
 
     assert results == ["result1", "result2"]
+
+
+def test_list_indexed_recipe_ids(mock_qdrant_client):
+    """Test listing recipe IDs scrolls through all pages."""
+    mock_qdrant_client.scroll.side_effect = [
+        ([MagicMock(payload={"recipe_id": "1"})], "next"),
+        ([MagicMock(payload={"recipe_id": "2"}), MagicMock(payload={})], None),
+    ]
+
+    recipe_ids = list_indexed_recipe_ids(mock_qdrant_client, "test_collection")
+
+    assert recipe_ids == {"1", "2"}
+    assert mock_qdrant_client.scroll.call_args.kwargs["offset"] == "next"
+
+
+def test_list_payload_values(mock_qdrant_client):
+    """Test listing payload values across scroll pages flattens list-valued fields."""
+    mock_qdrant_client.scroll.side_effect = [
+        ([MagicMock(payload={"name": "Soup", "tags": ["Vegan", "Quick"]})], "next"),
+        (
+            [
+                MagicMock(
+                    payload={"name": "Stew", "tags": ["Vegan"], "category": None}
+                ),
+                MagicMock(payload={"name": "Soup"}),
+            ],
+            None,
+        ),
+    ]
+
+    values = list_payload_values(
+        mock_qdrant_client, "test_collection", ["name", "tags", "category"]
+    )
+
+    assert values == {
+        "name": ["Soup", "Stew"],
+        "tags": ["Quick", "Vegan"],
+        "category": [],
+    }
+
+
+def test_create_payload_indexes(mock_qdrant_client):
+    """Test the filtered payload fields are indexed."""
+    create_payload_indexes(mock_qdrant_client, "test_collection")
+
+    indexed = {
+        c.kwargs["field_name"]: c.kwargs["field_schema"]
+        for c in mock_qdrant_client.create_payload_index.call_args_list
+    }
+    assert indexed == {
+        "tags": models.PayloadSchemaType.KEYWORD,
+        "category": models.PayloadSchemaType.KEYWORD,
+        "rating": models.PayloadSchemaType.FLOAT,
+    }
+
+
+def test_retrieve_results_rrf_filter(mock_qdrant_client):
+    """Test the filter is applied to every prefetch and the fused query."""
+    query_filter = models.Filter(
+        must=[models.FieldCondition(key="rating", range=models.Range(gte=4))]
+    )
+
+    retrieve_results_rrf(
+        [[0.1], [0.2]],
+        mock_qdrant_client,
+        "test_collection",
+        query_filter=query_filter,
+    )
+
+    call_args = mock_qdrant_client.query_points.call_args
+    assert call_args.kwargs["query_filter"] == query_filter
+    assert all(p.filter == query_filter for p in call_args.kwargs["prefetch"])
+
+
+def test_delete_recipes(mock_qdrant_client):
+    """Test deleting points by recipe ID."""
+    delete_recipes(mock_qdrant_client, "test_collection", ["1", "2"])
+
+    call_args = mock_qdrant_client.delete.call_args
+    assert call_args.kwargs["collection_name"] == "test_collection"
+    condition = call_args.kwargs["points_selector"].filter.must[0]
+    assert condition.key == "recipe_id"
+    assert condition.match.any == ["1", "2"]
+
+
+def test_delete_recipes_empty(mock_qdrant_client):
+    """Test nothing is deleted without recipe IDs."""
+    delete_recipes(mock_qdrant_client, "test_collection", [])
+
+    mock_qdrant_client.delete.assert_not_called()
+
+
+def test_recipe_point_id():
+    """Test point IDs are stable UUIDs per recipe."""
+    assert recipe_point_id("1") == recipe_point_id("1")
+    assert recipe_point_id("1") != recipe_point_id("2")
+    assert len(recipe_point_id("1")) == 36
+
+
+def test_get_content_hashes(mock_qdrant_client):
+    """Test content hashes of existing points are returned by ID."""
+    mock_qdrant_client.retrieve.return_value = [
+        MagicMock(id="a", payload={"content_hash": "hash-a"}),
+        MagicMock(id="b", payload={}),
+    ]
+
+    hashes = get_content_hashes(mock_qdrant_client, "test_collection", ["a", "b", "c"])
+
+    assert hashes == {"a": "hash-a"}
+    assert mock_qdrant_client.retrieve.call_args.kwargs["ids"] == ["a", "b", "c"]
+
+
+def _create(client: QdrantClient, name: str):
+    client.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+
+
+def test_switch_alias():
+    """Test switching an alias between collection versions."""
+    client = QdrantClient(":memory:")
+    _create(client, "recipes_v1")
+    _create(client, "recipes_v2")
+
+    switch_alias(client, "recipes", "recipes_v1")
+    assert get_alias_target(client, "recipes") == "recipes_v1"
+
+    switch_alias(client, "recipes", "recipes_v2")
+    assert get_alias_target(client, "recipes") == "recipes_v2"
+    assert client.collection_exists("recipes")
+
+
+def test_switch_alias_replaces_collection():
+    """Test a plain collection named like the alias is replaced."""
+    client = QdrantClient(":memory:")
+    _create(client, "recipes")
+    _create(client, "recipes_v1")
+
+    switch_alias(client, "recipes", "recipes_v1")
+
+    assert get_alias_target(client, "recipes") == "recipes_v1"
+    names = {c.name for c in client.get_collections().collections}
+    assert names == {"recipes_v1"}
+
+
+def test_delete_old_versions():
+    """Test old versions are deleted while the live one is kept."""
+    client = QdrantClient(":memory:")
+    for name in ["recipes_v1", "recipes_v2", "recipes_v3", "other"]:
+        _create(client, name)
+    # Live version is not the newest one, e.g. after a rollback
+    switch_alias(client, "recipes", "recipes_v1")
+
+    removed = delete_old_versions(client, "recipes", keep=1)
+
+    assert removed == ["recipes_v2"]
+    names = {c.name for c in client.get_collections().collections}
+    assert names == {"recipes_v1", "recipes_v3", "other"}
+
+
+def test_aretrieve_results_simple():
+    """Test async simple retrieval."""
+    client = AsyncMock()
+    client.query_points.return_value = MagicMock(points=["result1"])
+
+    results = asyncio.run(
+        aretrieve_results_simple([[0.1, 0.2]], client, "test_collection", k=2)
+    )
+
+    client.query_points.assert_awaited_with(
+        collection_name="test_collection",
+        query=[0.1, 0.2],
+        limit=2,
+        query_filter=None,
+        search_params=None,
+    )
+    assert results == ["result1"]
+
+
+def test_aretrieve_results_rrf():
+    """Test async RRF retrieval."""
+    client = AsyncMock()
+    client.query_points.return_value = MagicMock(points=["result1"])
+
+    results = asyncio.run(
+        aretrieve_results_rrf([[0.1], [0.2]], client, "test_collection", k=2)
+    )
+
+    call_args = client.query_points.call_args
+    assert call_args.kwargs["query"].fusion == models.Fusion.RRF
+    assert len(call_args.kwargs["prefetch"]) == 2
+    assert results == ["result1"]
+
+
+def test_fuse_results_rrf_matches_server_fusion():
+    """Test client-side fusion of per-query results matches prefetch RRF."""
+    client = QdrantClient(":memory:")
+    _create(client, "recipes")
+    client.upsert(
+        "recipes",
+        points=[
+            models.PointStruct(id=i, vector=[1.0, i / 10], payload={})
+            for i in range(10)
+        ],
+    )
+    query_vectors = [[1.0, 0.0], [0.5, 0.5], [0.0, 1.0], [0.5, 0.5]]
+
+    fused = fuse_results_rrf(
+        [
+            retrieve_results_simple([vector], client, "recipes", k=3)
+            for vector in query_vectors
+        ],
+        k=3,
+    )
+    expected = retrieve_results_rrf(query_vectors, client, "recipes", k=3)
+
+    assert [(p.id, p.score) for p in fused] == [(p.id, p.score) for p in expected]
+
+
+def _hits(*scored: tuple[int, float]) -> list[ScoredPoint]:
+    return [ScoredPoint(id=i, version=1, score=score) for i, score in scored]
+
+
+def test_fuse_results_weighted_rrf():
+    """Test weights change the influence of each query."""
+    results = [_hits((1, 0.9), (2, 0.8)), _hits((2, 0.9), (3, 0.8))]
+
+    unweighted = fuse_results_weighted_rrf(results, k=3)
+    assert [p.id for p in unweighted] == [p.id for p in fuse_results_rrf(results, 3)]
+    assert unweighted[0].id == 2
+
+    weighted = fuse_results_weighted_rrf(results, k=3, weights=[3.0])
+    assert [p.id for p in weighted] == [1, 2, 3]
+
+
+def test_fuse_results_score_sum():
+    """Test scores are min-max normalized per query before summing."""
+    results = [
+        _hits((1, 0.9), (2, 0.8), (3, 0.7)),
+        _hits((3, 0.31), (2, 0.30), (1, 0.1)),
+    ]
+
+    fused = fuse_results_score_sum(results, k=2)
+
+    assert [p.id for p in fused] == [2, 1]
+    assert fused[0].score == pytest.approx(0.5 + 0.2 / 0.21)
+    # The input points are not modified
+    assert results[0][1].score == 0.8
+
+
+def test_fuse_results_dispatch():
+    """Test the fusion method selects the implementation."""
+    results = [_hits((1, 0.9), (2, 0.1)), _hits((2, 0.5), (1, 0.49))]
+
+    assert fuse_results(results, k=1, method=FusionMethod.SCORE_SUM)[0].id == 1
+    assert fuse_results(results, k=1)[0].id == fuse_results_rrf(results, 1)[0].id
+
+
+def _recipes_client() -> QdrantClient:
+    client = QdrantClient(":memory:")
+    _create(client, "recipes")
+    client.upsert(
+        "recipes",
+        points=[
+            models.PointStruct(id=i, vector=[1.0, i / 20], payload={"name": str(i)})
+            for i in range(20)
+        ],
+    )
+    return client
+
+
+def test_retrieve_results_batch():
+    """Test batch retrieval searches all vectors in one request."""
+    client = _recipes_client()
+    query_vectors = [[1.0, 0.0], [0.5, 0.5], [0.0, 1.0]]
+    spy = MagicMock(wraps=client.query_batch_points)
+    client.query_batch_points = spy
+
+    results = retrieve_results_batch(query_vectors, client, "recipes", k=3, depth=3)
+
+    spy.assert_called_once()
+    assert all(r.limit == 3 for r in spy.call_args.kwargs["requests"])
+    expected = retrieve_results_rrf(query_vectors, client, "recipes", k=3)
+    assert [(p.id, p.score) for p in results] == [(p.id, p.score) for p in expected]
+    assert results[0].payload["name"]
+
+
+def test_retrieve_results_batch_depth():
+    """Test the candidate depth is never below k."""
+    client = MagicMock()
+    client.query_batch_points.return_value = [MagicMock(points=_hits((1, 0.5)))]
+
+    retrieve_results_batch([[0.1]], client, "recipes", k=5, depth=2)
+
+    assert client.query_batch_points.call_args.kwargs["requests"][0].limit == 5
+
+
+def test_aretrieve_results_batch():
+    """Test async batch retrieval."""
+    client = AsyncMock()
+    client.query_batch_points.return_value = [
+        MagicMock(points=_hits((1, 0.9), (2, 0.8))),
+        MagicMock(points=_hits((2, 0.9))),
+    ]
+
+    results = asyncio.run(
+        aretrieve_results_batch(
+            [[0.1], [0.2]], client, "recipes", k=1, fusion=FusionMethod.WEIGHTED_RRF
+        )
+    )
+
+    assert [p.id for p in results] == [2]
+    client.query_batch_points.assert_awaited_once()
+
+
+def _hybrid_collection() -> QdrantClient:
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "recipes",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+        sparse_vectors_config={
+            SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)
+        },
+    )
+    texts = ["Spicy gochujang noodles", "Tomato soup", "Tomato salad"]
+    client.upsert(
+        "recipes",
+        points=[
+            models.PointStruct(
+                id=i,
+                vector={"": [1.0, 0.1 * i], SPARSE_VECTOR_NAME: encode_document(text)},
+                payload={"name": text},
+            )
+            for i, text in enumerate(texts)
+        ],
+    )
+    return client
+
+
+def test_retrieve_results_hybrid():
+    """Test a keyword missed by the dense vector is found by the sparse one."""
+    client = _hybrid_collection()
+    # Dense vector closest to the tomato recipes
+    dense = [[1.0, 0.2]]
+
+    dense_only = retrieve_results_simple(dense, client, "recipes", k=1)
+    hybrid = retrieve_results_hybrid(
+        dense, [encode_query("gochujang")], client, "recipes", k=2
+    )
+
+    assert dense_only[0].payload["name"] != "Spicy gochujang noodles"
+    assert "Spicy gochujang noodles" in [hit.payload["name"] for hit in hybrid]
+
+
+def test_retrieve_results_hybrid_skips_empty_sparse_vectors(mock_qdrant_client):
+    """Test sparse vectors without terms do not produce a prefetch."""
+    retrieve_results_hybrid(
+        [[0.1], [0.2]],
+        [encode_query("the"), encode_query("soup")],
+        mock_qdrant_client,
+        "test_collection",
+        k=2,
+        depth=10,
+    )
+
+    prefetch = mock_qdrant_client.query_points.call_args.kwargs["prefetch"]
+    assert [p.using for p in prefetch] == [None, None, SPARSE_VECTOR_NAME]
+    assert all(p.limit == 10 for p in prefetch)
+
+
+def test_aretrieve_results_hybrid():
+    """Test async hybrid retrieval fuses dense and sparse prefetches."""
+    client = AsyncMock()
+    client.query_points.return_value = MagicMock(points=["result1"])
+
+    results = asyncio.run(
+        aretrieve_results_hybrid(
+            [[0.1]], [encode_query("soup")], client, "test_collection", k=2
+        )
+    )
+
+    call_args = client.query_points.call_args
+    assert call_args.kwargs["query"].fusion == models.Fusion.RRF
+    assert len(call_args.kwargs["prefetch"]) == 2
+    assert results == ["result1"]
+
+
+def _field_collection() -> QdrantClient:
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "recipes",
+        vectors_config={
+            name: models.VectorParams(size=2, distance=models.Distance.COSINE)
+            for name in FIELD_VECTOR_NAMES
+        },
+    )
+    client.upsert(
+        "recipes",
+        points=[
+            # Matches the query on its ingredients only
+            models.PointStruct(
+                id=1,
+                vector={"title": [0.0, 1.0], "ingredients": [1.0, 0.0]},
+                payload={"name": "Shakshuka"},
+            ),
+            # Moderately close on every field
+            models.PointStruct(
+                id=2,
+                vector={name: [1.0, 0.8] for name in FIELD_VECTOR_NAMES},
+                payload={"name": "Omelette"},
+            ),
+        ],
+    )
+    return client
+
+
+def test_retrieve_results_best_field():
+    """Test recipes are ranked by their best matching field."""
+    client = _field_collection()
+
+    hits = retrieve_results_best_field([[1.0, 0.0]], [], client, "recipes", k=2)
+
+    assert [hit.payload["name"] for hit in hits] == ["Shakshuka", "Omelette"]
+    assert hits[0].score > 0.99
+
+
+def test_retrieve_results_best_field_fuses_queries(mock_qdrant_client):
+    """Test best field results of several queries are fused with RRF."""
+    first = [ScoredPoint(id=1, version=1, score=0.9)]
+    second = [ScoredPoint(id=2, version=1, score=0.8)]
+    mock_qdrant_client.query_batch_points.return_value = [
+        MagicMock(points=points) for points in [first, [], [], second, [], []]
+    ]
+
+    hits = retrieve_results_best_field(
+        [[0.1], [0.2]], [], mock_qdrant_client, "test_collection", k=2
+    )
+
+    requests = mock_qdrant_client.query_batch_points.call_args.kwargs["requests"]
+    assert [r.using for r in requests] == list(FIELD_VECTOR_NAMES) * 2
+    assert {hit.id for hit in hits} == {1, 2}
+
+
+def test_retrieve_results_hybrid_fields():
+    """Test field vectors are fused server-side like sparse vectors."""
+    client = _field_collection()
+
+    hits = retrieve_results_hybrid(
+        [[1.0, 0.0]], [], client, "recipes", k=2, vector_names=FIELD_VECTOR_NAMES
+    )
+
+    assert {hit.payload["name"] for hit in hits} == {"Shakshuka", "Omelette"}
+
+
+def test_aretrieve_results_best_field():
+    """Test async best field retrieval."""
+    client = AsyncMock()
+    client.query_batch_points.return_value = [
+        MagicMock(points=[ScoredPoint(id=1, version=1, score=score)])
+        for score in [0.2, 0.9, 0.5]
+    ]
+
+    hits = asyncio.run(
+        aretrieve_results_best_field([[0.1]], [], client, "test_collection", k=2)
+    )
+
+    assert [(hit.id, hit.score) for hit in hits] == [(1, 0.9)]
+
+
+def test_get_hnsw_config():
+    """Test HNSW settings are only sent when tuned."""
+    assert get_hnsw_config() is None
+    assert get_hnsw_config(m=32) == models.HnswConfigDiff(m=32)
+
+
+def test_get_quantization_config():
+    """Test quantized vectors are kept in RAM."""
+    assert get_quantization_config(Quantization.NONE) is None
+    scalar = get_quantization_config(Quantization.SCALAR)
+    assert scalar.scalar.type == models.ScalarType.INT8
+    assert scalar.scalar.always_ram
+    assert get_quantization_config(Quantization.BINARY).binary.always_ram
+
+
+def test_get_search_params():
+    """Test quantization search params are only set for quantized collections."""
+    assert get_search_params() is None
+    assert get_search_params(hnsw_ef=128) == models.SearchParams(hnsw_ef=128)
+
+    params = get_search_params(
+        quantization=Quantization.BINARY, rescore=True, oversampling=2.0
+    )
+    assert params.quantization == models.QuantizationSearchParams(
+        rescore=True, oversampling=2.0
+    )
+
+
+def test_search_params_reach_every_search(mock_qdrant_client):
+    """Test search params are sent with every prefetch and batch request."""
+    params = models.SearchParams(hnsw_ef=64)
+
+    retrieve_results_rrf(
+        [[0.1], [0.2]], mock_qdrant_client, "test_collection", search_params=params
+    )
+    prefetch = mock_qdrant_client.query_points.call_args.kwargs["prefetch"]
+    assert all(p.params == params for p in prefetch)
+
+    retrieve_results_batch(
+        [[0.1], [0.2]], mock_qdrant_client, "test_collection", search_params=params
+    )
+    requests = mock_qdrant_client.query_batch_points.call_args.kwargs["requests"]
+    assert all(r.params == params for r in requests)